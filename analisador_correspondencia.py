@@ -1,6 +1,6 @@
 import pandas as pd
 from pathlib import Path
-from docx import Document
+from leitor_docx import paragrafos_docx
 from openpyxl import load_workbook
 
 # --- CONFIGURAÇÕES ---
@@ -82,15 +82,12 @@ def processar_novos_informativos(caminho_pasta):
             if orgao not in ['STF', 'STJ']:
                 orgao = 'STF' if 'stf' in nome_arquivo.lower() else 'STJ' if 'stj' in nome_arquivo.lower() else 'DESCONHECIDO'
 
-            document = Document(docx_path)
             current_disciplina = None
             capturando_tese = False
 
-            for para in document.paragraphs:
-                texto_paragrafo = para.text.strip()
+            for estilo, texto in paragrafos_docx(docx_path):
+                texto_paragrafo = texto.strip()
                 if not texto_paragrafo: continue
-
-                estilo = para.style.name
                 
                 if estilo.startswith(('Heading 1', 'Título 1')):
                     current_disciplina = texto_paragrafo.upper()
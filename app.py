@@ -1,14 +1,32 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, text
+import numpy as np
 import math
 import urllib.parse
 import streamlit.components.v1 as components
 import time
 import re
+from indice_busca import IndiceBusca, RankingBM25
+from normalizacao import (normalizar_texto_regex, montar_coluna_busca, COLUNAS_BUSCA_INFORMATIVOS,
+                           COLUNAS_BUSCA_STF, COLUNAS_BUSCA_STJ)
+from repositorio import criar_repositorio, TABELAS
+from db_config import create_db_engine, METRICAS as METRICAS_SQL, STATEMENT_TIMEOUT_MS
+from cache_resultados import CacheResultados
+from bases_memoria import BasesEmMemoria
+from snapshot_bases import SnapshotBases
+from facetas import FacetasInformativos
+from filtro_temas import FiltroTemas
+from renderizacao import markdown_informativos, markdown_temas_stf, markdown_temas_stj
+from memoria import compactar, bytes_por_coluna, relatorio_memoria
 
 # --- 1. CONFIGURAÇÕES GERAIS ---
 ITEMS_PER_PAGE = 25
+# Paginação no banco (abas STF/STJ): lê só a página atual em vez da tabela inteira
+PAGINACAO_NO_BANCO = bool(st.secrets.get("PAGINACAO_NO_BANCO", False))
+# Intervalo mínimo (segundos) entre as consultas à tabela de versões, por processo
+INTERVALO_VERIFICACAO_VERSAO = int(st.secrets.get("INTERVALO_VERIFICACAO_VERSAO", 30))
+# Snapshot em disco das bases prontas, para o processo reiniciado não esperar o banco ("" desliga)
+DIRETORIO_SNAPSHOT = st.secrets.get("DIRETORIO_SNAPSHOT", ".snapshot_bases")
 st.set_page_config(page_title="Hub Jurídico", page_icon="⚖️", layout="wide")
 
 # ==============================================================================
@@ -37,28 +55,43 @@ if st.session_state.trigger_scroll_top:
     st.session_state.trigger_scroll_top = False
 
 # --- FUNÇÃO DE BUSCA INTELIGENTE ---
-def filtrar_dados(df, termo_busca):
+def filtrar_dados(df, termo_busca, colunas_busca, indice=None):
     """
     Realiza busca inteligente:
     - Com aspas ("termo exato"): Busca a frase exata.
     - Sem aspas (termo livre): Busca palavras em qualquer ordem (AND).
+    colunas_busca são as colunas que formam o texto de busca da base (COLUNAS_BUSCA).
+    Se o índice invertido da base for informado, a busca usa as posting lists
+    em vez de varrer o texto de busca inteiro.
     """
     if not termo_busca:
         return df
     
-    termo_busca = termo_busca.lower().strip()
+    # Mesma normalização do texto de busca (sem acentos, minúsculas)
+    termo_busca = normalizar_texto_regex(termo_busca).strip()
+    frase_exata = termo_busca.startswith('"') and termo_busca.endswith('"')
+    
+    if indice is not None:
+        if frase_exata:
+            rotulos = indice.buscar_frase(termo_busca[1:-1])
+        else:
+            rotulos = indice.buscar_palavras(termo_busca.split())
+        return df[df.index.isin(rotulos)]
+    
+    # Sem índice: texto de busca montado na hora (as bases não guardam a coluna 'busca')
+    busca = montar_coluna_busca(df, colunas_busca)
     
     # Verifica se começa e termina com aspas
-    if termo_busca.startswith('"') and termo_busca.endswith('"'):
+    if frase_exata:
         # Busca exata (remove aspas e busca a frase literal)
         frase = termo_busca[1:-1]
-        return df[df['busca'].str.contains(frase, regex=False, na=False)]
+        return df[busca.str.contains(frase, regex=False, na=False)]
     else:
         # Busca por palavras-chave (todas as palavras devem estar presentes)
         palavras = termo_busca.split()
-        mask = pd.Series([True] * len(df))
+        mask = pd.Series(True, index=df.index)
         for p in palavras:
-            mask = mask & df['busca'].str.contains(p, regex=False, na=False)
+            mask = mask & busca.str.contains(p, regex=False, na=False)
         return df[mask]
 
 # --- CONFIGURAÇÃO DE ADMINISTRAÇÃO ---
@@ -85,10 +118,28 @@ LISTA_RAMOS_COMPLETA = sorted([
     "Outros"
 ])
 
+# Pesos dos campos na ordenação por relevância (BM25): tese/título valem mais que situação
+PESOS_RELEVANCIA = {
+    "informativos": {"tese": 2.0, "assunto": 2.0, "disciplina": 1.0, "orgao": 0.5},
+    "stf": {"Título": 2.0, "Tese": 2.0, "Tema": 1.0, "Leading Case": 1.0, "Ramo do Direito": 1.0, "Situação do Tema": 0.5},
+    "stj": {"Tese Firmada": 2.0, "Questão submetida a julgamento": 2.0, "Tema": 1.0, "Processo": 1.0, "Ramo do direito": 1.0, "Situação do Tema": 0.5},
+}
+ORDENS_TEMAS = ["Tema (Decrescente)", "Relevância"]
+# Colunas de poucos valores distintos guardadas como categoria, e colunas int32
+COLUNAS_CATEGORICAS = {
+    "informativos": ['orgao', 'disciplina', 'assunto', 'arquivo_fonte'],
+    "stf": ['Ramo do Direito', 'Situação do Tema'],
+    "stj": ['Ramo do direito', 'Situação do Tema'],
+}
+COLUNAS_INT32 = {"informativos": ['num_inf'], "stf": ['Tema'], "stj": ['Tema']}
+# O texto de busca não fica guardado nas bases: o índice é montado a partir destas colunas
+COLUNAS_BUSCA = {"informativos": COLUNAS_BUSCA_INFORMATIVOS, "stf": COLUNAS_BUSCA_STF, "stj": COLUNAS_BUSCA_STJ}
+
 # --- 3. INICIALIZAÇÃO DO ESTADO DA SESSÃO ---
-if 'df_filtrado' not in st.session_state: st.session_state.df_filtrado = pd.DataFrame()
+if 'consulta_informativos' not in st.session_state: st.session_state.consulta_informativos = None
 if 'titulo_resultados' not in st.session_state: st.session_state.titulo_resultados = "Use os filtros acima e clique em buscar."
 if 'filtros_ativos' not in st.session_state: st.session_state.filtros_ativos = ("Nenhum", "Todos")
+if 'termo_busca_ativo' not in st.session_state: st.session_state.termo_busca_ativo = ""
 
 # Paginação
 if 'page_informativos_top' not in st.session_state: st.session_state.page_informativos_top = 1
@@ -111,143 +162,317 @@ def sync_page_widgets(source_key, target_key):
 @st.cache_resource
 def init_connection():
     try:
-        return create_engine(st.secrets["DB_CONNECTION_STRING"])
+        # Mesmo engine dos scripts: pool com pre-ping, timeouts e métricas por consulta
+        return create_db_engine(st.secrets["DB_CONNECTION_STRING"], statement_timeout_ms=STATEMENT_TIMEOUT_MS)
     except Exception as e:
         st.error(f"Erro ao conectar ao banco de dados: {e}")
         return None
 
 engine = init_connection()
 
+# Camada de acesso aos dados (Postgres/Supabase ou SQLite local, pelo dialeto)
+repo = criar_repositorio(engine) if engine is not None else None
+
 # --- FUNÇÕES DE UPDATE E LEITURA (ADMIN) ---
 def atualizar_ramo_stf(tema_id, novo_ramo):
-    if engine is None: return False
+    if repo is None: return False
     try:
-        with engine.begin() as conn:
-            try:
-                stmt = text('UPDATE temas_stf SET "Ramo do Direito" = :ramo, "data_ultima_alteracao" = NOW() WHERE "Tema" = :tema')
-                conn.execute(stmt, {"ramo": novo_ramo, "tema": tema_id})
-            except:
-                stmt = text('UPDATE temas_stf SET "Ramo do Direito" = :ramo WHERE "Tema" = :tema')
-                conn.execute(stmt, {"ramo": novo_ramo, "tema": tema_id})
-                
-        st.cache_data.clear()
+        # O repositório sobe a versão de temas_stf registrando só este tema;
+        # na próxima leitura a base do STF recebe a linha nova, as outras ficam intactas
+        repo.atualizar_ramo_stf(tema_id, novo_ramo)
+        obter_bases().forcar_verificacao()
+        carregar_ultimo_tema_editado.clear()
+        obter_cache_resultados().invalidar("stf")
         st.session_state.data_needs_refresh = True
         return True
     except Exception as e:
         st.error(f"Erro ao atualizar banco: {e}")
         return False
 
+# Consultado só quando a versão de temas_stf muda (ou depois de uma edição do admin),
+# em vez de uma ida ao banco a cada interação da aba STF
+@st.cache_data(max_entries=4, show_spinner=False)
+def carregar_ultimo_tema_editado(versao):
+    return repo.ultimo_tema_editado()
+
 def get_ultimo_tema_editado():
-    if engine is None: return None
+    if repo is None: return None
     try:
-        with engine.connect() as conn:
-            stmt = text('SELECT "Tema" FROM temas_stf WHERE "data_ultima_alteracao" IS NOT NULL ORDER BY "data_ultima_alteracao" DESC LIMIT 1')
-            result = conn.execute(stmt).fetchone()
-            return result[0] if result else None
+        return carregar_ultimo_tema_editado(versao_tabela("temas_stf"))
     except:
         return None
 
 # --- 6. FUNÇÕES DE CARREGAMENTO DE DADOS (OTIMIZADAS) ---
 
-# OTIMIZAÇÃO: Cache aumentado para 24h (86400s)
-@st.cache_data(ttl=86400)
-def carregar_dados_informativos():
-    if engine is None: return None
+# OTIMIZAÇÃO: A coluna 'busca' do banco só serve às consultas SQL (paginação no banco).
+# As bases em memória não a carregam: seria uma segunda cópia de tese/título/assunto.
+def colunas_exibidas(tabela):
+    return [c for c in TABELAS[tabela]["colunas"] if c != 'busca']
+
+def preparar_dados_stf(df):
+    df.columns = [col.replace('"', '') for col in df.columns]
+    df['Tema'] = pd.to_numeric(df['Tema'], errors='coerce').fillna(0).astype(int)
+    
+    if 'Ramo do Direito' not in df.columns: 
+        df['Ramo do Direito'] = 'Não Classificado'
+    else:
+        df['Ramo do Direito'] = df['Ramo do Direito'].fillna('Não Classificado')
+
+    df['Tese'] = df['Tese'].fillna('')
+    return df
+
+def preparar_dados_stj(df):
+    df.columns = [col.replace('"', '') for col in df.columns]
+    df['Tema'] = pd.to_numeric(df['Tema'], errors='coerce').fillna(0).astype(int)
+
+    if 'Tese Firmada' not in df.columns: df['Tese Firmada'] = ''
+    df['Tese Firmada'] = df['Tese Firmada'].fillna('')
+    
+    return df
+
+# Relatório de memória (bytes por coluna antes/depois) de cada base carregada neste processo
+@st.cache_resource(show_spinner=False)
+def obter_relatorios_memoria():
+    return {}
+
+def compactar_base(nome_base, df):
+    """Categorias + int32 nas colunas configuradas, registrando o antes/depois para o admin."""
+    antes = bytes_por_coluna(df)
+    compactar(df, COLUNAS_CATEGORICAS[nome_base], COLUNAS_INT32[nome_base])
+    obter_relatorios_memoria()[nome_base] = relatorio_memoria(antes, bytes_por_coluna(df))
+    return df
+
+# Bases em memória do processo, atualizadas pela versão de cada tabela no banco
+# (sem TTL: uma importação aparece em até INTERVALO_VERIFICACAO_VERSAO segundos)
+@st.cache_resource
+def obter_bases():
+    snapshots = SnapshotBases(DIRETORIO_SNAPSHOT) if DIRETORIO_SNAPSHOT else None
+    return BasesEmMemoria(repo, intervalo_verificacao=INTERVALO_VERIFICACAO_VERSAO, snapshots=snapshots)
+
+def geracao(df):
+    """Número da carga da base (muda a cada recarga ou atualização parcial)."""
+    return df.attrs.get("geracao", 0)
+
+def versao_tabela(tabela):
+    return obter_bases().versao_banco(tabela) if repo is not None else None
+
+def aplicar_alteracoes_temas(nome_base, tabela, df, chaves):
+    """Nova base com as linhas das chaves relidas do banco (None: recarregar tudo)."""
     try:
-        # OTIMIZAÇÃO: Selecionando apenas colunas usadas
-        query = """
-        SELECT arquivo_fonte, disciplina, assunto, tese, orgao 
-        FROM informativos
-        """
-        df = pd.read_sql_query(query, engine)
-        
-        df['num_inf'] = df['arquivo_fonte'].str.extract(r'(\d+)').fillna(0).astype(int)
-        
-        colunas_busca = ['disciplina', 'assunto', 'tese', 'orgao']
-        for col in colunas_busca:
-            if col not in df.columns: df[col] = ''
-        
-        df['busca'] = df[colunas_busca].fillna('').astype(str).agg(' '.join, axis=1).str.lower()
-        return df
-    except Exception as e:
-        st.error(f"Não foi possível carregar os dados dos informativos: {e}")
+        df_novas = repo.carregar_por_chaves(tabela, chaves, colunas_exibidas(tabela))
+        df_novas = preparar_dados_stf(df_novas) if tabela == "temas_stf" else preparar_dados_stj(df_novas)
+        df_mantidas = df[~df['Tema'].isin(chaves)]
+        df_nova_base = pd.concat([df_mantidas, df_novas.reindex(columns=df.columns)], ignore_index=True)
+        df_nova_base = df_nova_base.sort_values('Tema', ascending=False, kind='stable', ignore_index=True)
+        return compactar_base(nome_base, df_nova_base)
+    except Exception:
         return None
 
-# OTIMIZAÇÃO: Cache aumentado para 24h
-@st.cache_data(ttl=86400)
-def carregar_dados_stf():
-    if engine is None: return None
-    try:
-        # OTIMIZAÇÃO: Removida a coluna 'Descrição' e outras não usadas
-        query = """
-        SELECT "Tema", "Título", "Tese", "Leading Case", "Situação do Tema", "Ramo do Direito", "Data do Julgamento"
-        FROM temas_stf
-        """
-        df = pd.read_sql_query(query, engine)
-        
-        df.columns = [col.replace('"', '') for col in df.columns]
-        df['Tema'] = pd.to_numeric(df['Tema'], errors='coerce').fillna(0).astype(int)
-        
-        if 'Ramo do Direito' not in df.columns: 
-            df['Ramo do Direito'] = 'Não Classificado'
-        else:
-            df['Ramo do Direito'] = df['Ramo do Direito'].fillna('Não Classificado')
+def carregar_dados_informativos():
+    if repo is None: return None
+    return obter_bases().obter("informativos", _carregar_informativos)
 
-        colunas_stf_busca = ["Tema", "Tese", "Leading Case", "Título", "Situação do Tema", "Ramo do Direito"]
-        # Filtra apenas colunas que realmente vieram no select
-        existentes = [c for c in colunas_stf_busca if c in df.columns]
-        
-        df['Tese'] = df['Tese'].fillna('')
-        df['busca'] = df[existentes].fillna('').astype(str).agg(' '.join, axis=1).str.lower()
-        return df
-    except Exception as e:
-        st.error(f"Não foi possível carregar os dados do STF: {e}")
-        return None
+def carregar_dados_stf():
+    if repo is None: return None
+    return obter_bases().obter("temas_stf", _carregar_stf, _aplicar_alteracoes_stf)
 
-# OTIMIZAÇÃO: Cache aumentado para 24h
-@st.cache_data(ttl=86400)
 def carregar_dados_stj():
-    if engine is None: return None
+    if repo is None: return None
+    return obter_bases().obter("temas_stj", _carregar_stj, _aplicar_alteracoes_stj)
+
+def _aplicar_alteracoes_stf(df, chaves):
+    return aplicar_alteracoes_temas("stf", "temas_stf", df, chaves)
+
+def _aplicar_alteracoes_stj(df, chaves):
+    return aplicar_alteracoes_temas("stj", "temas_stj", df, chaves)
+
+# Pré-carga no início do processo: as três bases em paralelo. Cada página
+# espera só pela base que exibe (as demais continuam carregando ao fundo).
+@st.cache_resource(show_spinner=False)
+def iniciar_pre_carga():
+    if repo is None: return None
+    fontes = {"informativos": (_carregar_informativos, None)}
+    if not PAGINACAO_NO_BANCO:
+        fontes["temas_stf"] = (_carregar_stf, _aplicar_alteracoes_stf)
+        fontes["temas_stj"] = (_carregar_stj, _aplicar_alteracoes_stj)
+    return obter_bases().pre_carregar(fontes)
+
+# As cargas rodam também nas threads da pré-carga, sem contexto do Streamlit:
+# uma exceção aqui fica em BasesEmMemoria.erro() e a página que espera a base a mostra
+def _carregar_informativos():
+    # OTIMIZAÇÃO: Selecionando apenas colunas usadas
+    df = repo.carregar("informativos", colunas_exibidas("informativos"))
+    
+    df['num_inf'] = df['arquivo_fonte'].str.extract(r'(\d+)').fillna(0).astype(int)
+    
+    for col in COLUNAS_BUSCA_INFORMATIVOS:
+        if col not in df.columns: df[col] = ''
+
+    return compactar_base("informativos", df)
+
+def _carregar_stf():
+    # OTIMIZAÇÃO: Removida a coluna 'Descrição' e outras não usadas
+    df = repo.carregar("temas_stf", colunas_exibidas("temas_stf"))
+    return compactar_base("stf", preparar_dados_stf(df))
+
+def _carregar_stj():
+    # OTIMIZAÇÃO: Redução drástica de colunas (de 40 para 7)
+    df = repo.carregar("temas_stj", colunas_exibidas("temas_stj"))
+    return compactar_base("stj", preparar_dados_stj(df))
+
+def mostrar_erro_carga(tabela, descricao):
+    """Erro da carga da base, exibido na página (a carga pode ter falhado numa thread)."""
+    erro = obter_bases().erro(tabela) if repo is not None else None
+    st.error(f"Não foi possível carregar os dados {descricao}" + (f": {erro}" if erro else "."))
+
+iniciar_pre_carga()
+
+# --- PAGINAÇÃO NO BANCO (TEMAS STF/STJ) ---
+# Filtros de ramo, "com tese" e palavra-chave vão para o WHERE; a página é lida
+# por chave ("Tema" <= primeira chave da página, DESC) em vez de OFFSET.
+def filtros_temas(ramo, opcao_tese):
+    filtros = {}
+    if ramo != "Todos": filtros["ramo"] = ramo
+    if opcao_tese == "Com tese": filtros["com_tese"] = True
+    elif opcao_tese == "Sem teses": filtros["com_tese"] = False
+    return filtros
+
+# A versão da tabela entra na chave: uma gravação invalida só as consultas daquela tabela
+@st.cache_data(ttl=86400, show_spinner=False)
+def carregar_ramos(tabela, versao):
     try:
-        # OTIMIZAÇÃO: Redução drástica de colunas (de 40 para 7)
-        query = """
-        SELECT "Tema", "Tese Firmada", "Processo", "Ramo do direito", "Situação do Tema", "Questão submetida a julgamento", "Trânsito em Julgado"
-        FROM temas_stj
-        """
-        df = pd.read_sql_query(query, engine)
-        
-        df.columns = [col.replace('"', '') for col in df.columns]
-        df['Tema'] = pd.to_numeric(df['Tema'], errors='coerce').fillna(0).astype(int)
-
-        colunas_stj_busca = ["Tema", "Tese Firmada", "Processo", "Ramo do direito", "Situação do Tema", "Questão submetida a julgamento"]
-        existentes = [c for c in colunas_stj_busca if c in df.columns]
-            
-        if 'Tese Firmada' not in df.columns: df['Tese Firmada'] = ''
-        df['Tese Firmada'] = df['Tese Firmada'].fillna('')
-        
-        df['busca'] = df[existentes].fillna('').astype(str).agg(' '.join, axis=1).str.lower()
-        return df
+        return repo.valores_distintos(tabela, "ramo")
     except Exception as e:
-        st.error(f"Não foi possível carregar os dados do STJ: {e}")
-        return None
+        st.error(f"Não foi possível carregar os ramos: {e}")
+        return []
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def carregar_chaves_paginas(tabela, filtros, termo_busca, versao):
+    return repo.chaves_das_paginas(tabela, ITEMS_PER_PAGE, filtros, termo_busca)
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def carregar_pagina_temas(tabela, chave_inicial, filtros, termo_busca, versao):
+    df = repo.pagina_por_chave(tabela, chave_inicial, ITEMS_PER_PAGE, filtros, termo_busca, colunas_exibidas(tabela))
+    return preparar_dados_stf(df) if tabela == "temas_stf" else preparar_dados_stj(df)
+
+def pagina_temas_do_banco(tabela, chaves, pagina, filtros, termo_busca):
+    if not chaves: return pd.DataFrame()
+    return carregar_pagina_temas(tabela, chaves[min(pagina, len(chaves)) - 1], filtros, termo_busca, versao_tabela(tabela))
+
+# Índice invertido do texto de busca, montado uma vez por carga de cada base.
+# A chave inclui a geração da base para não reaproveitar um índice de outra carga.
+# O texto normalizado só existe durante a montagem; as frases exatas conferem
+# o texto das linhas candidatas, montado de novo a partir da base.
+@st.cache_resource(max_entries=6, show_spinner=False)
+def obter_indice_busca(nome_base, geracao_base, _df):
+    colunas = COLUNAS_BUSCA[nome_base]
+    return IndiceBusca(montar_coluna_busca(_df, colunas),
+                       lambda posicoes: montar_coluna_busca(_df.iloc[posicoes], colunas))
+
+# Frequências e tamanhos dos documentos para o BM25, calculados uma vez por carga
+@st.cache_resource(max_entries=6, show_spinner=False)
+def obter_ranking_bm25(nome_base, geracao_base, _df):
+    return RankingBM25(_df, PESOS_RELEVANCIA[nome_base])
+
+def ordenar_por_relevancia(df, termo_busca, ranking):
+    """Reordena (de forma estável) pela pontuação BM25 da busca, maior primeiro."""
+    palavras = normalizar_texto_regex(termo_busca).replace('"', ' ').split()
+    if not palavras or df.empty:
+        return df
+    pontos = ranking.pontuar(palavras, df.index)
+    return df.iloc[np.argsort(-pontos, kind='stable')]
 
-def exibir_item_informativo_agrupado(row):
-    try:
-        assunto_str = str(row.get('assunto', 'N/A')) if pd.notna(row.get('assunto')) else ""
-        tese_str = str(row.get('tese', 'N/A')) if pd.notna(row.get('tese')) else ""
-        arquivo_original = row.get('arquivo_fonte', 'N/A')
-        arquivo_pdf = arquivo_original.replace('.docx', '.pdf')
-        orgao = row.get('orgao', 'N/A')
-        termo_busca_base = arquivo_original.replace('.docx', '')
-        termo_de_busca = f"{termo_busca_base} dizer o direito"
-        query_codificada = urllib.parse.quote_plus(termo_de_busca)
-        google_search_url = f"https://www.google.com/search?q={query_codificada}"
-        link_html = f'<a href="{google_search_url}" target="_blank">{arquivo_pdf}</a>'
-        st.markdown(f"**ASSUNTO:** {assunto_str.upper()}")
-        st.markdown(f"**TESE:** {tese_str} em {link_html} **({orgao})**", unsafe_allow_html=True)
-        st.markdown("---")
-    except Exception as e:
-        st.error(f"Erro ao exibir item: {e}")
+# --- CACHE DE RESULTADOS (COMPARTILHADO ENTRE SESSÕES) ---
+@st.cache_resource(show_spinner=False)
+def obter_cache_resultados():
+    return CacheResultados(max_entradas=512, max_bytes=64 * 1024 * 1024)
+
+def posicoes_em_cache(nome_base, df_base, chave, calcular):
+    """
+    Posições das linhas do resultado (int32, na ordem de exibição), guardadas no
+    cache compartilhado por todas as sessões. calcular() devolve as posições.
+    """
+    cache = obter_cache_resultados()
+    chave = (geracao(df_base),) + tuple(chave)
+    posicoes = cache.obter(nome_base, chave)
+    if posicoes is None:
+        posicoes = np.asarray(calcular(), dtype=np.int32)
+        cache.guardar(nome_base, chave, posicoes)
+    return posicoes
+
+def resultado_em_cache(nome_base, df_base, chave, calcular):
+    """Resultado da consulta como fatia de df_base (calcular() devolve um DataFrame)."""
+    posicoes = posicoes_em_cache(nome_base, df_base, chave,
+                                 lambda: df_base.index.get_indexer(calcular().index))
+    return df_base.iloc[posicoes]
+
+# Facetas (Órgão → Disciplina → Assunto, listas de informativos), montadas uma vez por carga
+@st.cache_resource(max_entries=2, show_spinner=False)
+def obter_facetas_informativos(geracao_base, _df):
+    return FacetasInformativos(_df)
+
+def rotulo_com_contagem(contagens):
+    """format_func dos selectboxes: mostra a quantidade de registros ao lado da opção."""
+    return lambda opcao: f"{opcao} ({contagens[opcao]})" if opcao in contagens else opcao
+
+def filtrar_informativos(df_indice, consulta):
+    informativo, disciplina_inf, assunto_inf, orgao_cat, disciplina_cat, assunto_cat, termo_busca = consulta
+    facetas = obter_facetas_informativos(geracao(df_indice), df_indice)
+    if informativo != "Nenhum":
+        caminho = [informativo.replace('.pdf', '.docx')]
+        if disciplina_inf != "Todas":
+            caminho.append(disciplina_inf)
+            if assunto_inf != "Todos": caminho.append(assunto_inf)
+        df_final = df_indice.iloc[facetas.por_arquivo.posicoes(*caminho)]
+    else:
+        posicoes = facetas.posicoes_categoria(orgao_cat, disciplina_cat, assunto_cat)
+        if posicoes is not None:
+            df_final = df_indice.iloc[posicoes]
+        else:
+            df_final = df_indice
+            if orgao_cat != "Todos": df_final = df_final[df_final['orgao'] == orgao_cat]
+            if disciplina_cat != "Todas": df_final = df_final[df_final['disciplina'] == disciplina_cat]
+            if assunto_cat != "Todos": df_final = df_final[df_final['assunto'] == assunto_cat]
+        
+        # --- BUSCA INTELIGENTE AQUI ---
+        if termo_busca:
+            indice_informativos = obter_indice_busca("informativos", geracao(df_indice), df_indice)
+            df_final = filtrar_dados(df_final, termo_busca, COLUNAS_BUSCA["informativos"], indice_informativos)
+    return df_final
+
+def ordenar_informativos(df_final, sort_by, termo_busca, df_indice):
+    if sort_by == "Padrão (Disciplina, Assunto)": df_final = df_final.sort_values(by=['disciplina', 'assunto'])
+    elif "Informativo" in sort_by: df_final = df_final.sort_values(by=['disciplina', 'num_inf'], ascending=[True, (sort_by == "Informativo (Crescente)")])
+    elif sort_by == "Órgão (A-Z)": df_final = df_final.sort_values(by=['disciplina', 'orgao', 'assunto'])
+    elif sort_by == "Relevância":
+        ranking_informativos = obter_ranking_bm25("informativos", geracao(df_indice), df_indice)
+        df_final = ordenar_por_relevancia(df_final, termo_busca, ranking_informativos)
+    return df_final
+
+# Máscaras de tese/ramo e ordem por Tema das abas STF/STJ, calculadas uma vez por carga
+@st.cache_resource(max_entries=4, show_spinner=False)
+def obter_filtro_temas(nome_base, geracao_base, _df, coluna_ramo, coluna_tese):
+    return FiltroTemas(_df, coluna_ramo, coluna_tese)
+
+def filtrar_temas(df_base, nome_base, coluna_ramo, coluna_tese, ramo, opcao_tese, termo_busca, ordem):
+    """
+    Filtros das abas STF/STJ (ramo, tese, palavra-chave) e ordenação. Só combina
+    máscaras pré-calculadas: devolve as posições das linhas, sem copiar o DataFrame.
+    """
+    filtro = obter_filtro_temas(nome_base, geracao(df_base), df_base, coluna_ramo, coluna_tese)
+    termo_normalizado = normalizar_texto_regex(termo_busca).strip()
+    
+    # --- BUSCA INTELIGENTE AQUI ---
+    posicoes_busca = None
+    if termo_normalizado:
+        posicoes_busca = obter_indice_busca(nome_base, geracao(df_base), df_base).posicoes_busca(termo_normalizado)
+    
+    posicoes = filtro.posicoes(ramo, opcao_tese, posicoes_busca)
+    if ordem == "Relevância" and termo_normalizado and len(posicoes):
+        palavras = termo_normalizado.replace('"', ' ').split()
+        pontos = obter_ranking_bm25(nome_base, geracao(df_base), df_base).pontuar(palavras, df_base.index[posicoes])
+        posicoes = posicoes[np.argsort(-pontos, kind='stable')]
+    return posicoes
 
 # --- 7. INTERFACE PRINCIPAL ---
 st.sidebar.title("Menu de Navegação")
@@ -259,6 +484,23 @@ senha_input = st.sidebar.text_input("Senha Admin", type="password")
 is_admin = senha_input == SENHA_ADMIN
 if is_admin:
     st.sidebar.success("Modo Edição Ativado ✅")
+    stats_cache = obter_cache_resultados().estatisticas()
+    st.sidebar.caption(f"Cache de buscas: {stats_cache['acertos']} acertos / {stats_cache['falhas']} falhas "
+                       f"({stats_cache['taxa_acerto']:.0%}), {stats_cache['entradas']} entradas, "
+                       f"{stats_cache['bytes'] / 1024:.0f} KB, {stats_cache['expulsoes']} expulsões")
+    stats_bases = obter_bases().estatisticas()
+    st.sidebar.caption(f"Bases em memória: {stats_bases['cargas_snapshot']} do snapshot / {stats_bases['recargas']} cargas completas / "
+                       f"{stats_bases['atualizacoes_parciais']} atualizações parciais, versões {stats_bases['versoes']}")
+    metricas_sql = METRICAS_SQL.resumo()
+    if metricas_sql:
+        with st.sidebar.expander(f"Consultas ao banco ({METRICAS_SQL.lentas} lentas)"):
+            st.dataframe(pd.DataFrame.from_dict(metricas_sql, orient="index").round(1))
+    relatorios_memoria = obter_relatorios_memoria()
+    if relatorios_memoria:
+        with st.sidebar.expander("Memória das bases (KB por coluna)"):
+            for nome_base, relatorio in relatorios_memoria.items():
+                st.markdown(f"**{nome_base}**")
+                st.dataframe(relatorio)
 
 
 # === PÁGINA 1: INFORMATIVOS ===
@@ -267,9 +509,10 @@ if pagina_selecionada == "Navegador de Informativos":
     df_indice = carregar_dados_informativos()
     
     if df_indice is None:
-        st.error("Não foi possível carregar os dados dos informativos.")
+        mostrar_erro_carga("informativos", "dos informativos")
     else:
         st.header("Selecione os Filtros")
+        facetas = obter_facetas_informativos(geracao(df_indice), df_indice)
         
         # --- INICIALIZAÇÃO DE VARIÁVEIS DE FILTRO ---
         orgao_selecionado_cat = "Todos"
@@ -282,12 +525,7 @@ if pagina_selecionada == "Navegador de Informativos":
         with col_org_inf:
             orgao_para_filtro_arquivo = st.radio("Escolha o Órgão:", options=["STF", "STJ"], horizontal=True, key="orgao_inf")
         with col_inf_select:
-            informativos_disponiveis = ["Nenhum"]
-            if not df_indice.empty:
-                df_orgao_especifico = df_indice[df_indice['orgao'] == orgao_para_filtro_arquivo]
-                df_sorted = df_orgao_especifico.sort_values(by='num_inf', ascending=False)
-                lista_ordenada = df_sorted['arquivo_fonte'].str.replace('.docx', '.pdf').unique().tolist()
-                informativos_disponiveis += lista_ordenada
+            informativos_disponiveis = ["Nenhum"] + facetas.informativos_por_orgao.get(orgao_para_filtro_arquivo, [])
             informativo_selecionado = st.selectbox("Escolha o Informativo:", options=informativos_disponiveis, key="inf_select")
         
         disciplina_selecionada_dentro_inf = "Todas"
@@ -295,63 +533,67 @@ if pagina_selecionada == "Navegador de Informativos":
         
         if informativo_selecionado != "Nenhum":
             st.markdown("##### Filtrar conteúdo dentro do informativo selecionado:")
-            df_arquivo_selecionado = df_indice[df_indice['arquivo_fonte'] == informativo_selecionado.replace('.pdf', '.docx')]
+            arquivo_selecionado = informativo_selecionado.replace('.pdf', '.docx')
             col_disc_inf, col_ass_inf = st.columns(2)
             with col_disc_inf:
-                disciplinas_no_arquivo = ["Todas"] + sorted(df_arquivo_selecionado['disciplina'].dropna().unique())
-                disciplina_selecionada_dentro_inf = st.selectbox("Disciplina:", options=disciplinas_no_arquivo, key="disc_dentro_inf")
+                disciplinas_no_arquivo = ["Todas"] + facetas.por_arquivo.opcoes(arquivo_selecionado)
+                disciplina_selecionada_dentro_inf = st.selectbox("Disciplina:", options=disciplinas_no_arquivo, key="disc_dentro_inf",
+                                                                 format_func=rotulo_com_contagem(facetas.por_arquivo.contagens(arquivo_selecionado)))
             with col_ass_inf:
                 assuntos_no_arquivo = ["Todos"]
+                contagens_assuntos = {}
                 if disciplina_selecionada_dentro_inf != "Todas":
-                    assuntos_no_arquivo += sorted(df_arquivo_selecionado[df_arquivo_selecionado['disciplina'] == disciplina_selecionada_dentro_inf]['assunto'].dropna().unique())
-                assunto_selecionado_dentro_inf = st.selectbox("Assunto:", options=assuntos_no_arquivo, key="ass_dentro_inf")
+                    assuntos_no_arquivo += facetas.por_arquivo.opcoes(arquivo_selecionado, disciplina_selecionada_dentro_inf)
+                    contagens_assuntos = facetas.por_arquivo.contagens(arquivo_selecionado, disciplina_selecionada_dentro_inf)
+                assunto_selecionado_dentro_inf = st.selectbox("Assunto:", options=assuntos_no_arquivo, key="ass_dentro_inf",
+                                                              format_func=rotulo_com_contagem(contagens_assuntos))
         else:
             st.markdown("---")
             st.subheader("Ou Navegue por Categoria")
             col1, col2, col3 = st.columns(3)
+            # Com "Todos" os órgãos, as opções vêm da árvore geral (Disciplina → Assunto)
             with col1:
-                orgaos = ["Todos"] + sorted(df_indice['orgao'].dropna().unique())
-                orgao_selecionado_cat = st.selectbox("Órgão:", options=orgaos, key="orgao_cat")
+                orgaos = ["Todos"] + facetas.por_orgao.opcoes()
+                orgao_selecionado_cat = st.selectbox("Órgão:", options=orgaos, key="orgao_cat",
+                                                     format_func=rotulo_com_contagem(facetas.por_orgao.contagens()))
+            arvore_cat, caminho_cat = (facetas.geral, []) if orgao_selecionado_cat == "Todos" else (facetas.por_orgao, [orgao_selecionado_cat])
             with col2:
-                df_filtrado1 = df_indice[df_indice['orgao'] == orgao_selecionado_cat] if orgao_selecionado_cat != "Todos" else df_indice
-                disciplinas = ["Todas"] + sorted(df_filtrado1['disciplina'].dropna().unique())
-                disciplina_selecionada_cat = st.selectbox("Disciplina:", options=disciplinas, key="disc_cat")
+                disciplinas = ["Todas"] + arvore_cat.opcoes(*caminho_cat)
+                disciplina_selecionada_cat = st.selectbox("Disciplina:", options=disciplinas, key="disc_cat",
+                                                          format_func=rotulo_com_contagem(arvore_cat.contagens(*caminho_cat)))
             with col3:
-                df_filtrado2 = df_filtrado1[df_filtrado1['disciplina'] == disciplina_selecionada_cat] if disciplina_selecionada_cat != "Todos" else df_filtrado1
-                assuntos = ["Todos"] + sorted(df_filtrado2['assunto'].dropna().unique())
-                assunto_selecionado_cat = st.selectbox("Assunto:", options=assuntos, key="assunto_cat")
+                assuntos = ["Todos"]
+                contagens_assuntos = {}
+                if disciplina_selecionada_cat != "Todas":
+                    assuntos += arvore_cat.opcoes(*caminho_cat, disciplina_selecionada_cat)
+                    contagens_assuntos = arvore_cat.contagens(*caminho_cat, disciplina_selecionada_cat)
+                assunto_selecionado_cat = st.selectbox("Assunto:", options=assuntos, key="assunto_cat",
+                                                       format_func=rotulo_com_contagem(contagens_assuntos))
             
             st.subheader("Ou Busque por Palavra-Chave")
             termo_busca_informativos = st.text_input("Buscar por (Ctrl+F):", key="busca_informativos")
 
         st.markdown("---")
         if st.button("Buscar / Aplicar Filtros", type="primary"):
-            df_final = pd.DataFrame()
-            if informativo_selecionado != "Nenhum":
-                df_final = df_indice[df_indice['arquivo_fonte'] == informativo_selecionado.replace('.pdf', '.docx')]
-                if disciplina_selecionada_dentro_inf != "Todas": df_final = df_final[df_final['disciplina'] == disciplina_selecionada_dentro_inf]
-                if assunto_selecionado_dentro_inf != "Todos": df_final = df_final[df_final['assunto'] == assunto_selecionado_dentro_inf]
-            else:
-                df_final = df_indice.copy()
-                if orgao_selecionado_cat != "Todos": df_final = df_final[df_final['orgao'] == orgao_selecionado_cat]
-                if disciplina_selecionada_cat != "Todas": df_final = df_final[df_final['disciplina'] == disciplina_selecionada_cat]
-                if assunto_selecionado_cat != "Todos": df_final = df_final[df_final['assunto'] == assunto_selecionado_cat]
-                
-                # --- BUSCA INTELIGENTE AQUI ---
-                if termo_busca_informativos:
-                    df_final = filtrar_dados(df_final, termo_busca_informativos)
-            
-            st.session_state.df_filtrado = df_final
+            # Só a consulta fica na sessão; o resultado vem do cache compartilhado
+            st.session_state.consulta_informativos = (informativo_selecionado, disciplina_selecionada_dentro_inf, assunto_selecionado_dentro_inf,
+                                                      orgao_selecionado_cat, disciplina_selecionada_cat, assunto_selecionado_cat,
+                                                      termo_busca_informativos)
             st.session_state.page_informativos_top = 1
             st.session_state.page_informativos_bottom = 1
             st.session_state.titulo_resultados = "Resultados da Busca:" if informativo_selecionado == "Nenhum" else f"Conteúdo do Informativo: {informativo_selecionado}"
             st.session_state.filtros_ativos = (informativo_selecionado, orgao_selecionado_cat)
+            st.session_state.termo_busca_ativo = termo_busca_informativos if informativo_selecionado == "Nenhum" else ""
         
         st.subheader(st.session_state.titulo_resultados)
         
-        if not st.session_state.df_filtrado.empty:
-            df_final = st.session_state.df_filtrado
-            
+        consulta = st.session_state.consulta_informativos
+        df_final = pd.DataFrame()
+        if consulta is not None:
+            chave_consulta = consulta[:-1] + (normalizar_texto_regex(consulta[-1]).strip(),)
+            df_final = resultado_em_cache("informativos", df_indice, chave_consulta, lambda: filtrar_informativos(df_indice, consulta))
+        
+        if not df_final.empty:
             # --- ORDENAÇÃO ---
             sort_options = ["Padrão (Disciplina, Assunto)"]
             info_sel, orgao_sel = st.session_state.get('filtros_ativos', ("Nenhum", "Todos"))
@@ -359,11 +601,12 @@ if pagina_selecionada == "Navegador de Informativos":
                 if orgao_sel == "Todos": sort_options.append("Órgão (A-Z)")
                 sort_options.append("Informativo (Crescente)")
                 sort_options.append("Informativo (Decrescente)")
+                if st.session_state.termo_busca_ativo: sort_options.append("Relevância")
             sort_by = st.selectbox("Ordenar por:", options=sort_options)
             
-            if sort_by == "Padrão (Disciplina, Assunto)": df_final = df_final.sort_values(by=['disciplina', 'assunto'])
-            elif "Informativo" in sort_by: df_final = df_final.sort_values(by=['disciplina', 'num_inf'], ascending=[True, (sort_by == "Informativo (Crescente)")])
-            elif sort_by == "Órgão (A-Z)": df_final = df_final.sort_values(by=['disciplina', 'orgao', 'assunto'])
+            df_filtrado = df_final
+            df_final = resultado_em_cache("informativos", df_indice, chave_consulta + (sort_by,),
+                                          lambda: ordenar_informativos(df_filtrado, sort_by, st.session_state.termo_busca_ativo, df_indice))
 
             # Paginação e exibição
             total_items = len(df_final)
@@ -377,12 +620,15 @@ if pagina_selecionada == "Navegador de Informativos":
             df_pagina = df_final.iloc[start_index:end_index]
             st.divider()
             
+            # Um único markdown por grupo de disciplina (em vez de 3 elementos por item)
             if not df_pagina.empty:
-                for disciplina, grupo_df in df_pagina.groupby('disciplina', sort=False):
+                for disciplina, grupo_df in df_pagina.groupby('disciplina', sort=False, observed=True):
                     st.subheader(f"DISCIPLINA: {disciplina.upper()}")
                     with st.container(border=True):
-                        for _, row in grupo_df.iterrows():
-                            exibir_item_informativo_agrupado(row)
+                        try:
+                            st.markdown(markdown_informativos(grupo_df), unsafe_allow_html=True)
+                        except Exception as e:
+                            st.error(f"Erro ao exibir itens: {e}")
             if total_pages > 1:
                 st.session_state.page_informativos_bottom = st.session_state.page_informativos_top
                 st.number_input('Página', min_value=1, max_value=total_pages, step=1, key='page_informativos_bottom', label_visibility="collapsed", on_change=sync_page_widgets, args=('page_informativos_bottom', 'page_informativos_top'))
@@ -399,39 +645,39 @@ elif pagina_selecionada == "Pesquisa de Temas (STF/STJ)":
             st.toast("Dados atualizados com sucesso!", icon="✅")
             st.session_state.data_needs_refresh = False
             
-        df_stf = carregar_dados_stf()
+        df_stf = None if PAGINACAO_NO_BANCO else carregar_dados_stf()
         
-        if df_stf is not None:
+        if repo is not None and (PAGINACAO_NO_BANCO or df_stf is not None):
             st.header("Pesquisar Temas do STF")
             
-            c1, c2, c3 = st.columns([1.5, 1, 2])
+            c1, c2, c3, c4 = st.columns([1.5, 1, 2, 1])
             with c1:
-                ramos_disponiveis_stf = ["Todos"] + sorted(df_stf['Ramo do Direito'].astype(str).unique())
+                ramos_stf = carregar_ramos("temas_stf", versao_tabela("temas_stf")) if PAGINACAO_NO_BANCO else sorted(df_stf['Ramo do Direito'].astype(str).unique())
+                ramos_disponiveis_stf = ["Todos"] + ramos_stf
                 ramo_selecionado_stf = st.selectbox("Filtrar por Ramo do Direito:", options=ramos_disponiveis_stf, key="ramo_stf_filter")
             with c2:
                 opcao_tese_stf = st.radio("Exibir:", ["Com tese", "Sem teses", "Todos"], index=0, key="filtro_tese_stf")
             with c3:
                 termo_busca_stf = st.text_input("Buscar por (Ctrl+F):", key="busca_stf")
-
-            df_resultado_stf = df_stf.copy()
-            if ramo_selecionado_stf != "Todos":
-                df_resultado_stf = df_resultado_stf[df_resultado_stf['Ramo do Direito'] == ramo_selecionado_stf]
-            
-            if opcao_tese_stf == "Com tese":
-                df_resultado_stf = df_resultado_stf[df_resultado_stf['Tese'].str.strip() != '']
-            elif opcao_tese_stf == "Sem teses":
-                df_resultado_stf = df_resultado_stf[df_resultado_stf['Tese'].str.strip() == '']
-            
-            # --- BUSCA INTELIGENTE AQUI ---
-            if termo_busca_stf:
-                df_resultado_stf = filtrar_dados(df_resultado_stf, termo_busca_stf)
-                if 'page_stf_top' in st.session_state:
-                      st.session_state.page_stf_top = 1
-                      st.session_state.page_stf_bottom = 1
-            
-            df_resultado_stf = df_resultado_stf.sort_values(by='Tema', ascending=False)
-
-            total_items_stf = len(df_resultado_stf)
+            with c4:
+                # Relevância precisa da base em memória (BM25)
+                ordem_stf = st.selectbox("Ordenar por:", options=ORDENS_TEMAS[:1] if PAGINACAO_NO_BANCO else ORDENS_TEMAS, key="ordem_stf")
+
+            if PAGINACAO_NO_BANCO:
+                filtros_stf = filtros_temas(ramo_selecionado_stf, opcao_tese_stf)
+                if termo_busca_stf:
+                    st.session_state.page_stf_top = 1
+                    st.session_state.page_stf_bottom = 1
+                chaves_stf, total_items_stf = carregar_chaves_paginas("temas_stf", filtros_stf, termo_busca_stf, versao_tabela("temas_stf"))
+            else:
+                if termo_busca_stf and 'page_stf_top' in st.session_state:
+                    st.session_state.page_stf_top = 1
+                    st.session_state.page_stf_bottom = 1
+                chave_stf = (ramo_selecionado_stf, opcao_tese_stf, normalizar_texto_regex(termo_busca_stf).strip(), ordem_stf)
+                posicoes_stf = posicoes_em_cache("stf", df_stf, chave_stf, lambda: filtrar_temas(
+                    df_stf, "stf", 'Ramo do Direito', 'Tese', ramo_selecionado_stf, opcao_tese_stf, termo_busca_stf, ordem_stf))
+
+                total_items_stf = len(posicoes_stf)
             total_pages_stf = math.ceil(total_items_stf / ITEMS_PER_PAGE) if total_items_stf > 0 else 1
 
             st.number_input('Página', min_value=1, max_value=total_pages_stf, step=1, key='page_stf_top', on_change=sync_page_widgets, args=('page_stf_top', 'page_stf_bottom'))
@@ -442,12 +688,19 @@ elif pagina_selecionada == "Pesquisa de Temas (STF/STJ)":
             st.write(f"Mostrando página {st.session_state.page_stf_top} de {total_pages_stf} ({total_items_stf} temas encontrados){texto_ultimo}")
             # --------------------------------------
             
-            start_index_stf = (st.session_state.page_stf_top - 1) * ITEMS_PER_PAGE
-            end_index_stf = start_index_stf + ITEMS_PER_PAGE
-            df_pagina_stf = df_resultado_stf.iloc[start_index_stf:end_index_stf]
+            if PAGINACAO_NO_BANCO:
+                df_pagina_stf = pagina_temas_do_banco("temas_stf", chaves_stf, st.session_state.page_stf_top, filtros_stf, termo_busca_stf)
+            else:
+                start_index_stf = (st.session_state.page_stf_top - 1) * ITEMS_PER_PAGE
+                end_index_stf = start_index_stf + ITEMS_PER_PAGE
+                df_pagina_stf = df_stf.iloc[posicoes_stf[start_index_stf:end_index_stf]]
             st.divider()
             
-            if not df_pagina_stf.empty:
+            # Sem login a página inteira vai num único markdown; o admin precisa
+            # do formulário de edição em cada tema, então mantém um expander por linha
+            if not df_pagina_stf.empty and not is_admin:
+                st.markdown(markdown_temas_stf(df_pagina_stf), unsafe_allow_html=True)
+            elif not df_pagina_stf.empty:
                 for _, row in df_pagina_stf.iterrows():
                     ramo_atual = row.get('Ramo do Direito', 'Não Classificado')
                     st.markdown(f"#### Tema {row.get('Tema', 'N/A')} :blue-background[{ramo_atual}]")
@@ -459,28 +712,25 @@ elif pagina_selecionada == "Pesquisa de Temas (STF/STJ)":
                         st.markdown(f"**Leading Case:** {row.get('Leading Case', '-')}")
                         st.markdown(f"**Julgamento:** {row.get('Data do Julgamento', '-')}")
                         
-                        if is_admin:
-                            st.divider()
-                            st.write("🛠️ **Admin: Alterar Classificação**")
-                            with st.form(key=f"form_stf_{row['Tema']}"):
-                                c_edit1, c_edit2 = st.columns([3, 1])
-                                idx_inicial = 0
-                                if ramo_atual in LISTA_RAMOS_COMPLETA:
-                                    idx_inicial = LISTA_RAMOS_COMPLETA.index(ramo_atual)
-                                
-                                novo_ramo_sel = c_edit1.selectbox("Nova classificação:", 
-                                                                  options=LISTA_RAMOS_COMPLETA, 
-                                                                  index=idx_inicial)
-                                c_edit2.write("") 
-                                c_edit2.write("")
-                                if c_edit2.form_submit_button("Salvar"):
-                                    if novo_ramo_sel != ramo_atual:
-                                        atualizar_ramo_stf(row['Tema'], novo_ramo_sel)
-                                        st.rerun()
-                                    else:
-                                        st.info("Sem alterações.")
-                        elif not is_admin:
-                            st.caption("🔒 Faça login como admin na barra lateral para editar.")
+                        st.divider()
+                        st.write("🛠️ **Admin: Alterar Classificação**")
+                        with st.form(key=f"form_stf_{row['Tema']}"):
+                            c_edit1, c_edit2 = st.columns([3, 1])
+                            idx_inicial = 0
+                            if ramo_atual in LISTA_RAMOS_COMPLETA:
+                                idx_inicial = LISTA_RAMOS_COMPLETA.index(ramo_atual)
+                            
+                            novo_ramo_sel = c_edit1.selectbox("Nova classificação:", 
+                                                              options=LISTA_RAMOS_COMPLETA, 
+                                                              index=idx_inicial)
+                            c_edit2.write("") 
+                            c_edit2.write("")
+                            if c_edit2.form_submit_button("Salvar"):
+                                if novo_ramo_sel != ramo_atual:
+                                    atualizar_ramo_stf(int(row['Tema']), novo_ramo_sel)
+                                    st.rerun()
+                                else:
+                                    st.info("Sem alterações.")
                                     
                     st.divider()
 
@@ -488,75 +738,68 @@ elif pagina_selecionada == "Pesquisa de Temas (STF/STJ)":
                 st.session_state.page_stf_bottom = st.session_state.page_stf_top 
                 st.number_input('Página', min_value=1, max_value=total_pages_stf, step=1, key='page_stf_bottom', label_visibility="collapsed", on_change=sync_page_widgets, args=('page_stf_bottom', 'page_stf_top'))
         else:
-            st.error("Não foi possível carregar os dados do STF.")
+            mostrar_erro_carga("temas_stf", "do STF")
 
     # --- ABA STJ ---
     with tab_stj:
-        df_stj = carregar_dados_stj()
-        if df_stj is not None:
+        df_stj = None if PAGINACAO_NO_BANCO else carregar_dados_stj()
+        if repo is not None and (PAGINACAO_NO_BANCO or df_stj is not None):
             st.header("Pesquisar Temas do STJ")
             
-            c1, c2, c3 = st.columns([1.5, 1, 2])
+            c1, c2, c3, c4 = st.columns([1.5, 1, 2, 1])
             with c1:
-                ramos_disponiveis = ["Todos"] + sorted(df_stj['Ramo do direito'].dropna().unique())
+                ramos_stj = carregar_ramos("temas_stj", versao_tabela("temas_stj")) if PAGINACAO_NO_BANCO else sorted(df_stj['Ramo do direito'].dropna().unique())
+                ramos_disponiveis = ["Todos"] + ramos_stj
                 ramo_selecionado = st.selectbox("Filtrar por Ramo do Direito:", options=ramos_disponiveis, key="ramo_stj")
             with c2:
                 opcao_tese_stj = st.radio("Exibir:", ["Com tese", "Sem teses", "Todos"], index=0, key="filtro_tese_stj")
             with c3:
                 termo_busca_stj = st.text_input("Buscar por (Ctrl+F):", key="busca_stj")
+            with c4:
+                ordem_stj = st.selectbox("Ordenar por:", options=ORDENS_TEMAS[:1] if PAGINACAO_NO_BANCO else ORDENS_TEMAS, key="ordem_stj")
             
-            df_resultado_stj = df_stj.copy()
             if ramo_selecionado != st.session_state.get("ramo_selecionado_anterior", "Todos"):
                 st.session_state.page_stj_top = 1
                 st.session_state.page_stj_bottom = 1
             st.session_state.ramo_selecionado_anterior = ramo_selecionado
 
-            if ramo_selecionado != "Todos":
-                df_resultado_stj = df_resultado_stj[df_resultado_stj['Ramo do direito'] == ramo_selecionado]
-
-            if opcao_tese_stj == "Com tese":
-                df_resultado_stj = df_resultado_stj[df_resultado_stj['Tese Firmada'].str.strip() != '']
-            elif opcao_tese_stj == "Sem teses":
-                df_resultado_stj = df_resultado_stj[df_resultado_stj['Tese Firmada'].str.strip() == '']
-
-            # --- BUSCA INTELIGENTE AQUI ---
-            if termo_busca_stj:
-                df_resultado_stj = filtrar_dados(df_resultado_stj, termo_busca_stj)
-                st.session_state.page_stj_top = 1
-                st.session_state.page_stj_bottom = 1
-            
-            df_resultado_stj = df_resultado_stj.sort_values(by='Tema', ascending=False)
-            
-            total_items_stj = len(df_resultado_stj)
+            if PAGINACAO_NO_BANCO:
+                filtros_stj = filtros_temas(ramo_selecionado, opcao_tese_stj)
+                if termo_busca_stj:
+                    st.session_state.page_stj_top = 1
+                    st.session_state.page_stj_bottom = 1
+                chaves_stj, total_items_stj = carregar_chaves_paginas("temas_stj", filtros_stj, termo_busca_stj, versao_tabela("temas_stj"))
+            else:
+                if termo_busca_stj:
+                    st.session_state.page_stj_top = 1
+                    st.session_state.page_stj_bottom = 1
+                chave_stj = (ramo_selecionado, opcao_tese_stj, normalizar_texto_regex(termo_busca_stj).strip(), ordem_stj)
+                posicoes_stj = posicoes_em_cache("stj", df_stj, chave_stj, lambda: filtrar_temas(
+                    df_stj, "stj", 'Ramo do direito', 'Tese Firmada', ramo_selecionado, opcao_tese_stj, termo_busca_stj, ordem_stj))
+                
+                total_items_stj = len(posicoes_stj)
             total_pages_stj = math.ceil(total_items_stj / ITEMS_PER_PAGE) if total_items_stj > 0 else 1
 
             st.number_input('Página', min_value=1, max_value=total_pages_stj, step=1, key='page_stj_top', on_change=sync_page_widgets, args=('page_stj_top', 'page_stj_bottom'))
             st.write(f"Mostrando página {st.session_state.page_stj_top} de {total_pages_stj} ({total_items_stj} temas encontrados).")
             
-            start_index_stj = (st.session_state.page_stj_top - 1) * ITEMS_PER_PAGE
-            end_index_stj = start_index_stj + ITEMS_PER_PAGE
-            df_pagina_stj = df_resultado_stj.iloc[start_index_stj:end_index_stj]
+            if PAGINACAO_NO_BANCO:
+                df_pagina_stj = pagina_temas_do_banco("temas_stj", chaves_stj, st.session_state.page_stj_top, filtros_stj, termo_busca_stj)
+            else:
+                start_index_stj = (st.session_state.page_stj_top - 1) * ITEMS_PER_PAGE
+                end_index_stj = start_index_stj + ITEMS_PER_PAGE
+                df_pagina_stj = df_stj.iloc[posicoes_stj[start_index_stj:end_index_stj]]
             st.divider()
 
             if not df_pagina_stj.empty:
-                for _, row in df_pagina_stj.iterrows():
-                    ramo = row.get('Ramo do direito', 'N/A')
-                    st.markdown(f"#### Tema {row['Tema']} :blue-background[{ramo}]")
-                    st.markdown(f"**Questão submetida a julgamento:** {row.get('Questão submetida a julgamento', '-')}")
-                    st.markdown(f"**Tese Firmada:** {row.get('Tese Firmada', '-')}")
-                    
-                    with st.expander("Ver Detalhes"):
-                        st.write(f"**Processo:** {row.get('Processo')}")
-                        st.write(f"**Situação:** {row.get('Situação do Tema')}")
-                        st.write(f"**Trânsito em Julgado:** {row.get('Trânsito em Julgado', '-')}")
-                    st.divider()
+                st.markdown(markdown_temas_stj(df_pagina_stj), unsafe_allow_html=True)
             
             if total_pages_stj > 1:
                 st.session_state.page_stj_bottom = st.session_state.page_stj_top
                 st.number_input('Página', min_value=1, max_value=total_pages_stj, step=1, key='page_stj_bottom', label_visibility="collapsed", on_change=sync_page_widgets, args=('page_stj_bottom', 'page_stj_top'))
 
         else:
-            st.error("Não foi possível carregar os dados do STJ.")
+            mostrar_erro_carga("temas_stj", "do STJ")
 
 elif pagina_selecionada == "Súmulas":
     st.title("🔗 Links para Pesquisa de Súmulas")
@@ -0,0 +1,200 @@
+"""
+Bases do app (informativos, temas_stf, temas_stj) mantidas em memória no processo.
+
+Em vez de um TTL fixo, cada base guarda a versão do banco com que foi
+carregada (tabela versoes_dados, ver repositorio.registrar_alteracao). A
+consulta das versões é uma única query, feita no máximo uma vez a cada
+intervalo_verificacao segundos por processo. Quando a versão de uma tabela
+muda, só aquela base é atualizada: pelas chaves alteradas, se houver uma
+função para aplicá-las, ou recarregando a tabela inteira.
+
+Com um SnapshotBases, um processo novo começa pelo snapshot em disco e
+confere a versão no banco em segundo plano. Enquanto uma base está sendo
+atualizada, as outras sessões continuam recebendo a versão anterior.
+
+Cada carga recebe um número de geração em df.attrs["geracao"], usado pelo app
+como chave dos caches derivados (índice de busca, facetas, resultados).
+
+Uma falha na carga é registrada no log e guardada por tabela (erro()): as
+cargas rodam também nas threads da pré-carga, onde o Streamlit não exibe
+mensagens, então quem mostra o erro é a página que pediu a base.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("hub_juridico.bases")
+
+
+class BasesEmMemoria:
+    def __init__(self, repo, intervalo_verificacao=30, validade_sem_versao=86400, snapshots=None):
+        self.repo = repo
+        self.intervalo_verificacao = intervalo_verificacao
+        # Banco sem a tabela de versões: recarrega depois desse tempo (como o antigo TTL)
+        self.validade_sem_versao = validade_sem_versao
+        self.snapshots = snapshots
+        self._trava = threading.Lock()
+        self._travas_base = {}
+        self._bases = {}
+        self._erros = {}
+        self._versoes = None
+        self._consultado_em = float('-inf')
+        self._consultando = False
+        self._geracao = 0
+        self.recargas = 0
+        self.atualizacoes_parciais = 0
+        self.cargas_snapshot = 0
+
+    # --- VERSÕES NO BANCO ---
+    def versoes_banco(self, forcar=False):
+        """
+        Versões de todas as tabelas, consultadas no máximo uma vez por intervalo.
+        Se outra thread já está consultando, devolve as últimas conhecidas.
+        """
+        with self._trava:
+            vencida = time.monotonic() - self._consultado_em >= self.intervalo_verificacao
+            if self._consultando or not (forcar or vencida):
+                return self._versoes
+            self._consultando = True
+        try:
+            versoes = self.repo.versoes()
+        finally:
+            with self._trava:
+                self._consultando = False
+                self._consultado_em = time.monotonic()
+        with self._trava:
+            self._versoes = versoes
+        return versoes
+
+    def versao_banco(self, tabela, forcar=False):
+        versoes = self.versoes_banco(forcar)
+        return None if versoes is None else versoes.get(tabela, 0)
+
+    def forcar_verificacao(self):
+        """A próxima leitura consulta as versões no banco (usado depois de uma gravação do próprio app)."""
+        with self._trava:
+            self._consultado_em = float('-inf')
+
+    # --- BASES ---
+    def _trava_da_base(self, tabela):
+        with self._trava:
+            return self._travas_base.setdefault(tabela, threading.Lock())
+
+    def _desatualizada(self, item, versao):
+        if versao is None:
+            return time.monotonic() - item["carregado_em"] > self.validade_sem_versao
+        return item["versao"] != versao
+
+    def _guardar(self, tabela, df, versao, idade=0.0, salvar=True):
+        with self._trava:
+            self._geracao += 1
+            df.attrs["geracao"] = self._geracao
+        self._bases[tabela] = {"df": df, "versao": versao, "carregado_em": time.monotonic() - idade}
+        if salvar and self.snapshots is not None:
+            try:
+                self.snapshots.salvar(tabela, df, versao)
+            except Exception:
+                pass  # Sem snapshot o app só perde a partida rápida
+        return df
+
+    def _do_snapshot(self, tabela):
+        if self.snapshots is None:
+            return None
+        try:
+            lido = self.snapshots.ler(tabela)
+        except Exception:
+            return None
+        if lido is None:
+            return None
+        df, versao, idade = lido
+        self.cargas_snapshot += 1
+        return self._guardar(tabela, df, versao, idade, salvar=False)
+
+    def _atualizar(self, tabela, carregar, aplicar_alteracoes, forcar_verificacao=False):
+        """Confere a versão e, se preciso, atualiza a base (chamar com a trava da base)."""
+        versao = self.versao_banco(tabela, forcar_verificacao)
+        item = self._bases.get(tabela)
+        if item is not None and item["versao"] is None and versao == 0:
+            # A tabela de versões acabou de ser criada, mas esta tabela não mudou
+            item["versao"] = 0
+        if item is not None and not self._desatualizada(item, versao):
+            return item["df"]
+
+        df = None
+        if item is not None and aplicar_alteracoes is not None and None not in (versao, item["versao"]):
+            chaves = self.repo.alteracoes_desde(tabela, item["versao"], versao)
+            if chaves is not None:
+                df = aplicar_alteracoes(item["df"], chaves)
+                if df is not None:
+                    self.atualizacoes_parciais += 1
+        if df is None:
+            try:
+                df = carregar()
+            except Exception as e:
+                logger.exception("Falha ao carregar %s", tabela)
+                self._erros[tabela] = e
+                df = None
+            if df is None:
+                # Falha na carga: mantém a versão anterior, se houver
+                return item["df"] if item is not None else None
+            self.recargas += 1
+            self._erros.pop(tabela, None)
+        return self._guardar(tabela, df, versao)
+
+    def _revalidar(self, tabela, carregar, aplicar_alteracoes):
+        with self._trava_da_base(tabela):
+            try:
+                self._atualizar(tabela, carregar, aplicar_alteracoes, forcar_verificacao=True)
+            except Exception:
+                pass  # Continua com o snapshot; a próxima verificação tenta de novo
+
+    def obter(self, tabela, carregar, aplicar_alteracoes=None):
+        """
+        DataFrame da tabela, atualizado se a versão no banco mudou.
+        carregar(): tabela inteira. aplicar_alteracoes(df, chaves): novo
+        DataFrame com as linhas dessas chaves relidas (não altera o df recebido).
+        """
+        trava = self._trava_da_base(tabela)
+        item = self._bases.get(tabela)
+        if item is None:
+            with trava:
+                if tabela not in self._bases:
+                    df = self._do_snapshot(tabela)
+                    if df is not None:
+                        threading.Thread(target=self._revalidar, args=(tabela, carregar, aplicar_alteracoes),
+                                         daemon=True).start()
+                        return df
+                return self._atualizar(tabela, carregar, aplicar_alteracoes)
+
+        # Já há uma versão em memória: quem estiver atualizando não bloqueia as outras sessões
+        if not trava.acquire(blocking=False):
+            return item["df"]
+        try:
+            return self._atualizar(tabela, carregar, aplicar_alteracoes)
+        finally:
+            trava.release()
+
+    def erro(self, tabela):
+        """Exceção da última carga da tabela que falhou (None se a última deu certo)."""
+        return self._erros.get(tabela)
+
+    def pre_carregar(self, fontes):
+        """
+        Carrega as bases em paralelo, uma thread (e uma conexão do pool) por
+        tabela, sem bloquear quem chamou. fontes: {tabela: (carregar, aplicar_alteracoes)}.
+        Quem pedir uma base ainda em carga espera só pela trava daquela tabela.
+        """
+        executor = ThreadPoolExecutor(max_workers=max(len(fontes), 1), thread_name_prefix="pre_carga")
+        futuros = {tabela: executor.submit(self.obter, tabela, *fonte) for tabela, fonte in fontes.items()}
+        executor.shutdown(wait=False)
+        return futuros
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                "versoes": {tabela: item["versao"] for tabela, item in self._bases.items()},
+                "recargas": self.recargas,
+                "atualizacoes_parciais": self.atualizacoes_parciais,
+                "cargas_snapshot": self.cargas_snapshot,
+            }
@@ -0,0 +1,55 @@
+"""
+Compara a leitura dos informativos pelo python-docx (caminho antigo) com o
+leitor_docx (iterparse), conferindo que os dois dão os mesmos parágrafos.
+Uso: python benchmark_docx.py [pasta]   (padrão: a pasta do processador)
+"""
+import sys
+import time
+from pathlib import Path
+from docx import Document
+from leitor_docx import paragrafos_docx
+from processar_informativos_inteligente import PASTA_PRINCIPAL_INFORMATIVOS
+
+
+def pelo_python_docx(caminho):
+    return [(para.style.name, para.text) for para in Document(caminho).paragraphs]
+
+
+def pelo_leitor_docx(caminho):
+    return list(paragrafos_docx(caminho))
+
+
+def main():
+    pasta = Path(sys.argv[1] if len(sys.argv) > 1 else PASTA_PRINCIPAL_INFORMATIVOS)
+    arquivos = sorted(pasta.rglob("*.docx"))
+    if not arquivos:
+        print(f"Nenhum .docx encontrado em '{pasta}'.")
+        return
+
+    tempos = {"python-docx": 0.0, "leitor_docx": 0.0}
+    paragrafos, divergentes = 0, []
+    for caminho in arquivos:
+        inicio = time.perf_counter()
+        antigo = pelo_python_docx(caminho)
+        tempos["python-docx"] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        novo = pelo_leitor_docx(caminho)
+        tempos["leitor_docx"] += time.perf_counter() - inicio
+
+        paragrafos += len(antigo)
+        if antigo != novo:
+            divergentes.append(caminho.name)
+
+    print(f"{len(arquivos)} arquivos, {paragrafos} parágrafos")
+    for nome, segundos in tempos.items():
+        print(f"  {nome:<12} {segundos:7.2f} s  ({segundos / len(arquivos) * 1000:.1f} ms por arquivo)")
+    print(f"  ganho: {tempos['python-docx'] / tempos['leitor_docx']:.1f}x")
+    if divergentes:
+        print(f"ATENÇÃO: {len(divergentes)} arquivo(s) com resultado diferente: {', '.join(divergentes[:10])}")
+    else:
+        print("Mesmos parágrafos (estilo e texto) em todos os arquivos.")
+
+
+if __name__ == "__main__":
+    main()
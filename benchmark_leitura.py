@@ -0,0 +1,39 @@
+"""
+Compara a leitura das tabelas do app pelo read_sql_query (caminho antigo)
+com a leitura em massa via COPY (leitura_em_massa.ler_sql).
+Uso: python benchmark_leitura.py [repetições]
+"""
+import sys
+import time
+import pandas as pd
+from sqlalchemy import text
+from db_config import create_db_engine
+from leitura_em_massa import ler_sql
+from repositorio import TABELAS, RepositorioSQL
+
+
+def medir(funcao, repeticoes):
+    """Melhor tempo (s) entre as repetições, e o resultado da última."""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    engine = create_db_engine()
+    repo = RepositorioSQL(engine)
+    print(f"Banco: {engine.dialect.name} | melhor de {repeticoes} leituras\n")
+    print(f"{'tabela':<14}{'linhas':>8}{'read_sql (s)':>14}{'COPY (s)':>10}{'ganho':>8}")
+    for tabela in TABELAS:
+        sql = repo._select(tabela)
+        t_antigo, df = medir(lambda: pd.read_sql_query(text(sql), engine), repeticoes)
+        t_copy, _ = medir(lambda: ler_sql(engine, sql), repeticoes)
+        print(f"{tabela:<14}{len(df):>8}{t_antigo:>14.3f}{t_copy:>10.3f}{t_antigo / t_copy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Cache em disco dos embeddings do sentence-transformer.
+
+importar_stf e relatorio_alteracoes codificam, a cada execução, os mesmos
+textos de treino (e o relatório, todos os temas do STF). Aqui cada vetor é
+guardado uma vez, pela chave (modelo, SHA-256 do texto): na pasta do modelo
+ficam vetores.f32 (matriz float32, lida por memmap) e hashes.txt (o hash de
+cada linha da matriz, na mesma ordem). Textos novos são acrescentados no fim
+dos dois arquivos. O modelo só é carregado se houver algum texto fora do cache.
+
+Uma linha de hashes.txt só é escrita depois do vetor correspondente, então
+uma execução interrompida no meio perde, no máximo, os vetores do último lote.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import numpy as np
+
+NOME_MODELO = 'paraphrase-multilingual-MiniLM-L12-v2'
+PASTA_CACHE = ".cache_embeddings"
+
+
+def hash_texto(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheEmbeddings:
+    def __init__(self, nome_modelo=NOME_MODELO, diretorio=PASTA_CACHE, device='cpu'):
+        self.nome_modelo = nome_modelo
+        self.device = device
+        self.diretorio = os.path.join(diretorio, re.sub(r"[^\w.-]+", "_", nome_modelo))
+        self._modelo = None
+        self._meta = self._ler_meta()
+        self._linhas = {}
+        self._vetores = None
+        self._abrir()
+        # Estatísticas desta execução
+        self.acertos = self.faltas = 0
+        self.segundos_codificando = 0.0
+
+    # --- ARQUIVOS ---
+    def _caminho(self, nome):
+        return os.path.join(self.diretorio, nome)
+
+    def _ler_meta(self):
+        try:
+            with open(self._caminho("meta.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _gravar_meta(self):
+        temporario = self._caminho(f"meta.json.{os.getpid()}.tmp")
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f)
+        os.replace(temporario, self._caminho("meta.json"))
+
+    def _abrir(self):
+        """Lê hashes.txt e mapeia vetores.f32 (só as linhas completas nos dois arquivos)."""
+        dimensao = self._meta.get("dimensao")
+        if not dimensao or not os.path.exists(self._caminho("hashes.txt")):
+            return
+        with open(self._caminho("hashes.txt"), 'r', encoding='ascii') as f:
+            hashes = f.read().split()
+        linhas = min(len(hashes), os.path.getsize(self._caminho("vetores.f32")) // (4 * dimensao))
+        self._linhas = {h: i for i, h in enumerate(hashes[:linhas])}
+        if linhas:
+            self._vetores = np.memmap(self._caminho("vetores.f32"), dtype=np.float32, mode='r', shape=(linhas, dimensao))
+
+    def _acrescentar(self, hashes, vetores):
+        os.makedirs(self.diretorio, exist_ok=True)
+        if not self._meta.get("dimensao"):
+            self._meta["dimensao"] = int(vetores.shape[1])
+        with open(self._caminho("vetores.f32"), 'ab') as f:
+            f.write(np.ascontiguousarray(vetores, dtype=np.float32).tobytes())
+        with open(self._caminho("hashes.txt"), 'a', encoding='ascii') as f:
+            f.write("".join(h + "\n" for h in hashes))
+        self._abrir()
+
+    # --- CODIFICAÇÃO ---
+    @property
+    def modelo(self):
+        """SentenceTransformer, carregado só na primeira vez que for preciso."""
+        if self._modelo is None:
+            from sentence_transformers import SentenceTransformer
+            self._modelo = SentenceTransformer(self.nome_modelo, device=self.device)
+        return self._modelo
+
+    def codificar(self, textos):
+        """Matriz float32 (um vetor por texto); só os textos fora do cache passam pelo modelo."""
+        hashes = [hash_texto(texto) for texto in textos]
+        faltantes = {}
+        for h, texto in zip(hashes, textos):
+            if h not in self._linhas and h not in faltantes:
+                faltantes[h] = texto
+        self.faltas += len(faltantes)
+        self.acertos += len(textos) - len(faltantes)
+
+        if faltantes:
+            inicio = time.perf_counter()
+            novos = self.modelo.encode(list(faltantes.values()), convert_to_numpy=True)
+            segundos = time.perf_counter() - inicio
+            self.segundos_codificando += segundos
+            # Média por texto, para estimar o tempo poupado nas execuções só com acertos
+            self._meta["codificados"] = self._meta.get("codificados", 0) + len(faltantes)
+            self._meta["segundos"] = self._meta.get("segundos", 0.0) + segundos
+            self._acrescentar(list(faltantes), novos)
+            self._gravar_meta()
+
+        if not textos:
+            return np.zeros((0, self._meta.get("dimensao", 0)), dtype=np.float32)
+        return np.asarray(self._vetores[[self._linhas[h] for h in hashes]])
+
+    def resumo(self):
+        """Imprime a taxa de acerto e o tempo de codificação poupado nesta execução."""
+        total = self.acertos + self.faltas
+        if not total:
+            return
+        por_texto = self._meta.get("segundos", 0.0) / max(self._meta.get("codificados", 0), 1)
+        print(f"Cache de embeddings: {self.acertos}/{total} acerto(s) ({self.acertos / total:.0%}), "
+              f"{self.faltas} texto(s) codificado(s) em {self.segundos_codificando:.1f} s, "
+              f"~{self.acertos * por_texto:.1f} s poupado(s).")
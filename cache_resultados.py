@@ -0,0 +1,72 @@
+"""
+Cache de resultados de busca compartilhado por todas as sessões do processo.
+
+Guarda só arrays compactos com as posições das linhas do resultado (na ordem
+de exibição), com expulsão LRU limitada por quantidade de entradas e bytes.
+Cada base tem uma versão: invalidar(base) muda a versão e descarta as
+entradas antigas daquela base, sem afetar as demais.
+"""
+import threading
+from collections import OrderedDict
+
+
+class CacheResultados:
+    def __init__(self, max_entradas=512, max_bytes=64 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._versoes = {}
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.expulsoes = 0
+
+    def _chave(self, base, chave):
+        return (base, self._versoes.get(base, 0)) + tuple(chave)
+
+    def obter(self, base, chave):
+        """Array de posições guardado para a consulta, ou None."""
+        with self._trava:
+            chave_completa = self._chave(base, chave)
+            valor = self._itens.get(chave_completa)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave_completa)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, base, chave, posicoes):
+        with self._trava:
+            chave_completa = self._chave(base, chave)
+            antigo = self._itens.pop(chave_completa, None)
+            if antigo is not None:
+                self._bytes -= antigo.nbytes
+            if posicoes.nbytes > self.max_bytes:
+                return
+            self._itens[chave_completa] = posicoes
+            self._bytes += posicoes.nbytes
+            while len(self._itens) > self.max_entradas or self._bytes > self.max_bytes:
+                _, expulso = self._itens.popitem(last=False)
+                self._bytes -= expulso.nbytes
+                self.expulsoes += 1
+
+    def invalidar(self, base):
+        """Nova versão da base: os resultados antigos dela deixam de valer."""
+        with self._trava:
+            self._versoes[base] = self._versoes.get(base, 0) + 1
+            for chave in [c for c in self._itens if c[0] == base]:
+                self._bytes -= self._itens.pop(chave).nbytes
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "entradas": len(self._itens),
+                "bytes": self._bytes,
+                "expulsoes": self.expulsoes,
+            }
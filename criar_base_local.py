@@ -0,0 +1,41 @@
+"""
+Copia as tabelas usadas pelo app do banco principal para um arquivo SQLite local
+(com busca FTS5). Depois, para rodar o app sem o Supabase, use no secrets.toml:
+DB_CONNECTION_STRING = "sqlite:///hub_juridico.db"
+"""
+import os
+from sqlalchemy import create_engine
+from db_config import create_db_engine
+from leitura_em_massa import ler_sql
+from repositorio import TABELAS, RepositorioSQLite, registrar_alteracao
+
+ARQUIVO_SQLITE = os.environ.get("DB_SQLITE_LOCAL", "hub_juridico.db")
+
+# Colunas extras que não são lidas pelo app, mas são usadas pela área admin
+COLUNAS_EXTRAS = {"temas_stf": ["data_ultima_alteracao"]}
+
+
+def criar_base_local():
+    print("Conectando ao banco de dados principal...")
+    origem = create_db_engine()
+    destino = RepositorioSQLite(create_engine(f"sqlite:///{ARQUIVO_SQLITE}"))
+
+    for tabela, config in TABELAS.items():
+        colunas = config["colunas"] + COLUNAS_EXTRAS.get(tabela, [])
+        colunas_sql = ", ".join(f'"{c}"' for c in colunas)
+        print(f"Copiando '{tabela}'...")
+        df = ler_sql(origem, f"SELECT {colunas_sql} FROM {tabela}")
+        destino.importar_tabela(tabela, df)
+        print(f"  {len(df)} registros.")
+
+    print("Montando índices FTS5...")
+    destino.preparar_busca()
+    destino.criar_indice_ultima_alteracao()
+    with destino.engine.begin() as conn:
+        for tabela in TABELAS:
+            registrar_alteracao(conn, tabela)
+    print(f"✅ Base local criada em '{ARQUIVO_SQLITE}'.")
+
+
+if __name__ == "__main__":
+    criar_base_local()
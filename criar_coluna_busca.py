@@ -0,0 +1,41 @@
+import pandas as pd
+from sqlalchemy import text
+from db_config import create_db_engine
+from repositorio import RepositorioPostgres
+from normalizacao import (montar_coluna_busca, COLUNAS_BUSCA_INFORMATIVOS,
+                          COLUNAS_BUSCA_STF, COLUNAS_BUSCA_STJ)
+
+# Tabela -> colunas que formam o texto de busca
+TABELAS_BUSCA = {
+    "informativos": COLUNAS_BUSCA_INFORMATIVOS,
+    "temas_stf": COLUNAS_BUSCA_STF,
+    "temas_stj": COLUNAS_BUSCA_STJ,
+}
+
+engine = create_db_engine()
+
+for tabela, colunas in TABELAS_BUSCA.items():
+    print(f"--- {tabela} ---")
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS busca TEXT'))
+
+        # Preenche a coluna nas linhas antigas (identificadas pelo ctid do Postgres)
+        colunas_sql = ", ".join(f'"{c}"' for c in colunas)
+        df = pd.read_sql_query(text(f'SELECT ctid::text AS linha_ctid, {colunas_sql} FROM {tabela}'), conn)
+        if df.empty:
+            print("Tabela vazia, nada a preencher.")
+            continue
+        if 'Tema' in df.columns:
+            df['Tema'] = pd.to_numeric(df['Tema'], errors='coerce').fillna(0).astype(int)
+        if 'Ramo do Direito' in df.columns:
+            df['Ramo do Direito'] = df['Ramo do Direito'].fillna('Não Classificado')
+        df['busca'] = montar_coluna_busca(df, colunas)
+
+        df[['linha_ctid', 'busca']].to_sql('busca_temp', conn, if_exists='replace', index=False)
+        conn.execute(text(f'UPDATE {tabela} t SET busca = b.busca FROM busca_temp b WHERE t.ctid = b.linha_ctid::tid'))
+        conn.execute(text('DROP TABLE busca_temp'))
+        print(f"✅ Coluna 'busca' preenchida em {len(df)} registros.")
+
+# Índices de trigramas para a busca feita direto no banco (LIKE '%...%')
+RepositorioPostgres(engine).criar_indices_busca()
+print("✅ Índices de busca (pg_trgm) criados.")
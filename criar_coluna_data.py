@@ -1,5 +1,6 @@
 from sqlalchemy import text
 from db_config import create_db_engine
+from repositorio import RepositorioPostgres
 
 engine = create_db_engine()
 
@@ -8,6 +9,11 @@ with engine.connect() as conn:
     try:
         # Tenta adicionar a coluna. Se já existir, vai dar erro (e ignoramos)
         conn.execute(text('ALTER TABLE temas_stf ADD COLUMN IF NOT EXISTS "data_ultima_alteracao" TIMESTAMP'))
+        conn.commit()
         print("✅ Coluna 'data_ultima_alteracao' criada com sucesso!")
     except Exception as e:
-        print(f"Aviso (pode ignorar se a coluna já existe): {e}")
\ No newline at end of file
+        print(f"Aviso (pode ignorar se a coluna já existe): {e}")
+
+# Índice para a consulta do "último tema alterado manualmente"
+RepositorioPostgres(engine).criar_indice_ultima_alteracao()
+print("✅ Índice em 'data_ultima_alteracao' criado.")
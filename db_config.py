@@ -1,5 +1,27 @@
-"""Carrega DB_CONNECTION_STRING de variável de ambiente ou arquivo .env local."""
+"""
+Carrega DB_CONNECTION_STRING de variável de ambiente ou arquivo .env local
+e monta o engine usado pelo app e por todos os scripts.
+"""
+import logging
 import os
+import threading
+import time
+
+# --- POOL E TIMEOUTS (Supabase) ---
+# O pooler do Supabase derruba conexões ociosas; o pre-ping descarta a conexão
+# morta antes de entregá-la e o recycle renova as antigas antes disso.
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+POOL_MAX_OVERFLOW = int(os.environ.get("DB_POOL_MAX_OVERFLOW", 5))
+POOL_TIMEOUT = 10          # segundos esperando uma conexão livre do pool
+POOL_RECYCLE = 300         # segundos de vida de uma conexão
+CONNECT_TIMEOUT = int(os.environ.get("DB_CONNECT_TIMEOUT", 10))
+# Limite de cada consulta do app (os scripts de carga e migração não têm limite)
+STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 60000))
+
+# Consultas acima disso são logadas como WARNING (as demais em DEBUG)
+CONSULTA_LENTA_MS = int(os.environ.get("DB_CONSULTA_LENTA_MS", 1000))
+
+logger = logging.getLogger("hub_juridico.sql")
 
 
 def get_db_connection_string() -> str:
@@ -19,6 +41,116 @@ def get_db_connection_string() -> str:
     return conn
 
 
-def create_db_engine():
+# --- MÉTRICAS DAS CONSULTAS ---
+class MetricasConsultas:
+    """Totais por tipo de comando (SELECT, UPDATE...) de todas as consultas do processo."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._por_comando = {}
+        self.lentas = 0
+
+    def registrar(self, comando, duracao_ms, linhas):
+        with self._trava:
+            item = self._por_comando.setdefault(comando, {"consultas": 0, "ms": 0.0, "max_ms": 0.0, "linhas": 0})
+            item["consultas"] += 1
+            item["ms"] += duracao_ms
+            item["max_ms"] = max(item["max_ms"], duracao_ms)
+            item["linhas"] += max(linhas, 0)
+            if duracao_ms >= CONSULTA_LENTA_MS:
+                self.lentas += 1
+
+    def resumo(self):
+        with self._trava:
+            return {comando: dict(item) for comando, item in self._por_comando.items()}
+
+
+METRICAS = MetricasConsultas()
+
+
+def registrar_consulta(statement, duracao_ms, linhas):
+    """Soma a consulta em METRICAS e no log (também chamada pelos COPY feitos direto no cursor)."""
+    comando = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?"
+    METRICAS.registrar(comando, duracao_ms, linhas)
+    nivel = logging.WARNING if duracao_ms >= CONSULTA_LENTA_MS else logging.DEBUG
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, "%.1f ms, %d linhas: %s", duracao_ms, linhas, " ".join(statement.split())[:200])
+
+
+def _registrar_latencia(engine):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _inicio(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _fim(conn, cursor, statement, parameters, context, executemany):
+        duracao_ms = (time.perf_counter() - conn.info["inicio_consulta"].pop()) * 1000
+        registrar_consulta(statement, duracao_ms, cursor.rowcount if cursor.rowcount is not None else -1)
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        # A consulta que falhou não passa pelo after_cursor_execute
+        inicio = contexto.connection.info.get("inicio_consulta") if contexto.connection is not None else None
+        if inicio:
+            inicio.pop()
+
+
+# --- TIMEOUT DAS CONSULTAS ---
+# SET LOCAL vale só para a transação corrente: no pooler do Supabase (modo
+# transação) cada transação pode cair em outra conexão do servidor, e um SET
+# de sessão não a acompanharia (e ficaria na conexão, para outros clientes).
+def definir_timeout(cursor, timeout_ms):
+    """SET LOCAL statement_timeout no cursor DBAPI (abre a transação, se preciso)."""
+    if timeout_ms:
+        cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def timeout_do_engine(engine):
+    return engine.get_execution_options().get("statement_timeout_ms")
+
+
+def _definir_statement_timeout(engine):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "begin")
+    def _ao_iniciar(conn):
+        # Opção de execução: conn.execution_options(statement_timeout_ms=None) tira o limite
+        timeout_ms = conn.get_execution_options().get("statement_timeout_ms")
+        if timeout_ms:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                definir_timeout(cursor, timeout_ms)
+            finally:
+                cursor.close()
+
+
+def create_db_engine(connection_string=None, statement_timeout_ms=None):
+    """
+    Engine compartilhado (um por processo: o app guarda o seu em cache_resource).
+    No Postgres: pool com pre-ping, recycle e timeout de conexão; com
+    statement_timeout_ms (o app passa STATEMENT_TIMEOUT_MS), cada transação
+    ganha esse limite por SET LOCAL. Os scripts, sem o parâmetro, não têm limite.
+    Em qualquer banco: latência e linhas de cada consulta em METRICAS e no log.
+    """
     from sqlalchemy import create_engine
-    return create_engine(get_db_connection_string())
+    from sqlalchemy.engine import make_url
+
+    url = make_url(connection_string or get_db_connection_string())
+    if url.get_backend_name() == "postgresql":
+        engine = create_engine(
+            url,
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=True,
+            connect_args={"connect_timeout": CONNECT_TIMEOUT},
+            execution_options={"statement_timeout_ms": statement_timeout_ms},
+        )
+        _definir_statement_timeout(engine)
+    else:
+        engine = create_engine(url)
+    _registrar_latencia(engine)
+    return engine
@@ -0,0 +1,175 @@
+"""
+Ingestão por diferença das linhas de um informativo modificado.
+
+Cada linha de informativos tem uma chave estável dentro do arquivo
+(chave_linha, dada quando a linha é inserida e nunca mudada), a posição no
+documento (posicao_linha, com folga entre linhas vizinhas) e o hash do
+conteúdo (hash_linha). Quando um arquivo muda, as linhas extraídas são
+alinhadas com as do banco, em ordem de posição, pela sequência de hashes
+(difflib): linhas iguais ficam intactas, trechos trocados viram UPDATE e o
+que sobra vira INSERT ou DELETE. Uma linha nova no meio do arquivo ganha uma
+posição entre as vizinhas, sem mexer nas seguintes; só quando não há folga
+as posições do arquivo são refeitas (e contadas como renumeradas).
+
+Linhas antigas, gravadas antes das chaves, são regravadas uma vez.
+"""
+import hashlib
+from difflib import SequenceMatcher
+import pandas as pd
+from sqlalchemy import inspect, text
+from gravacao_em_massa import gravar_df
+
+COLUNAS_CONTEUDO = ["orgao", "disciplina", "assunto", "tese"]
+COLUNAS_ATUALIZADAS = COLUNAS_CONTEUDO + ["busca", "hash_linha"]
+ARQUIVOS_POR_CONSULTA = 500
+# Distância entre as posições de linhas vizinhas, quando um arquivo é numerado
+PASSO_POSICAO = 1024
+
+
+def hashes_linhas(df):
+    """Hash curto do conteúdo de cada linha (órgão, disciplina, assunto e tese)."""
+    conteudo = df[COLUNAS_CONTEUDO[0]].astype(str)
+    for coluna in COLUNAS_CONTEUDO[1:]:
+        conteudo = conteudo + "\x1f" + df[coluna].astype(str)
+    return [hashlib.sha1(texto.encode("utf-8")).hexdigest()[:16] for texto in conteudo]
+
+
+def preparar_colunas(conn):
+    """Cria chave_linha/posicao_linha/hash_linha e o índice por (arquivo_fonte, chave_linha), se faltarem."""
+    existentes = {coluna["name"] for coluna in inspect(conn).get_columns("informativos")}
+    if "chave_linha" not in existentes:
+        conn.execute(text("ALTER TABLE informativos ADD COLUMN chave_linha INTEGER"))
+    if "posicao_linha" not in existentes:
+        conn.execute(text("ALTER TABLE informativos ADD COLUMN posicao_linha INTEGER"))
+    if "hash_linha" not in existentes:
+        conn.execute(text("ALTER TABLE informativos ADD COLUMN hash_linha TEXT"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS idx_informativos_arquivo_chave ON informativos (arquivo_fonte, chave_linha)"))
+
+
+def _linhas_no_banco(conn, arquivos):
+    """{arquivo: [(chave_linha, posicao_linha, hash_linha)] em ordem de documento}."""
+    por_arquivo = {arquivo: [] for arquivo in arquivos}
+    for inicio in range(0, len(arquivos), ARQUIVOS_POR_CONSULTA):
+        lote = arquivos[inicio:inicio + ARQUIVOS_POR_CONSULTA]
+        marcadores = ", ".join(f":a{i}" for i in range(len(lote)))
+        linhas = conn.execute(text(f"SELECT arquivo_fonte, chave_linha, posicao_linha, hash_linha FROM informativos "
+                                   f"WHERE arquivo_fonte IN ({marcadores})"),
+                              {f"a{i}": a for i, a in enumerate(lote)})
+        for arquivo, chave, posicao, hash_ in linhas:
+            por_arquivo[arquivo].append((chave, posicao, hash_))
+    for linhas in por_arquivo.values():
+        # Sem posição (linhas de antes da coluna), vale a ordem das chaves
+        if any(posicao is None for _, posicao, _ in linhas):
+            linhas.sort(key=lambda item: (item[0] is None, item[0] or 0))
+        else:
+            linhas.sort(key=lambda item: item[1])
+    return por_arquivo
+
+
+def _diferenca(antigas, novas):
+    """
+    Alinha os hashes do banco (em ordem de documento) com os hashes novos.
+    Retorna (iguais [(i antigo, j novo)], atualizar [(i, j)], inserir [j], apagar [i]).
+    """
+    iguais, atualizar, inserir, apagar = [], [], [], []
+    for operacao, i1, i2, j1, j2 in SequenceMatcher(None, antigas, novas, autojunk=False).get_opcodes():
+        if operacao == "equal":
+            iguais.extend((i1 + k, j1 + k) for k in range(i2 - i1))
+            continue
+        pares = min(i2 - i1, j2 - j1) if operacao == "replace" else 0
+        atualizar.extend((i1 + k, j1 + k) for k in range(pares))
+        apagar.extend(range(i1 + pares, i2))
+        inserir.extend(range(j1 + pares, j2))
+    return iguais, atualizar, inserir, apagar
+
+
+def _posicoes(total, fixas):
+    """
+    Posições para as `total` linhas novas, mantendo as das linhas já gravadas
+    (fixas: {índice novo: posição}) e pondo as inseridas entre as vizinhas.
+    Se faltar folga entre duas vizinhas, o arquivo inteiro é numerado de novo.
+    """
+    posicoes = [fixas.get(j) for j in range(total)]
+    anterior, j = 0, 0
+    while j < total:
+        if posicoes[j] is not None:
+            if posicoes[j] <= anterior:
+                break
+            anterior, j = posicoes[j], j + 1
+            continue
+        fim = j
+        while fim < total and posicoes[fim] is None:
+            fim += 1
+        quantas = fim - j
+        seguinte = posicoes[fim] if fim < total else anterior + PASSO_POSICAO * (quantas + 1)
+        if seguinte - anterior <= quantas:
+            break
+        for k in range(quantas):
+            posicoes[j + k] = anterior + (seguinte - anterior) * (k + 1) // (quantas + 1)
+        j = fim
+    else:
+        return posicoes
+    return [PASSO_POSICAO * (j + 1) for j in range(total)]
+
+
+def aplicar_diferencas(conn, df_novos, arquivos):
+    """
+    Leva para o banco as linhas extraídas (df_novos) dos arquivos reprocessados,
+    mexendo só no que mudou. Retorna {inseridas, atualizadas, apagadas, renumeradas,
+    inalteradas}; renumeradas são as linhas em que só a posição foi regravada.
+    """
+    preparar_colunas(conn)
+    df_novos = df_novos.assign(hash_linha=hashes_linhas(df_novos))
+    no_banco = _linhas_no_banco(conn, list(arquivos))
+    grupos = dict(tuple(df_novos.groupby("arquivo_fonte", sort=False))) if len(df_novos) else {}
+
+    inserir, atualizar, apagar, regravar, renumerar = [], [], [], [], []
+    inalteradas = 0
+    for arquivo in arquivos:
+        novas = grupos.get(arquivo, df_novos.iloc[0:0]).reset_index(drop=True)
+        antigas = no_banco[arquivo]
+        if any(chave is None for chave, _, _ in antigas):
+            # Linhas de antes das chaves: o arquivo é regravado inteiro uma vez
+            regravar.append(arquivo)
+            apagar.extend((arquivo, None) for _ in antigas)
+            inserir.append(novas.assign(chave_linha=range(1, len(novas) + 1),
+                                        posicao_linha=[PASSO_POSICAO * (j + 1) for j in range(len(novas))]))
+            continue
+
+        iguais, pares, novos_indices, apagados = _diferenca([hash_ for _, _, hash_ in antigas], novas["hash_linha"].tolist())
+        mantidas = iguais + pares
+        posicoes = _posicoes(len(novas), {j: antigas[i][1] for i, j in mantidas if antigas[i][1] is not None})
+        inalteradas += sum(antigas[i][1] == posicoes[j] for i, j in iguais)
+        # Só a posição muda (a chave fica): quando faltou folga ou a linha ainda não tinha posição
+        renumerar.extend({"arquivo": arquivo, "chave": antigas[i][0], "posicao": posicoes[j]}
+                         for i, j in mantidas if antigas[i][1] != posicoes[j])
+        if novos_indices:
+            # Chaves novas depois da maior já usada no arquivo: as existentes não mudam
+            proxima = max((chave for chave, _, _ in antigas), default=0) + 1
+            inserir.append(novas.iloc[novos_indices].assign(chave_linha=range(proxima, proxima + len(novos_indices)),
+                                                            posicao_linha=[posicoes[j] for j in novos_indices]))
+        for i, j in pares:
+            linha = novas.iloc[j]
+            atualizar.append({**{c: linha[c] for c in COLUNAS_ATUALIZADAS}, "arquivo_fonte": arquivo, "chave_linha": antigas[i][0]})
+        apagar.extend((arquivo, antigas[i][0]) for i in apagados)
+
+    if regravar:
+        conn.execute(text("DELETE FROM informativos WHERE arquivo_fonte = :arquivo"), [{"arquivo": a} for a in regravar])
+    chaves_apagadas = [{"arquivo": a, "chave": c} for a, c in apagar if c is not None]
+    if chaves_apagadas:
+        conn.execute(text("DELETE FROM informativos WHERE arquivo_fonte = :arquivo AND chave_linha = :chave"), chaves_apagadas)
+    if atualizar:
+        atribuicoes = ", ".join(f"{c} = :{c}" for c in COLUNAS_ATUALIZADAS)
+        conn.execute(text(f"UPDATE informativos SET {atribuicoes} WHERE arquivo_fonte = :arquivo_fonte AND chave_linha = :chave_linha"),
+                     atualizar)
+    if renumerar:
+        conn.execute(text("UPDATE informativos SET posicao_linha = :posicao WHERE arquivo_fonte = :arquivo AND chave_linha = :chave"),
+                     renumerar)
+    linhas_inseridas = 0
+    if inserir:
+        df_inserir = pd.concat(inserir, ignore_index=True)
+        if len(df_inserir):
+            linhas_inseridas = gravar_df(conn, df_inserir, "informativos")
+
+    return {"inseridas": linhas_inseridas, "atualizadas": len(atualizar), "apagadas": len(apagar),
+            "renumeradas": len(renumerar), "inalteradas": inalteradas}
@@ -0,0 +1,105 @@
+"""
+Atualização incremental dos temas do STF já cadastrados.
+
+A planilha nova (RepercussaoGeral.xls) é comparada com temas_stf pelo hash do
+conteúdo de cada tema, nas colunas que vêm da planilha (Tese, Situação do
+Tema, Data do Julgamento...). Só os temas com hash diferente são examinados,
+e só as colunas que de fato mudaram são gravadas, um UPDATE em lote por
+coluna. 'Ramo do Direito' e data_ultima_alteracao (as edições manuais feitas
+no app) nunca são tocadas; a coluna 'busca' é refeita para os temas alterados.
+"""
+import hashlib
+import pandas as pd
+from sqlalchemy import text
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_STF
+
+# Colunas que vêm da planilha do STF (as demais são do app)
+COLUNAS_PLANILHA = ['Título', 'Descrição', 'Tese', 'Assuntos', 'Leading Case', 'Situação do Tema', 'Data do Julgamento']
+TEMAS_POR_COMANDO = 500
+
+
+def textos_para_gravar(serie):
+    """
+    Valores como são gravados em temas_stf: texto, com nulos, 'nan' e 'None'
+    como '' (a mesma representação nos temas novos e nos alterados).
+    """
+    return serie.astype(object).where(serie.notna(), '').astype(str).replace({'nan': '', 'None': '', '<NA>': ''})
+
+
+def _textos(serie):
+    """Valores para comparar: como gravados, sem espaços nas pontas."""
+    return textos_para_gravar(serie).str.strip()
+
+
+def _hashes(df, colunas):
+    conteudo = _textos(df[colunas[0]])
+    for coluna in colunas[1:]:
+        conteudo = conteudo + "\x1f" + _textos(df[coluna])
+    return pd.Series([hashlib.sha1(t.encode("utf-8")).hexdigest() for t in conteudo], index=df.index)
+
+
+def comparar_temas(df_planilha, df_banco):
+    """
+    Compara a planilha com as linhas de temas_stf (as duas com a coluna 'Tema' inteira).
+    Retorna um dict com: novos (DataFrame da planilha), alteracoes ({coluna: {tema: valor novo}}),
+    alterados (temas com alguma coluna diferente), inalterados e so_no_banco (quantidades).
+    """
+    colunas = [c for c in COLUNAS_PLANILHA if c in df_planilha.columns and c in df_banco.columns]
+    planilha = df_planilha.drop_duplicates('Tema', keep='last').set_index('Tema', drop=False)
+    banco = df_banco.drop_duplicates('Tema', keep='last').set_index('Tema', drop=False)
+
+    comuns = planilha.index.intersection(banco.index)
+    plano = {"novos": planilha[~planilha.index.isin(banco.index)].reset_index(drop=True),
+             "alteracoes": {}, "alterados": [], "colunas": colunas,
+             "so_no_banco": int((~banco.index.isin(planilha.index)).sum())}
+    if not colunas or comuns.empty:
+        plano["inalterados"] = len(comuns)
+        return plano
+
+    diferentes = comuns[(_hashes(planilha.loc[comuns], colunas) != _hashes(banco.loc[comuns], colunas)).to_numpy()]
+    for coluna in colunas:
+        novo = planilha.loc[diferentes, coluna]
+        mudou = _textos(novo) != _textos(banco.loc[diferentes, coluna])
+        if mudou.any():
+            plano["alteracoes"][coluna] = {int(tema): valor for tema, valor in textos_para_gravar(novo[mudou]).items()}
+    plano["alterados"] = sorted({tema for valores in plano["alteracoes"].values() for tema in valores})
+    plano["inalterados"] = len(comuns) - len(plano["alterados"])
+    return plano
+
+
+def _atualizar_coluna(conn, coluna, valores):
+    """UPDATE ... FROM (VALUES ...) em lotes: um comando para até TEMAS_POR_COMANDO temas."""
+    itens = list(valores.items())
+    for inicio in range(0, len(itens), TEMAS_POR_COMANDO):
+        lote = itens[inicio:inicio + TEMAS_POR_COMANDO]
+        linhas = ", ".join(f"(:t{i}, :v{i})" for i in range(len(lote)))
+        params = {}
+        for i, (tema, valor) in enumerate(lote):
+            params[f"t{i}"], params[f"v{i}"] = tema, valor
+        # column1/column2: nomes das colunas de VALUES no Postgres e no SQLite
+        conn.execute(text(f'UPDATE temas_stf SET "{coluna}" = v.column2 FROM (VALUES {linhas}) AS v '
+                          f'WHERE temas_stf."Tema" = v.column1'), params)
+
+
+def aplicar_alteracoes(conn, plano, df_banco):
+    """Grava as colunas alteradas e refaz a 'busca' dos temas alterados. Retorna os temas alterados."""
+    for coluna, valores in plano["alteracoes"].items():
+        _atualizar_coluna(conn, coluna, valores)
+
+    if plano["alterados"] and 'busca' in df_banco.columns:
+        # 'busca' com os valores novos e o Ramo do Direito que está no banco
+        atualizados = df_banco.drop_duplicates('Tema', keep='last').set_index('Tema', drop=False).loc[plano["alterados"]].copy()
+        for coluna, valores in plano["alteracoes"].items():
+            temas = list(valores)
+            atualizados.loc[temas, coluna] = [valores[t] for t in temas]
+        busca = montar_coluna_busca(atualizados.reset_index(drop=True), COLUNAS_BUSCA_STF)
+        _atualizar_coluna(conn, 'busca', dict(zip(plano["alterados"], busca)))
+    return plano["alterados"]
+
+
+def resumo(plano):
+    """Texto com o que mudou, por coluna."""
+    por_coluna = ", ".join(f"{coluna}: {len(valores)}" for coluna, valores in plano["alteracoes"].items())
+    return (f"{len(plano['novos'])} tema(s) novo(s), {len(plano['alterados'])} alterado(s)"
+            + (f" ({por_coluna})" if por_coluna else "")
+            + f", {plano['inalterados']} sem alteração, {plano['so_no_banco']} só no banco (mantidos).")
@@ -0,0 +1,138 @@
+"""
+Estado da ingestão dos informativos, guardado no próprio banco (ingest_state).
+
+Para cada arquivo já processado ficam o hash do conteúdo, o órgão, as linhas
+extraídas e o tamanho/mtime vistos na última vez. O que decide se um arquivo
+mudou é o hash: o Google Drive mexe no mtime sem mudar o conteúdo. O
+tamanho/mtime só servem de atalho para não recalcular o hash quando nada
+mudou. Como o estado fica no banco, qualquer máquina vê o mesmo histórico.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from sqlalchemy import text
+
+SQL_TABELA_INGESTAO = (
+    "CREATE TABLE IF NOT EXISTS ingest_state (arquivo TEXT PRIMARY KEY, orgao TEXT, hash TEXT NOT NULL, "
+    "linhas INTEGER, tamanho BIGINT, modificado_em DOUBLE PRECISION, processado_em TIMESTAMP)"
+)
+
+COLUNAS_ESTADO = ["arquivo", "orgao", "hash", "linhas", "tamanho", "modificado_em"]
+
+BLOCO_HASH = 1024 * 1024
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo do arquivo."""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def carregar_estado(conn):
+    """{arquivo: {orgao, hash, linhas, tamanho, modificado_em}} do banco."""
+    conn.execute(text(SQL_TABELA_INGESTAO))
+    linhas = conn.execute(text(f"SELECT {', '.join(COLUNAS_ESTADO)} FROM ingest_state")).mappings()
+    return {linha['arquivo']: dict(linha) for linha in linhas}
+
+
+def gravar_estado(conn, registros):
+    """Insere ou atualiza o estado dos arquivos (mesma transação que gravou os informativos)."""
+    if not registros:
+        return
+    conn.execute(text(SQL_TABELA_INGESTAO))
+    conn.execute(text(
+        "INSERT INTO ingest_state (arquivo, orgao, hash, linhas, tamanho, modificado_em, processado_em) "
+        "VALUES (:arquivo, :orgao, :hash, :linhas, :tamanho, :modificado_em, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (arquivo) DO UPDATE SET orgao = excluded.orgao, hash = excluded.hash, linhas = excluded.linhas, "
+        "tamanho = excluded.tamanho, modificado_em = excluded.modificado_em, processado_em = CURRENT_TIMESTAMP"
+    ), [{coluna: registro[coluna] for coluna in COLUNAS_ESTADO} for registro in registros])
+
+
+def remover_estado(conn, arquivos):
+    if arquivos:
+        conn.execute(text("DELETE FROM ingest_state WHERE arquivo = :arquivo"), [{"arquivo": a} for a in arquivos])
+
+
+# --- COMPARAÇÃO COM OS ARQUIVOS LOCAIS ---
+def _registro_local(caminho, anterior):
+    """Registro do arquivo local; reaproveita o hash anterior se tamanho e mtime não mudaram."""
+    info = os.stat(caminho)
+    registro = {"arquivo": caminho.name, "orgao": caminho.parent.name, "caminho": caminho,
+                "tamanho": info.st_size, "modificado_em": info.st_mtime, "linhas": None}
+    if anterior is not None and anterior["tamanho"] == info.st_size and anterior["modificado_em"] == info.st_mtime:
+        registro["hash"] = anterior["hash"]
+    else:
+        registro["hash"] = hash_arquivo(caminho)
+    return registro
+
+
+def comparar(arquivos_locais, estado):
+    """
+    Classifica os arquivos locais contra o estado salvo. Retorna um dict com:
+    novos e modificados (registros a extrair), renomeados ([(nome antigo, registro)]),
+    removidos (nomes que sumiram da pasta), inalterados (quantidade) e tocados
+    (conteúdo igual, mas tamanho/mtime diferentes do estado: só o estado é atualizado).
+    Um arquivo com nome novo e o mesmo conteúdo (e órgão) de um que sumiu é renomeação.
+    """
+    locais = [_registro_local(caminho, estado.get(caminho.name)) for caminho in arquivos_locais]
+    nomes_locais = {registro["arquivo"] for registro in locais}
+    sumidos = {nome: item for nome, item in estado.items() if nome not in nomes_locais}
+    sumidos_por_hash = {}
+    for nome, item in sumidos.items():
+        sumidos_por_hash.setdefault((item["hash"], item["orgao"]), []).append(nome)
+
+    plano = {"novos": [], "modificados": [], "renomeados": [], "removidos": [], "inalterados": 0, "tocados": []}
+    for registro in locais:
+        anterior = estado.get(registro["arquivo"])
+        if anterior is None:
+            candidatos = sumidos_por_hash.get((registro["hash"], registro["orgao"]))
+            if candidatos:
+                nome_antigo = candidatos.pop()
+                registro["linhas"] = sumidos.pop(nome_antigo)["linhas"]
+                plano["renomeados"].append((nome_antigo, registro))
+            else:
+                plano["novos"].append(registro)
+        elif anterior["hash"] != registro["hash"] or anterior["orgao"] != registro["orgao"]:
+            plano["modificados"].append(registro)
+        else:
+            plano["inalterados"] += 1
+            if (anterior["tamanho"], anterior["modificado_em"]) != (registro["tamanho"], registro["modificado_em"]):
+                # Só o mtime mudou (sincronização do Drive): guarda o novo, para o atalho valer da próxima vez
+                registro["linhas"] = anterior["linhas"]
+                plano["tocados"].append(registro)
+    plano["removidos"] = sorted(sumidos)
+    return plano
+
+
+# --- MIGRAÇÃO DO ESTADO ANTIGO (JSON LOCAL) ---
+def adotar_estado_json(conn, caminho_json, arquivos_locais):
+    """
+    Na primeira execução com ingest_state vazio, aproveita o processamento_estado.json
+    antigo: arquivos que não mudaram desde então (mesmo critério de mtime de antes)
+    e já têm linhas no banco entram no estado sem serem reprocessados.
+    Retorna os registros adotados (a gravar com gravar_estado).
+    """
+    if not os.path.exists(caminho_json):
+        return []
+    try:
+        with open(caminho_json, 'r', encoding='utf-8') as f:
+            estado_json = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+
+    contagens = dict(conn.execute(text(
+        "SELECT arquivo_fonte, COUNT(*) FROM informativos GROUP BY arquivo_fonte")).all())
+    adotados = []
+    for caminho in arquivos_locais:
+        processado_em = estado_json.get(caminho.name)
+        mod_time_iso = datetime.fromtimestamp(os.path.getmtime(caminho)).isoformat()
+        if processado_em is None or processado_em < mod_time_iso or caminho.name not in contagens:
+            continue
+        registro = _registro_local(caminho, None)
+        registro["linhas"] = contagens[caminho.name]
+        adotados.append(registro)
+    return adotados
@@ -1,5 +1,6 @@
 import pandas as pd
 from db_config import create_db_engine
+from leitura_em_massa import ler_sql
 
 # Nome do arquivo de saída
 ARQUIVO_SAIDA = "teses_stf_completo.csv"
@@ -14,7 +15,7 @@ def exportar_teses_stf():
         query = 'SELECT "Tema", "Ramo do Direito", "Título", "Tese" FROM temas_stf ORDER BY "Tema" ASC'
         
         print("Lendo dados da tabela 'temas_stf'...")
-        df = pd.read_sql_query(query, engine)
+        df = ler_sql(engine, query)
         
         # Renomeia a coluna 'Tema' para 'Número do Tema' como solicitado
         df = df.rename(columns={'Tema': 'Número do Tema'})
@@ -0,0 +1,116 @@
+"""
+Árvore de facetas para os seletores em cascata do Navegador de Informativos
+(Órgão → Disciplina → Assunto, e Informativo → Disciplina → Assunto).
+
+As linhas são ordenadas uma única vez pelos níveis da árvore; assim cada nó
+corresponde a um intervalo contínuo [inicio, fim) dessa ordem. Preencher um
+selectbox vira uma consulta a dicionário e filtrar vira uma fatia do array.
+"""
+import numpy as np
+import pandas as pd
+
+OPCOES_TODOS = ("Todos", "Todas")
+
+
+class NoFaceta:
+    __slots__ = ("inicio", "fim", "filhos")
+
+    def __init__(self, inicio):
+        self.inicio = inicio
+        self.fim = inicio
+        self.filhos = {}
+
+    @property
+    def contagem(self):
+        return self.fim - self.inicio
+
+    @property
+    def valores(self):
+        """Valores do próximo nível, já em ordem alfabética."""
+        return list(self.filhos)
+
+    @property
+    def contagens(self):
+        return {valor: no.contagem for valor, no in self.filhos.items()}
+
+
+class ArvoreFacetas:
+    def __init__(self, df, niveis):
+        self.niveis = list(niveis)
+        chaves = df[self.niveis].reset_index(drop=True)
+        chaves = chaves.sort_values(self.niveis, na_position='last', kind='stable')
+        self.ordem = chaves.index.to_numpy()
+        self.raiz = NoFaceta(0)
+
+        # Os grupos saem na ordem da ordenação; cada um estende os nós do seu caminho
+        tamanhos = chaves.groupby(self.niveis, dropna=False, sort=False, observed=True).size()
+        deslocamento = 0
+        for caminho, tamanho in zip(tamanhos.index, tamanhos.to_numpy()):
+            if len(self.niveis) == 1:
+                caminho = (caminho,)
+            fim = deslocamento + int(tamanho)
+            no = self.raiz
+            no.fim = fim
+            for valor in caminho:
+                if pd.isna(valor):
+                    break
+                no = no.filhos.setdefault(valor, NoFaceta(deslocamento))
+                no.fim = fim
+            deslocamento = fim
+
+    def no(self, *caminho):
+        """Nó do caminho informado (None se algum valor não existir)."""
+        no = self.raiz
+        for valor in caminho:
+            no = no.filhos.get(valor)
+            if no is None:
+                return None
+        return no
+
+    def opcoes(self, *caminho):
+        no = self.no(*caminho)
+        return no.valores if no is not None else []
+
+    def contagens(self, *caminho):
+        no = self.no(*caminho)
+        return no.contagens if no is not None else {}
+
+    def posicoes(self, *caminho):
+        """Posições (ordem original do DataFrame) das linhas sob o caminho."""
+        no = self.no(*caminho)
+        if no is None:
+            return np.empty(0, dtype=self.ordem.dtype)
+        return np.sort(self.ordem[no.inicio:no.fim])
+
+
+class FacetasInformativos:
+    """Todas as facetas da página de informativos, montadas uma vez por carga."""
+
+    def __init__(self, df):
+        self.por_orgao = ArvoreFacetas(df, ['orgao', 'disciplina', 'assunto'])
+        self.geral = ArvoreFacetas(df, ['disciplina', 'assunto'])
+        self.por_arquivo = ArvoreFacetas(df, ['arquivo_fonte', 'disciplina', 'assunto'])
+
+        # Lista de informativos (.pdf) de cada órgão, do mais recente para o mais antigo
+        ordenado = df.sort_values(by='num_inf', ascending=False, kind='stable')
+        self.informativos_por_orgao = {
+            orgao: grupo['arquivo_fonte'].str.replace('.docx', '.pdf').unique().tolist()
+            for orgao, grupo in ordenado.groupby('orgao', sort=False, observed=True)
+        }
+
+    def posicoes_categoria(self, orgao, disciplina, assunto):
+        """
+        Posições das linhas para os filtros por categoria, ou None quando a
+        combinação não segue a cascata (ex.: assunto escolhido com disciplina "Todas").
+        """
+        if orgao in OPCOES_TODOS:
+            arvore, caminho = self.geral, [disciplina, assunto]
+        else:
+            arvore, caminho = self.por_orgao, [orgao, disciplina, assunto]
+        while caminho and caminho[-1] in OPCOES_TODOS:
+            caminho.pop()
+        if any(valor in OPCOES_TODOS for valor in caminho):
+            return None
+        if not caminho:
+            return np.arange(arvore.raiz.contagem)
+        return arvore.posicoes(*caminho)
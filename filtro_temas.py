@@ -0,0 +1,42 @@
+"""
+Filtros das abas de temas (STF/STJ) sem cópias do DataFrame.
+
+As máscaras booleanas que não dependem da consulta (tem tese, uma por ramo) e a
+ordem de exibição (Tema decrescente) são calculadas uma vez por carga. Cada
+interação só combina máscaras com o resultado da busca e devolve o array de
+posições; o app materializa apenas as linhas da página visível.
+"""
+import numpy as np
+import pandas as pd
+
+
+class FiltroTemas:
+    def __init__(self, df, coluna_ramo, coluna_tese):
+        self.n_linhas = len(df)
+        self.tem_tese = (df[coluna_tese].fillna('').astype(str).str.strip() != '').to_numpy(dtype=bool)
+
+        codigos, ramos = pd.factorize(df[coluna_ramo])
+        self.mascaras_ramo = {str(ramo): codigos == i for i, ramo in enumerate(ramos)}
+
+        self.ordem_tema = np.argsort(-df['Tema'].to_numpy(dtype=np.int64), kind='stable')
+
+    def mascara(self, ramo, opcao_tese, posicoes_busca=None):
+        """Combinação das máscaras de ramo, tese e (opcional) posições da busca."""
+        if ramo != "Todos":
+            mascara = self.mascaras_ramo.get(ramo, np.zeros(self.n_linhas, dtype=bool)).copy()
+        else:
+            mascara = np.ones(self.n_linhas, dtype=bool)
+        if opcao_tese == "Com tese":
+            mascara &= self.tem_tese
+        elif opcao_tese == "Sem teses":
+            mascara &= ~self.tem_tese
+        if posicoes_busca is not None:
+            na_busca = np.zeros(self.n_linhas, dtype=bool)
+            na_busca[posicoes_busca] = True
+            mascara &= na_busca
+        return mascara
+
+    def posicoes(self, ramo, opcao_tese, posicoes_busca=None):
+        """Posições das linhas filtradas, já na ordem de Tema decrescente."""
+        mascara = self.mascara(ramo, opcao_tese, posicoes_busca)
+        return self.ordem_tema[mascara[self.ordem_tema]]
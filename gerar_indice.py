@@ -2,6 +2,7 @@ import pandas as pd
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill
 from db_config import create_db_engine
+from leitura_em_massa import ler_sql
 
 # --- CONFIGURAÇÕES ---
 NOME_ARQUIVO_XLSX = "indice_analitico.xlsx"
@@ -13,9 +14,7 @@ def extrair_indice_do_banco():
     print("Conectando ao banco de dados...")
     try:
         engine = create_db_engine()
-        df = pd.read_sql_query(
-            "SELECT orgao, disciplina, assunto, arquivo_fonte FROM informativos", engine
-        )
+        df = ler_sql(engine, "SELECT orgao, disciplina, assunto, arquivo_fonte FROM informativos")
         print("Dados extraídos com sucesso!")
         return df
     except Exception as e:
@@ -0,0 +1,134 @@
+"""
+Gravação em massa de DataFrames nas tabelas do app (par de leitura_em_massa).
+
+No Postgres, o DataFrame vira uma tabela Arrow e vai em CSV (pyarrow), aos
+poucos, por COPY FROM STDIN para uma tabela temporária com as colunas do
+destino; depois um único INSERT ... SELECT leva as linhas para a tabela
+(apagando as antigas no mesmo comando, se for substituição). Os tipos são os da tabela de destino, sem a inferência do
+to_sql a cada carga. Nos outros bancos (SQLite local) continua o to_sql.
+"""
+import io
+import time
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sqlalchemy import text
+from db_config import registrar_consulta
+
+LINHAS_POR_PARTE = 5000
+
+# Todo valor vai entre aspas e NULL fica vazio sem aspas: é assim que o COPY
+# em CSV distingue NULL de texto vazio ("")
+OPCOES_CSV = pa_csv.WriteOptions(include_header=False, quoting_style="all_valid")
+
+# Tipo das colunas criadas pelo gravador (tabela nova ou coluna nova no destino)
+TIPOS_SQL = {"i": "BIGINT", "u": "BIGINT", "f": "DOUBLE PRECISION", "b": "BOOLEAN", "M": "TIMESTAMP"}
+TIPOS_INTEIROS = ("smallint", "integer", "bigint")
+
+
+def _nome(identificador):
+    return '"' + identificador.replace('"', '""') + '"'
+
+
+class _CsvEmPartes:
+    """Arquivo só de leitura que gera o CSV do DataFrame em partes, conforme o COPY pede."""
+
+    def __init__(self, tabela_arrow, linhas_por_parte=LINHAS_POR_PARTE):
+        self._partes = (self._csv(lote) for lote in tabela_arrow.to_batches(linhas_por_parte))
+        self._atual, self._posicao = b"", 0
+
+    @staticmethod
+    def _csv(lote):
+        saida = io.BytesIO()
+        pa_csv.write_csv(lote, saida, OPCOES_CSV)
+        return saida.getvalue()
+
+    def read(self, tamanho=-1):
+        if self._posicao >= len(self._atual):
+            self._atual, self._posicao = next(self._partes, b""), 0
+        if tamanho is None or tamanho < 0:
+            fim = len(self._atual)
+        else:
+            fim = self._posicao + tamanho
+        dados = self._atual[self._posicao:fim]
+        self._posicao += len(dados)
+        return dados
+
+
+def _colunas_destino(conn, tabela):
+    """{coluna: tipo} da tabela no Postgres ({} se ela não existe)."""
+    linhas = conn.execute(text(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :tabela"), {"tabela": tabela}).all()
+    return dict(linhas)
+
+
+def _preparar_destino(conn, df, tabela):
+    """Cria a tabela ou as colunas que faltam; devolve os tipos das colunas do destino."""
+    tipos = _colunas_destino(conn, tabela)
+    if not tipos:
+        df.head(0).to_sql(tabela, conn, index=False)
+        return _colunas_destino(conn, tabela)
+    for coluna in df.columns:
+        if coluna not in tipos:
+            tipo = TIPOS_SQL.get(df[coluna].dtype.kind, "TEXT")
+            conn.execute(text(f"ALTER TABLE {_nome(tabela)} ADD COLUMN {_nome(coluna)} {tipo}"))
+            tipos[coluna] = tipo.lower()
+    return tipos
+
+
+def _alinhar_tipos(df, tipos):
+    """Números lidos como float (por causa de NaN) viram inteiros onde o destino é inteiro."""
+    convertidas = {}
+    for coluna in df.columns:
+        if tipos.get(coluna) in TIPOS_INTEIROS and df[coluna].dtype.kind == "f":
+            convertidas[coluna] = df[coluna].round().astype("Int64")
+    return df.assign(**convertidas) if convertidas else df
+
+
+def _para_arrow(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Coluna object com tipos misturados (ex.: números e textos): vai como texto
+        mistas = {c: df[c].astype("string") for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.assign(**mistas), preserve_index=False)
+
+
+def gravar_df(conn, df, tabela, substituir=False):
+    """
+    Grava o DataFrame na tabela, dentro da transação de conn (Connection do
+    SQLAlchemy). substituir=True troca o conteúdo inteiro da tabela.
+    Retorna o número de linhas gravadas.
+    """
+    inicio = time.perf_counter()
+    if conn.dialect.name != "postgresql":
+        df.to_sql(tabela, conn, if_exists='replace' if substituir else 'append', index=False)
+    else:
+        tipos = _preparar_destino(conn, df, tabela)
+        df = _alinhar_tipos(df, tipos)
+        colunas = ", ".join(_nome(c) for c in df.columns)
+        # Sempre qualificada com pg_temp: um nome solto seria resolvido pelo search_path
+        # e poderia achar uma tabela comum de mesmo nome
+        temporaria = "pg_temp." + _nome(f"_carga_{tabela}")
+        conn.execute(text(f"CREATE TEMP TABLE {temporaria} ON COMMIT DROP AS "
+                          f"SELECT {colunas} FROM {_nome(tabela)} WITH NO DATA"))
+
+        # COPY direto no cursor (fora dos eventos do engine): entra nas métricas aqui
+        copy = f"COPY {temporaria} ({colunas}) FROM STDIN WITH (FORMAT csv)"
+        cursor = conn.connection.cursor()
+        try:
+            inicio_copy = time.perf_counter()
+            cursor.copy_expert(copy, _CsvEmPartes(_para_arrow(df)))
+            registrar_consulta(copy, (time.perf_counter() - inicio_copy) * 1000, cursor.rowcount)
+        finally:
+            cursor.close()
+
+        # Um só comando: o DELETE e o INSERT enxergam a tabela como estava antes dele
+        apagar = f"WITH apagadas AS (DELETE FROM {_nome(tabela)}) " if substituir else ""
+        conn.execute(text(f"{apagar}INSERT INTO {_nome(tabela)} ({colunas}) SELECT {colunas} FROM {temporaria}"))
+        conn.execute(text(f"DROP TABLE {temporaria}"))
+
+    segundos = time.perf_counter() - inicio
+    print(f"  '{tabela}': {len(df)} linha(s) gravada(s) em {segundos:.2f} s "
+          f"({len(df) / segundos if segundos > 0 else 0:,.0f} linhas/s)")
+    return len(df)
@@ -2,10 +2,16 @@ import pandas as pd
 from sqlalchemy import create_engine
 import os
 import warnings
-from sentence_transformers import SentenceTransformer, util
-import re
-import unicodedata
+from sentence_transformers import util
+from cache_embeddings import CacheEmbeddings
 from db_config import create_db_engine
+from diferencas_temas_stf import (comparar_temas, aplicar_alteracoes as aplicar_alteracoes_temas,
+                                   resumo as resumo_temas, textos_para_gravar)
+from gravacao_em_massa import gravar_df
+from leitura_em_massa import ler_sql
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_STF
+from regras_tiro_certo import carregar_regras
+from repositorio import registrar_alteracao
 
 # Ignora avisos
 warnings.filterwarnings("ignore")
@@ -16,51 +22,12 @@ engine = create_db_engine()
 ARQUIVO_STF = "RepercussaoGeral.xls"
 PASTA_TREINAMENTO = "Temas STF" # Pasta com os xls divididos por ramo
 
-# --- 2. NOVA LISTA DE RAMOS E TIRO CERTO ---
-# Atualizei para bater com seus novos ramos. 
-# Você pode adicionar mais palavras-chave aqui se quiser forçar certas classificações.
-PALAVRAS_TIRO_CERTO = {
-    # Tributário
-    'tributo': 'Direito Tributário', 'icms': 'Direito Tributário', 'pis': 'Direito Tributário', 
-    'cofins': 'Direito Tributário', 'ipva': 'Direito Tributário', 'iptu': 'Direito Tributário',
-    'imunidade tributaria': 'Direito Tributário', 'execucao fiscal': 'Direito Tributário',
-    
-    # Previdenciário (Não está na sua lista explícita nova, mas se cair em algum ramo, deve ser definido. 
-    # Se "Previdenciário" não for um ramo final, ele vai cair provavelmente em Administrativo ou terá que treinar a IA)
-    # *Nota*: Se Direito Previdenciário não existe mais, remova ou mapeie para outro. 
-    # Vou manter comentado caso queira mapear para "Direito Administrativo" ou outro.
-    # 'inss': 'Direito Administrativo', 
-    
-    # Administrativo
-    'servidor': 'Direito Administrativo', 'concurso': 'Direito Administrativo', 
-    'improbidade': 'Direito Administrativo', 'licitacao': 'Direito Administrativo',
-    'desapropriacao': 'Direito Administrativo',
-    
-    # Penal
-    'penal': 'Direito Penal', 'crime': 'Direito Penal', 'pena': 'Direito Penal', 
-    'habeas corpus': 'Direito Penal', 'prisional': 'Direito Penal',
-    
-    # Trabalhista
-    'trabalho': 'Direito do Trabalho', 'trabalhista': 'Direito do Trabalho',
-    'fgts': 'Direito do Trabalho', 'terceirizacao': 'Direito do Trabalho',
-    
-    # Eleitoral
-    'eleicao': 'Direito Eleitoral', 'candidato': 'Direito Eleitoral', 'partido politico': 'Direito Eleitoral',
-    
-    # Consumidor
-    'consumidor': 'Direito do Consumidor', 'banco': 'Direito do Consumidor', 'telefonia': 'Direito do Consumidor',
-    
-    # Ambiental
-    'ambiental': 'Direito Ambiental', 'meio ambiente': 'Direito Ambiental', 'florestal': 'Direito Ambiental'
-}
+# --- 2. TIRO CERTO ---
+# Palavras-chave que definem o ramo sem passar pela IA, em regras_tiro_certo.json
+# (o mesmo arquivo usado pelo relatorio_alteracoes).
+REGRAS_TIRO_CERTO = carregar_regras()
 
 # --- 3. FUNÇÕES UTILITÁRIAS ---
-def normalizar_texto_regex(texto):
-    if not isinstance(texto, str): return ""
-    nfkd = unicodedata.normalize('NFKD', texto)
-    texto = u"".join([c for c in nfkd if not unicodedata.combining(c)])
-    return texto.lower()
-
 def carregar_arquivo_universal(caminho):
     print(f"Lendo arquivo STF: {caminho}...")
     try: return pd.read_html(caminho, encoding='utf-8', header=0)[0]
@@ -71,7 +38,8 @@ def carregar_arquivo_universal(caminho):
 # --- 4. PREPARAÇÃO DA IA (Treinando com sua pasta "Temas STF") ---
 def treinar_ia_com_pasta_local():
     print(f"\n--- 🧠 TREINANDO CÉREBRO COM ARQUIVOS DA PASTA '{PASTA_TREINAMENTO}' ---")
-    model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2', device='cpu')
+    # Embeddings guardados em disco: o modelo só é carregado se algum texto for novo
+    cache = CacheEmbeddings()
     
     if not os.path.exists(PASTA_TREINAMENTO):
         print(f"Erro: Pasta {PASTA_TREINAMENTO} não encontrada. A IA não terá base de comparação.")
@@ -109,50 +77,37 @@ def treinar_ia_com_pasta_local():
     nomes_ramos = list(textos_por_ramo.keys())
     print(f"Ramos aprendidos: {nomes_ramos}")
     
-    embeddings_ramos = model.encode(list(textos_por_ramo.values()), convert_to_tensor=True)
-    return model, nomes_ramos, embeddings_ramos
+    embeddings_ramos = cache.codificar(list(textos_por_ramo.values()))
+    return cache, nomes_ramos, embeddings_ramos
 
 # --- 5. CLASSIFICAÇÃO ---
-def classificar_novos(df_novos, model, nomes_ramos, embeddings_ramos):
+def classificar_novos(df_novos, cache, nomes_ramos, embeddings_ramos):
     print(f"\n--- CLASSIFICANDO {len(df_novos)} ITENS NOVOS ---")
-    ramos_finais = []
     
     # Colunas onde procurar texto
     cols_texto = [c for c in df_novos.columns if any(x in c.lower() for x in ['titulo', 'título', 'descri', 'tese', 'assunto'])]
     
-    indices_para_ia = []
-    textos_para_ia = []
+    textos_completos = [" ".join([str(row.get(c, '')).lower() for c in cols_texto]) for _, row in df_novos.iterrows()]
     
-    for idx, row in df_novos.iterrows():
-        texto_completo = " ".join([str(row.get(c, '')).lower() for c in cols_texto])
-        texto_limpo = normalizar_texto_regex(texto_completo)
-        
-        # 1. Tenta Regex (Tiro Certo)
-        ramo_detectado = None
-        for palavra, ramo in PALAVRAS_TIRO_CERTO.items():
-            padrao = r"\b" + re.escape(palavra) + r"\b"
-            if re.search(padrao, texto_limpo):
-                ramo_detectado = ramo
-                break 
-        
-        if ramo_detectado:
-            ramos_finais.append(ramo_detectado)
-        else:
-            # Se não achou por palavra-chave, manda pra IA
-            ramos_finais.append(None) 
-            indices_para_ia.append(len(ramos_finais) - 1) # Guarda o índice atual na lista ramos_finais
-            textos_para_ia.append(texto_completo)
+    # 1. Tenta as palavras-chave (Tiro Certo), de uma vez para todos os textos
+    ramos_finais = REGRAS_TIRO_CERTO.classificar(textos_completos)
+    
+    # Se não achou por palavra-chave, manda pra IA
+    indices_para_ia = [i for i, ramo in enumerate(ramos_finais) if ramo is None]
+    textos_para_ia = [textos_completos[i] for i in indices_para_ia]
             
     # 2. Processa IA em lote
-    if indices_para_ia and model:
+    if indices_para_ia and cache:
         print(f"IA processando {len(indices_para_ia)} casos complexos...")
-        embeddings_stf = model.encode(textos_para_ia, convert_to_tensor=True)
+        embeddings_stf = cache.codificar(textos_para_ia)
         resultados = util.cos_sim(embeddings_stf, embeddings_ramos)
         indices_ganhadores = resultados.argmax(dim=1).cpu().detach().numpy().flatten()
         
         for i, idx_lista in enumerate(indices_para_ia):
             idx_ramo = indices_ganhadores[i]
             ramos_finais[idx_lista] = nomes_ramos[idx_ramo]
+    if cache:
+        cache.resumo()
     
     # Fallback se IA falhar ou não estiver carregada
     for i in range(len(ramos_finais)):
@@ -184,49 +139,64 @@ df_stf_completo = df_stf_completo.rename(columns=mapa)
 # Garante Tema como int
 df_stf_completo['Tema'] = pd.to_numeric(df_stf_completo['Tema'], errors='coerce').fillna(0).astype(int)
 
-# B. Verificar o que já existe no Banco
+# B. Comparar com o que já existe no Banco (hash do conteúdo de cada tema)
 print("Verificando banco de dados para atualizações incrementais...")
 try:
-    temas_existentes = pd.read_sql("SELECT \"Tema\" FROM temas_stf", engine)
-    lista_ids_existentes = temas_existentes['Tema'].astype(int).tolist()
-    print(f"Existem {len(lista_ids_existentes)} temas no banco.")
+    df_banco = ler_sql(engine, "SELECT * FROM temas_stf")
+    df_banco['Tema'] = pd.to_numeric(df_banco['Tema'], errors='coerce').fillna(0).astype(int)
+    print(f"Existem {len(df_banco)} temas no banco.")
 except:
-    lista_ids_existentes = []
+    df_banco = pd.DataFrame(columns=['Tema'])
     print("Banco parece vazio ou tabela não existe.")
 
-# C. Filtrar APENAS OS NOVOS
-df_novos = df_stf_completo[~df_stf_completo['Tema'].isin(lista_ids_existentes)].copy()
+# C. Separar os novos e as colunas alteradas dos temas já cadastrados
+plano = comparar_temas(df_stf_completo, df_banco)
+print(f"Resumo: {resumo_temas(plano)}")
+for coluna, valores in plano["alteracoes"].items():
+    amostra = ", ".join(str(tema) for tema in list(valores)[:10])
+    print(f"  - {coluna}: temas {amostra}{' ...' if len(valores) > 10 else ''}")
+df_novos = plano["novos"].copy()
 
-if df_novos.empty:
-    print("✅ Nenhum tema novo encontrado. Banco já está atualizado.")
-    # Se quiser atualizar colunas não-classificatórias (como Situação) de temas velhos, 
-    # seria necessário um código extra de UPDATE aqui, mas para classificação, paramos aqui.
+if df_novos.empty and not plano["alterados"]:
+    print("✅ Nenhum tema novo ou alterado. Banco já está atualizado.")
     exit()
 
-print(f"⚠️ Encontrados {len(df_novos)} NOVOS temas para cadastrar.")
-
-# D. Treinar IA e Classificar apenas os novos
-model, nomes_ramos, embeddings_ramos = treinar_ia_com_pasta_local()
-if model:
-    df_novos['Ramo do Direito'] = classificar_novos(df_novos, model, nomes_ramos, embeddings_ramos)
-else:
-    print("Erro no carregamento da IA. Novos temas ficarão sem classificação.")
-    df_novos['Ramo do Direito'] = "A Classificar"
+# D. Treinar IA e Classificar apenas os novos (os alterados mantêm o Ramo do banco)
+if not df_novos.empty:
+    print(f"⚠️ Encontrados {len(df_novos)} NOVOS temas para cadastrar.")
+    cache, nomes_ramos, embeddings_ramos = treinar_ia_com_pasta_local()
+    if cache:
+        df_novos['Ramo do Direito'] = classificar_novos(df_novos, cache, nomes_ramos, embeddings_ramos)
+    else:
+        print("Erro no carregamento da IA. Novos temas ficarão sem classificação.")
+        df_novos['Ramo do Direito'] = "A Classificar"
 
 # Data de alteração para os novos
 df_novos['data_ultima_alteracao'] = None 
 
-# E. Salvar apenas os novos (Append)
-print("Inserindo novos temas no banco...")
+# E. Salvar os novos (Append) e as colunas alteradas (UPDATE)
 
 cols_possiveis = ['Tema', 'Título', 'Descrição', 'Tese', 'Assuntos', 'Ramo do Direito', 'Leading Case', 'Situação do Tema', 'Data do Julgamento', 'data_ultima_alteracao']
 cols_finais = [c for c in cols_possiveis if c in df_novos.columns]
 df_final_novos = df_novos[cols_finais].copy()
 
-# Limpeza final antes de inserir
+# Limpeza final antes de inserir (vazios como '', igual aos temas alterados)
 for col in df_final_novos.columns:
     if col != 'Tema' and col != 'data_ultima_alteracao':
-         df_final_novos[col] = df_final_novos[col].astype(str).replace({'nan': '', 'None': '', '<NA>': ''})
-
-df_final_novos.to_sql('temas_stf', engine, if_exists='append', index=False)
-print(f"✅ SUCESSO! {len(df_final_novos)} novos temas adicionados.")
\ No newline at end of file
+         df_final_novos[col] = textos_para_gravar(df_final_novos[col])
+
+# Texto de busca normalizado (sem acentos), lido pronto pelo app
+df_final_novos['busca'] = montar_coluna_busca(df_final_novos, COLUNAS_BUSCA_STF)
+
+# Grava tudo na mesma transação e registra as chaves novas e alteradas (o app relê só essas linhas)
+with engine.begin() as conn:
+    temas_gravados = []
+    if len(df_final_novos):
+        print("Inserindo novos temas no banco...")
+        gravar_df(conn, df_final_novos, 'temas_stf')
+        temas_gravados += pd.to_numeric(df_final_novos['Tema'], errors='coerce').dropna().astype(int).tolist()
+    if plano["alterados"]:
+        print(f"Atualizando {len(plano['alterados'])} temas alterados...")
+        temas_gravados += aplicar_alteracoes_temas(conn, plano, df_banco)
+    registrar_alteracao(conn, 'temas_stf', temas_gravados)
+print(f"✅ SUCESSO! {len(df_final_novos)} novos temas adicionados, {len(plano['alterados'])} atualizados.")
\ No newline at end of file
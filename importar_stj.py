@@ -1,9 +1,20 @@
 import pandas as pd
 from db_config import create_db_engine
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_STJ
+from repositorio import registrar_alteracao
+from gravacao_em_massa import gravar_df
 
 engine = create_db_engine()
 
 df_stj = pd.read_csv("relatorio.csv", sep=';', encoding='latin1')
-df_stj.to_sql('temas_stj', engine, if_exists='replace', index=False)
+
+# Texto de busca normalizado (sem acentos), com o Tema como inteiro (igual ao app)
+df_texto = df_stj.copy()
+if 'Tema' in df_texto.columns:
+    df_texto['Tema'] = pd.to_numeric(df_texto['Tema'], errors='coerce').fillna(0).astype(int)
+df_stj['busca'] = montar_coluna_busca(df_texto, COLUNAS_BUSCA_STJ)
+with engine.begin() as conn:
+    gravar_df(conn, df_stj, 'temas_stj', substituir=True)
+    registrar_alteracao(conn, 'temas_stj')  # tabela inteira substituída
 
 print("Dados do STJ importados com sucesso!")
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Índice invertido em memória para a busca por palavras-chave do app.
+
+Em vez de varrer o texto de todas as linhas com str.contains a cada palavra,
+o índice guarda, para cada token da coluna 'busca', a lista ordenada das
+linhas em que ele aparece (posting list). A busca continua sendo por trecho
+(como no str.contains): uma palavra da consulta casa com todos os tokens do
+vocabulário que a contêm, e o vocabulário é muito menor que o texto completo.
+
+RankingBM25 ordena os resultados por relevância, com pesos por campo.
+"""
+import numpy as np
+import pandas as pd
+from normalizacao import normalizar_serie
+
+VAZIO = np.empty(0, dtype=np.int64)
+
+
+class IndiceBusca:
+    """
+    Índice sobre uma Series de textos já normalizados (coluna 'busca').
+
+    - _vocab: tokens distintos (separados por espaço em branco).
+    - _linhas / _inicio: posting lists concatenadas; as linhas do token i
+      ficam em _linhas[_inicio[i]:_inicio[i + 1]], em ordem crescente.
+    - Frases exatas: as palavras da frase geram os candidatos pelo índice e
+      só esses candidatos têm o texto conferido.
+    """
+
+    def __init__(self, serie_busca, textos_das_linhas=None):
+        """
+        textos_das_linhas(posicoes): texto normalizado só dessas linhas, usado na
+        conferência das frases. Com ele o índice não guarda serie_busca, que pode
+        ser montada só para a construção e descartada.
+        """
+        textos = serie_busca.fillna('').astype(str).reset_index(drop=True)
+        if textos_das_linhas is None:
+            textos_das_linhas = lambda posicoes: serie_busca.iloc[posicoes]
+        self._textos_das_linhas = textos_das_linhas
+        self._rotulos = serie_busca.index.to_numpy()
+        self.n_linhas = len(textos)
+
+        tokens = textos.str.split()
+        qtd_por_linha = tokens.str.len().fillna(0).to_numpy(dtype=np.int64)
+        todos_tokens = tokens.explode().dropna().to_numpy()
+        linhas = np.repeat(np.arange(self.n_linhas, dtype=np.int64), qtd_por_linha)
+
+        codigos, vocab = pd.factorize(todos_tokens)
+        # Ordena por (token, linha) e remove repetições do mesmo token na linha
+        chave = np.unique(codigos.astype(np.int64) * max(self.n_linhas, 1) + linhas)
+        codigos = chave // max(self.n_linhas, 1)
+
+        self._vocab = pd.Series(vocab, dtype=object)
+        self._linhas = (chave % max(self.n_linhas, 1)).astype(np.int32)
+        self._inicio = np.searchsorted(codigos, np.arange(len(vocab) + 1))
+
+    def __len__(self):
+        return self.n_linhas
+
+    # --- CONSULTAS ---
+    def _tokens_com_trecho(self, trecho):
+        """Ids dos tokens do vocabulário que contêm o trecho."""
+        return np.flatnonzero(self._vocab.str.contains(trecho, regex=False).to_numpy())
+
+    def _linhas_com_trecho(self, ids_tokens):
+        """União (ordenada) das posting lists dos tokens informados."""
+        if len(ids_tokens) == 0:
+            return VAZIO
+        inicio = self._inicio[ids_tokens]
+        tamanhos = self._inicio[ids_tokens + 1] - inicio
+        if len(ids_tokens) == 1:
+            return self._linhas[inicio[0]:inicio[0] + tamanhos[0]].astype(np.int64)
+
+        # Expande todos os intervalos de uma vez e marca as linhas encontradas
+        deslocamento = np.repeat(inicio - np.cumsum(tamanhos) + tamanhos, tamanhos)
+        posicoes = deslocamento + np.arange(tamanhos.sum())
+        marcadas = np.zeros(self.n_linhas, dtype=bool)
+        marcadas[self._linhas[posicoes]] = True
+        return np.flatnonzero(marcadas)
+
+    def _posicoes_palavras(self, palavras):
+        """Interseção das linhas de cada palavra, começando pela menor lista."""
+        if not palavras:
+            return np.arange(self.n_linhas)
+
+        # Estima o tamanho de cada lista pelo total de postings dos tokens
+        candidatos = []
+        for palavra in dict.fromkeys(palavras):
+            ids = self._tokens_com_trecho(palavra)
+            estimativa = int((self._inicio[ids + 1] - self._inicio[ids]).sum())
+            if estimativa == 0:
+                return VAZIO
+            candidatos.append((estimativa, ids))
+        candidatos.sort(key=lambda item: item[0])
+
+        resultado = self._linhas_com_trecho(candidatos[0][1])
+        for _, ids in candidatos[1:]:
+            if len(resultado) == 0:
+                break
+            resultado = np.intersect1d(resultado, self._linhas_com_trecho(ids), assume_unique=True)
+        return resultado
+
+    def posicoes_frase(self, frase):
+        """Posições (crescentes) das linhas cujo texto contém a frase literal."""
+        posicoes = self._posicoes_palavras(frase.split())
+        if len(posicoes) == 0:
+            return VAZIO
+        confere = self._textos_das_linhas(posicoes).str.contains(frase, regex=False, na=False).to_numpy(dtype=bool)
+        return posicoes[confere]
+
+    def posicoes_busca(self, termo_normalizado):
+        """Posições das linhas para um termo já normalizado ("frase exata" ou palavras soltas)."""
+        if termo_normalizado.startswith('"') and termo_normalizado.endswith('"'):
+            return self.posicoes_frase(termo_normalizado[1:-1])
+        return self._posicoes_palavras(termo_normalizado.split())
+
+    def buscar_palavras(self, palavras):
+        """Rótulos das linhas que contêm todas as palavras (AND)."""
+        return self._rotulos[self._posicoes_palavras(palavras)]
+
+    def buscar_frase(self, frase):
+        """Rótulos das linhas cujo texto contém a frase literal."""
+        return self._rotulos[self.posicoes_frase(frase)]
+
+
+class RankingBM25:
+    """
+    Pontuação BM25 (com pesos por campo, no estilo BM25F) para ordenar
+    resultados por relevância.
+
+    As frequências dos termos (já multiplicadas pelo peso do campo) e o
+    tamanho ponderado de cada documento são calculados uma única vez; na
+    consulta só se somam as posting lists dos tokens que contêm cada palavra.
+    """
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, df, pesos):
+        n = len(df)
+        self.n_linhas = n
+        self._rotulos = pd.Index(df.index)
+
+        docs, tokens, pesos_tok = [], [], []
+        for coluna, peso in pesos.items():
+            if coluna not in df.columns:
+                continue
+            textos = normalizar_serie(df[coluna].reset_index(drop=True)).str.split()
+            qtd = textos.str.len().fillna(0).to_numpy(dtype=np.int64)
+            docs.append(np.repeat(np.arange(n, dtype=np.int64), qtd))
+            tokens.append(textos.explode().dropna().to_numpy())
+            pesos_tok.append(np.full(qtd.sum(), peso, dtype=np.float64))
+
+        docs = np.concatenate(docs) if docs else VAZIO
+        pesos_tok = np.concatenate(pesos_tok) if pesos_tok else np.empty(0)
+        codigos, vocab = pd.factorize(np.concatenate(tokens) if tokens else np.empty(0, dtype=object))
+
+        # Tamanho ponderado de cada documento e média da base
+        self._tamanhos = np.bincount(docs, weights=pesos_tok, minlength=n)
+        self._tamanho_medio = self._tamanhos.mean() if n else 0.0
+
+        # Frequência ponderada por (token, documento), agrupada por token
+        chave, inverso = np.unique(codigos.astype(np.int64) * max(n, 1) + docs, return_inverse=True)
+        self._freqs = np.bincount(inverso, weights=pesos_tok, minlength=len(chave))
+        self._docs = (chave % max(n, 1)).astype(np.int32)
+        self._inicio = np.searchsorted(chave // max(n, 1), np.arange(len(vocab) + 1))
+        self._vocab = pd.Series(vocab, dtype=object)
+
+    def _frequencias(self, palavra):
+        """Frequência ponderada da palavra (como trecho de token) em cada documento."""
+        ids = np.flatnonzero(self._vocab.str.contains(palavra, regex=False).to_numpy())
+        if len(ids) == 0:
+            return None
+        inicio = self._inicio[ids]
+        tamanhos = self._inicio[ids + 1] - inicio
+        posicoes = np.repeat(inicio - np.cumsum(tamanhos) + tamanhos, tamanhos) + np.arange(tamanhos.sum())
+        return np.bincount(self._docs[posicoes], weights=self._freqs[posicoes], minlength=self.n_linhas)
+
+    def pontuar(self, palavras, rotulos):
+        """Pontuação BM25 das linhas informadas (rótulos do DataFrame original)."""
+        posicoes = self._rotulos.get_indexer(rotulos)
+        pontos = np.zeros(len(posicoes))
+        if self.n_linhas == 0 or len(posicoes) == 0:
+            return pontos
+
+        normalizacao = self.K1 * (1 - self.B + self.B * self._tamanhos[posicoes] / max(self._tamanho_medio, 1e-9))
+        for palavra in dict.fromkeys(palavras):
+            freqs = self._frequencias(palavra)
+            if freqs is None:
+                continue
+            n_docs = np.count_nonzero(freqs)
+            idf = np.log(1 + (self.n_linhas - n_docs + 0.5) / (n_docs + 0.5))
+            tf = freqs[posicoes]
+            pontos += idf * tf * (self.K1 + 1) / (tf + normalizacao)
+        return pontos
@@ -1,13 +1,11 @@
-from sqlalchemy import create_engine, text
-from db_config import get_db_connection_string
-
-db_connection_string = get_db_connection_string()
+from sqlalchemy import text
+from db_config import create_db_engine
 
 print("Iniciando conexão de manutenção...")
 
 try:
-    # Conecta ao banco
-    engine = create_engine(db_connection_string)
+    # Conecta ao banco (mesmo engine do app, com timeout de conexão)
+    engine = create_db_engine()
     
     # Executa uma consulta muito leve (apenas pede o horário atual)
     with engine.connect() as connection:
@@ -17,4 +15,4 @@ try:
 except Exception as e:
     print(f"Erro ao conectar: {e}")
     # Opcional: fazer o script falhar para o GitHub avisar por email
-    raise e
\ No newline at end of file
+    raise e
@@ -0,0 +1,102 @@
+"""
+Leitura rápida dos parágrafos de um .docx, sem o python-docx.
+
+Os extratores só precisam do texto e do nome do estilo de cada parágrafo.
+Em vez de montar o modelo de objetos inteiro, lê word/styles.xml e
+word/document.xml direto do zip com iterparse, liberando cada parágrafo
+depois de lido. O resultado é o mesmo de document.paragraphs no python-docx:
+só os parágrafos do corpo (fora de tabelas), texto dos runs e hyperlinks,
+e os nomes de estilo como a interface mostra ('heading 1' vira 'Heading 1').
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BODY, _P, _R, _HYPERLINK = W + "body", W + "p", W + "r", W + "hyperlink"
+_PPR, _PSTYLE, _VAL = W + "pPr", W + "pStyle", W + "val"
+_STYLE, _NAME, _TYPE, _DEFAULT, _STYLE_ID = W + "style", W + "name", W + "type", W + "default", W + "styleId"
+_T, _BR = W + "t", W + "br"
+
+# Elementos de um run que viram texto (como Run.text no python-docx)
+TEXTO_FIXO = {W + "tab": "\t", W + "ptab": "\t", W + "cr": "\n", W + "noBreakHyphen": "-"}
+
+# Nomes internos do styles.xml que a interface (e o python-docx) mostram diferente
+NOMES_INTERFACE = {"caption": "Caption", "footer": "Footer", "header": "Header",
+                   **{f"heading {n}": f"Heading {n}" for n in range(1, 10)}}
+
+# Estilo padrão do python-docx quando o arquivo não tem styles.xml
+ESTILO_SEM_STYLES = "Normal"
+
+
+def _estilos(pacote):
+    """({styleId: nome} dos estilos de parágrafo, nome do estilo de parágrafo padrão)."""
+    try:
+        xml = pacote.open("word/styles.xml")
+    except KeyError:
+        return {}, ESTILO_SEM_STYLES
+    nomes, padrao = {}, None
+    with xml:
+        for _, elem in ET.iterparse(xml):
+            if elem.tag != _STYLE:
+                continue
+            if elem.get(_TYPE, "paragraph") == "paragraph":
+                no_nome = elem.find(_NAME)
+                nome = None if no_nome is None else no_nome.get(_VAL)
+                nome = NOMES_INTERFACE.get(nome, nome)
+                nomes[elem.get(_STYLE_ID)] = nome
+                if padrao is None and elem.get(_DEFAULT) in ("1", "true", "on"):
+                    padrao = nome
+            elem.clear()
+    return nomes, padrao
+
+
+def _texto_do_run(run):
+    partes = []
+    for elem in run:
+        if elem.tag == _T:
+            partes.append(elem.text or "")
+        elif elem.tag == _BR:
+            # Quebra de linha vira \n; quebra de página ou coluna não gera texto
+            partes.append("\n" if elem.get(W + "type", "textWrapping") == "textWrapping" else "")
+        elif elem.tag in TEXTO_FIXO:
+            partes.append(TEXTO_FIXO[elem.tag])
+    return "".join(partes)
+
+
+def _texto_do_paragrafo(p):
+    partes = []
+    for filho in p:
+        if filho.tag == _R:
+            partes.append(_texto_do_run(filho))
+        elif filho.tag == _HYPERLINK:
+            partes.extend(_texto_do_run(run) for run in filho.findall(_R))
+    return "".join(partes)
+
+
+def _estilo_do_paragrafo(p, nomes, padrao):
+    ppr = p.find(_PPR)
+    estilo = ppr.find(_PSTYLE) if ppr is not None else None
+    estilo_id = estilo.get(_VAL) if estilo is not None else None
+    # Estilo inexistente (ou de outro tipo) cai no padrão, como no python-docx
+    return nomes.get(estilo_id, padrao) if estilo_id else padrao
+
+
+def paragrafos_docx(caminho):
+    """Gera (nome do estilo, texto) de cada parágrafo do corpo do documento, em ordem."""
+    with zipfile.ZipFile(caminho) as pacote:
+        nomes, padrao = _estilos(pacote)
+        with pacote.open("word/document.xml") as xml:
+            profundidade, corpo = 0, None
+            for evento, elem in ET.iterparse(xml, events=("start", "end")):
+                if evento == "start":
+                    profundidade += 1
+                    if profundidade == 2 and elem.tag == _BODY:
+                        corpo = elem
+                    continue
+                profundidade -= 1
+                # Só os filhos diretos do corpo; parágrafos de tabelas ficam de fora
+                if profundidade != 2 or corpo is None:
+                    continue
+                if elem.tag == _P:
+                    yield _estilo_do_paragrafo(elem, nomes, padrao) or "", _texto_do_paragrafo(elem)
+                corpo.remove(elem)
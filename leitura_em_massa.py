@@ -0,0 +1,73 @@
+"""
+Leitura em massa de consultas inteiras (tabelas do app e relatórios).
+
+No Postgres, a consulta vira COPY (SELECT ...) TO STDOUT em CSV, que o
+pyarrow lê direto para colunas Arrow; o DataFrame sai com strings
+Arrow-backed, sem passar por uma tupla Python por linha como no read_sql.
+Nos outros bancos (SQLite local) continua o pd.read_sql_query.
+"""
+import io
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from sqlalchemy import text
+from db_config import definir_timeout, timeout_do_engine, registrar_consulta
+
+# OIDs dos tipos do Postgres que não são lidos como texto
+TIPOS_POSTGRES = {
+    16: pa.bool_(),
+    20: pa.int64(), 21: pa.int64(), 23: pa.int64(),
+    700: pa.float64(), 701: pa.float64(), 1700: pa.float64(),
+    1082: pa.date32(), 1114: pa.timestamp("us"),
+}
+
+
+# Textos continuam nas colunas Arrow (o "str" do pandas 3), em qualquer versão
+# do pandas; sem isso o pandas 2 converte cada texto em um objeto Python. Os
+# números ficam em NumPy, como no read_sql_query do SQLite.
+try:
+    TIPO_TEXTO = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:
+    TIPO_TEXTO = pd.StringDtype("pyarrow_numpy")  # pandas 2.1/2.2
+TIPOS_PANDAS = {pa.string(): TIPO_TEXTO, pa.large_string(): TIPO_TEXTO}
+
+
+def _tipos_das_colunas(cursor, sql):
+    """Nome e tipo Arrow de cada coluna do resultado (consulta sem linhas)."""
+    cursor.execute(f"SELECT * FROM ({sql}) AS consulta LIMIT 0")
+    return {coluna.name: TIPOS_POSTGRES.get(coluna.type_code, pa.string()) for coluna in cursor.description}
+
+
+def ler_sql(engine, sql):
+    """DataFrame com o resultado da consulta (sem parâmetros), pelo COPY no Postgres."""
+    if engine.dialect.name != "postgresql":
+        return pd.read_sql_query(text(sql), engine)
+
+    conexao = engine.raw_connection()
+    try:
+        cursor = conexao.cursor()
+        # Conexão crua: não passa pelos eventos do engine, então timeout e métricas vão aqui
+        definir_timeout(cursor, timeout_do_engine(engine))
+        tipos = _tipos_das_colunas(cursor, sql)
+        dados = io.BytesIO()
+        copy = f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+        inicio = time.perf_counter()
+        cursor.copy_expert(copy, dados)
+        registrar_consulta(copy, (time.perf_counter() - inicio) * 1000, cursor.rowcount)
+        conexao.commit()
+    finally:
+        conexao.close()
+
+    dados.seek(0)
+    tabela = pa_csv.read_csv(
+        dados,
+        # Textos longos (teses) podem ter quebras de linha dentro das aspas
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        # No CSV do COPY, NULL é campo vazio sem aspas e '' é ""
+        convert_options=pa_csv.ConvertOptions(column_types=tipos, null_values=[""],
+                                              strings_can_be_null=True, quoted_strings_can_be_null=False),
+    )
+    # split_blocks/self_destruct: cada coluna Arrow é liberada assim que convertida
+    return tabela.to_pandas(types_mapper=TIPOS_PANDAS.get, split_blocks=True, self_destruct=True)
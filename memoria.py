@@ -0,0 +1,38 @@
+"""
+Representação compacta dos DataFrames que o app mantém em cache.
+
+Cada worker do Streamlit Cloud guarda as três bases inteiras; as colunas
+listadas pelo app como de poucos valores distintos (órgão, disciplina,
+ramo...) viram categorias (códigos inteiros + uma cópia de cada texto) e os
+números de tema/informativo viram int32. O texto de busca normalizado não fica
+na base (o índice é montado a partir das colunas originais).
+relatorio_memoria() compara os bytes por coluna antes e depois.
+"""
+import numpy as np
+import pandas as pd
+
+def bytes_por_coluna(df):
+    """Bytes ocupados por coluna (contando o conteúdo dos textos)."""
+    return df.memory_usage(index=False, deep=True)
+
+
+def compactar(df, categoricas=(), inteiras=()):
+    """
+    Converte as colunas informadas para category / int32 (no próprio DataFrame).
+    A lista de categóricas é a decisão: vale para bases de qualquer tamanho.
+    """
+    for col in categoricas:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in inteiras:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.int32)
+    return df
+
+
+def relatorio_memoria(antes, depois):
+    """Tabela (KB) com os bytes por coluna antes e depois da compactação, mais o total."""
+    relatorio = pd.DataFrame({"Antes (KB)": antes, "Depois (KB)": depois}).fillna(0) / 1024
+    relatorio.loc["TOTAL"] = relatorio.sum()
+    relatorio["Redução (%)"] = (100 * (1 - relatorio["Depois (KB)"] / relatorio["Antes (KB)"].where(relatorio["Antes (KB)"] > 0))).fillna(0)
+    return relatorio.round(1)
@@ -0,0 +1,53 @@
+"""
+Normalização de texto compartilhada entre os importadores e o app.
+
+A coluna 'busca' de cada tabela é gravada já normalizada (NFKD, sem acentos,
+minúsculas) no momento da importação, e as consultas do app passam pela mesma
+função; assim "licitacao" encontra "licitação".
+"""
+import sys
+import unicodedata
+import numpy as np
+import pandas as pd
+
+# Colunas que compõem o texto de busca de cada tabela (na ordem de junção)
+COLUNAS_BUSCA_INFORMATIVOS = ['disciplina', 'assunto', 'tese', 'orgao']
+COLUNAS_BUSCA_STF = ["Tema", "Tese", "Leading Case", "Título", "Situação do Tema", "Ramo do Direito"]
+COLUNAS_BUSCA_STJ = ["Tema", "Tese Firmada", "Processo", "Ramo do direito", "Situação do Tema", "Questão submetida a julgamento"]
+
+# Tabela de tradução que remove todos os caracteres combinantes (acentos)
+_SEM_COMBINANTES = {c: None for c in range(sys.maxunicode + 1) if unicodedata.combining(chr(c))}
+
+
+def normalizar_texto_regex(texto):
+    if not isinstance(texto, str): return ""
+    nfkd = unicodedata.normalize('NFKD', texto)
+    return nfkd.translate(_SEM_COMBINANTES).lower()
+
+
+def _como_texto(serie):
+    """Series como texto, nulos viram ''."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(str).fillna('')
+    return serie.fillna('').astype(str)
+
+
+def normalizar_serie(serie):
+    """Versão vetorizada de normalizar_texto_regex para uma Series de textos."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # Normaliza só as categorias distintas e espalha pelos códigos (nulo = '')
+        categorias = normalizar_serie(pd.Series(serie.cat.categories)).to_numpy(dtype=object)
+        valores = np.append(categorias, '')[serie.cat.codes.to_numpy()]
+        return pd.Series(valores, index=serie.index, dtype=str)
+    return _como_texto(serie).str.normalize('NFKD').str.translate(_SEM_COMBINANTES).str.lower()
+
+
+def montar_coluna_busca(df, colunas):
+    """Junta as colunas existentes com espaço e normaliza (sem laço por linha)."""
+    existentes = [c for c in colunas if c in df.columns]
+    if not existentes:
+        return pd.Series('', index=df.index)
+    texto = _como_texto(df[existentes[0]])
+    for col in existentes[1:]:
+        texto = texto + ' ' + _como_texto(df[col])
+    return normalizar_serie(texto)
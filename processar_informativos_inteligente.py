@@ -1,48 +1,38 @@
 import pandas as pd
 from sqlalchemy import text
 from pathlib import Path
-from docx import Document
-import json
-import os
-from datetime import datetime
+from leitor_docx import paragrafos_docx
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from db_config import create_db_engine
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_INFORMATIVOS
+from repositorio import registrar_alteracao
+from diferencas_informativos import aplicar_diferencas
+from estado_ingestao import carregar_estado, gravar_estado, remover_estado, comparar, adotar_estado_json
 
 # --- CONFIGURAÇÕES ---
 # Defina o caminho para a sua pasta principal de informativos.
 PASTA_PRINCIPAL_INFORMATIVOS = r"G:\Meu Drive\Direito\Informativos"
 
-# 3. Nome do arquivo que guardará o estado do processamento.
+# 3. Estado antigo (JSON local), usado só para migrar para a tabela ingest_state.
 ARQUIVO_ESTADO = "processamento_estado.json"
 
-def carregar_estado():
-    """Carrega o estado do último processamento (datas de modificação)."""
-    if os.path.exists(ARQUIVO_ESTADO):
-        with open(ARQUIVO_ESTADO, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {} # Retorna um dicionário vazio se o JSON estiver corrompido
-    return {}
-
-def salvar_estado(estado):
-    """Salva o novo estado do processamento."""
-    with open(ARQUIVO_ESTADO, 'w', encoding='utf-8') as f:
-        json.dump(estado, f, indent=4)
+# 4. Processos usados na extração dos .docx (None = um por núcleo da máquina).
+PROCESSOS_EXTRACAO = None
+
+COLUNAS_EXTRAIDAS = ["arquivo_fonte", "orgao", "disciplina", "assunto", "tese"]
 
 def extrair_dados_docx(docx_path):
     """Extrai os dados de um único arquivo .docx."""
     dados_extraidos = []
     nome_arquivo, orgao = docx_path.name, docx_path.parent.name
     
-    document = Document(docx_path)
     current_disciplina, current_assunto = "NÃO CLASSIFICADO", "NÃO CLASSIFICADO"
     capturando_tese = False
 
-    for para in document.paragraphs:
-        texto_paragrafo = para.text.strip()
+    for estilo, texto in paragrafos_docx(docx_path):
+        texto_paragrafo = texto.strip()
         if not texto_paragrafo: continue
-
-        estilo = para.style.name
         
         if estilo.startswith(('Heading 1', 'Título 1')):
             current_disciplina = texto_paragrafo
@@ -64,85 +54,172 @@ def extrair_dados_docx(docx_path):
             capturando_tese = False
     return dados_extraidos
 
+def _extrair_com_tempo(docx_path):
+    """Roda em um processo do pool: linhas extraídas do arquivo e tempo gasto."""
+    inicio = time.perf_counter()
+    return extrair_dados_docx(docx_path), time.perf_counter() - inicio
+
+def _concluidos_em_sequencia(arquivos):
+    for i, docx_path in enumerate(arquivos):
+        try:
+            yield i, _extrair_com_tempo(docx_path)
+        except Exception as e:
+            raise RuntimeError(f"falha ao extrair '{docx_path.name}': {e}") from e
+
+def _concluidos_no_pool(executor, arquivos):
+    futuros = {executor.submit(_extrair_com_tempo, docx_path): i for i, docx_path in enumerate(arquivos)}
+    for futuro in as_completed(futuros):
+        i = futuros[futuro]
+        try:
+            yield i, futuro.result()
+        except Exception as e:
+            raise RuntimeError(f"falha ao extrair '{arquivos[i].name}': {e}") from e
+
+def extrair_em_paralelo(arquivos, processos=PROCESSOS_EXTRACAO):
+    """
+    Extrai os arquivos em um pool de processos, mostrando o progresso.
+    As linhas voltam na ordem da lista de arquivos, qualquer que seja a ordem
+    em que as extrações terminam. Com um só arquivo (ou processos=1) não
+    abre o pool: a extração roda no próprio processo.
+    """
+    resultados = [None] * len(arquivos)
+    inicio = time.perf_counter()
+    executor = None if len(arquivos) == 1 or processos == 1 else ProcessPoolExecutor(max_workers=processos)
+    try:
+        concluidos = _concluidos_em_sequencia(arquivos) if executor is None else _concluidos_no_pool(executor, arquivos)
+        for n, (i, (dados, segundos)) in enumerate(concluidos, 1):
+            resultados[i] = dados
+            print(f"  [{n}/{len(arquivos)}] '{arquivos[i].name}': {len(dados)} tese(s) em {segundos:.2f} s")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    print(f"Extração concluída em {time.perf_counter() - inicio:.1f} s.")
+    return [linha for dados in resultados for linha in dados]
+
+def _apagar_informativos(connection, arquivos):
+    if arquivos:
+        connection.execute(text("DELETE FROM informativos WHERE arquivo_fonte = :arquivo"),
+                           [{"arquivo": a} for a in arquivos])
+
 def main():
     print("--- INICIANDO PROCESSADOR INTELIGENTE DE INFORMATIVOS ---")
     
-    estado_anterior = carregar_estado()
-    novo_estado = estado_anterior.copy()
-    
     p = Path(PASTA_PRINCIPAL_INFORMATIVOS)
     if not p.exists():
         print(f"ERRO: A pasta de informativos não foi encontrada em '{PASTA_PRINCIPAL_INFORMATIVOS}'.")
         return
 
-    todos_os_arquivos_locais = list(p.rglob("*.docx"))
-    arquivos_para_processar = []
-    arquivos_modificados = []
-
-    print(f"\nVerificando {len(todos_os_arquivos_locais)} arquivos locais...")
-
-    for docx_path in todos_os_arquivos_locais:
-        nome_arquivo = docx_path.name
-        mod_time_timestamp = os.path.getmtime(docx_path)
-        mod_time_iso = datetime.fromtimestamp(mod_time_timestamp).isoformat()
-
-        if nome_arquivo not in estado_anterior:
-            print(f"  - NOVO: '{nome_arquivo}'")
-            arquivos_para_processar.append(docx_path)
-            novo_estado[nome_arquivo] = mod_time_iso
-        elif estado_anterior[nome_arquivo] < mod_time_iso:
-            print(f"  - MODIFICADO: '{nome_arquivo}'")
-            arquivos_para_processar.append(docx_path)
-            arquivos_modificados.append(nome_arquivo)
-            novo_estado[nome_arquivo] = mod_time_iso
-
-    if not arquivos_para_processar:
-        print("\nNenhum arquivo novo ou modificado para processar. Tudo atualizado!")
-        print("--- FINALIZADO ---")
+    processar(list(p.rglob("*.docx")), create_db_engine())
+    print("\n--- PROCESSAMENTO FINALIZADO ---")
+
+def processar(todos_os_arquivos_locais, engine, nomes_afetados=None):
+    """
+    Extrai e grava no banco o que mudou nos arquivos. Sem nomes_afetados, a
+    lista é a pasta inteira e o que estiver no estado e não nela foi removido.
+    Com nomes_afetados (modo vigia), só esses nomes são comparados com o
+    estado: a lista traz os que ainda existem, os demais foram removidos ou
+    renomeados.
+    """
+    # Estado da última ingestão (hash de cada arquivo), lido do banco
+    with engine.begin() as connection:
+        estado = carregar_estado(connection)
+        adotados = []
+        if not estado and nomes_afetados is None:
+            adotados = adotar_estado_json(connection, ARQUIVO_ESTADO, todos_os_arquivos_locais)
+    if adotados:
+        print(f"\nAproveitando {len(adotados)} arquivo(s) já processado(s) segundo '{ARQUIVO_ESTADO}'.")
+        estado = {registro["arquivo"]: registro for registro in adotados}
+    if nomes_afetados is not None:
+        estado = {nome: item for nome, item in estado.items() if nome in nomes_afetados}
+
+    print(f"\nVerificando {len(todos_os_arquivos_locais)} arquivos locais (hash do conteúdo)...")
+    plano = comparar(todos_os_arquivos_locais, estado)
+    for registro in plano["novos"]:
+        print(f"  - NOVO: '{registro['arquivo']}'")
+    for registro in plano["modificados"]:
+        print(f"  - MODIFICADO: '{registro['arquivo']}'")
+    for nome_antigo, registro in plano["renomeados"]:
+        print(f"  - RENOMEADO: '{nome_antigo}' -> '{registro['arquivo']}'")
+    for nome in plano["removidos"]:
+        print(f"  - REMOVIDO: '{nome}'")
+    print(f"  {plano['inalterados']} arquivo(s) sem alteração no conteúdo.")
+
+    arquivos_para_processar = plano["novos"] + plano["modificados"]
+    altera_informativos = arquivos_para_processar or plano["renomeados"] or plano["removidos"]
+    if not altera_informativos:
+        if adotados or plano["tocados"]:
+            # Nada a reprocessar, mas o estado ganha os hashes/mtimes atuais
+            with engine.begin() as connection:
+                gravar_estado(connection, adotados + plano["tocados"])
+        print("\nNenhum arquivo novo, modificado ou removido. Tudo atualizado!")
         return
 
-    engine = create_db_engine()
+    # Passo 1: Extrair os arquivos (em paralelo), antes de abrir qualquer transação
+    todos_os_novos_dados = []
+    if arquivos_para_processar:
+        print(f"\nProcessando {len(arquivos_para_processar)} arquivo(s)...")
+        try:
+            todos_os_novos_dados = extrair_em_paralelo([registro["caminho"] for registro in arquivos_para_processar])
+        except Exception as e:
+            print(f"\n!!!! OCORREU UM ERRO NA EXTRAÇÃO !!!!")
+            print("Nada foi alterado no banco de dados nem no estado do processamento.")
+            print(f"Detalhes do erro: {e}")
+            return
+
+    df_novos_dados = pd.DataFrame(todos_os_novos_dados, columns=COLUNAS_EXTRAIDAS)
+    if len(df_novos_dados):
+        df_novos_dados = df_novos_dados[
+            (df_novos_dados['disciplina'] != 'NÃO CLASSIFICADO') & 
+            (df_novos_dados['assunto'] != 'NÃO CLASSIFICADO') & 
+            (df_novos_dados['disciplina'] != 'ÍNDICE')
+        ].copy()
+    # Texto de busca já normalizado (sem acentos), lido pronto pelo app
+    df_novos_dados['busca'] = montar_coluna_busca(df_novos_dados, COLUNAS_BUSCA_INFORMATIVOS) if len(df_novos_dados) else []
+    linhas_por_arquivo = df_novos_dados['arquivo_fonte'].value_counts()
+    for registro in arquivos_para_processar:
+        registro["linhas"] = int(linhas_por_arquivo.get(registro["arquivo"], 0))
+
     try:
-        # --- INÍCIO DA LÓGICA DE TRANSAÇÃO CORRIGIDA ---
+        # Uma única transação: informativos e ingest_state mudam juntos ou nada muda
         with engine.connect() as connection:
             with connection.begin() as transaction: # Começa uma transação
                 try:
-                    # Passo 1: Apagar dados antigos de arquivos modificados
-                    if arquivos_modificados:
-                        print(f"\nApagando {len(arquivos_modificados)} registro(s) antigo(s) do banco de dados...")
-                        # Usar placeholders para segurança
-                        placeholders = ', '.join([f":file{i}" for i in range(len(arquivos_modificados))])
-                        params = {f"file{i}": filename for i, filename in enumerate(arquivos_modificados)}
-                        query = text(f"DELETE FROM informativos WHERE arquivo_fonte IN ({placeholders})")
-                        connection.execute(query, params)
-                        print("Registros antigos apagados.")
-
-                    # Passo 2: Processar e preparar novos dados
-                    print(f"\nProcessando {len(arquivos_para_processar)} arquivo(s)...")
-                    todos_os_novos_dados = []
-                    for docx_path in arquivos_para_processar:
-                        print(f"  - Extraindo de '{docx_path.name}'")
-                        todos_os_novos_dados.extend(extrair_dados_docx(docx_path))
-                    
-                    if todos_os_novos_dados:
-                        df_novos_dados = pd.DataFrame(todos_os_novos_dados)
-                        df_novos_dados = df_novos_dados[
-                            (df_novos_dados['disciplina'] != 'NÃO CLASSIFICADO') & 
-                            (df_novos_dados['assunto'] != 'NÃO CLASSIFICADO') & 
-                            (df_novos_dados['disciplina'] != 'ÍNDICE')
-                        ]
-
-                        # Passo 3: Inserir novos dados no banco de dados
-                        print(f"\nInserindo {len(df_novos_dados)} novo(s) registro(s) no banco de dados...")
-                        df_novos_dados.to_sql('informativos', connection, if_exists='append', index=False, method='multi')
-                        print("Novos registros inseridos com sucesso.")
+                    # Passo 2: Apagar as linhas dos arquivos removidos da pasta
+                    if plano["removidos"]:
+                        print(f"\nApagando registros de {len(plano['removidos'])} arquivo(s) removido(s)...")
+                        _apagar_informativos(connection, plano["removidos"])
+
+                    # Renomeações: o conteúdo é o mesmo, só troca o arquivo_fonte
+                    for nome_antigo, registro in plano["renomeados"]:
+                        connection.execute(text("UPDATE informativos SET arquivo_fonte = :novo WHERE arquivo_fonte = :antigo"),
+                                           {"novo": registro["arquivo"], "antigo": nome_antigo})
+
+                    # Passo 3: Comparar as linhas extraídas com as do banco e gravar só a diferença
+                    # (arquivos novos também: pode haver linhas de uma carga anterior ao ingest_state)
+                    alteradas = 0
+                    if arquivos_para_processar:
+                        print(f"\nComparando {len(df_novos_dados)} linha(s) extraída(s) com o banco de dados...")
+                        contagem = aplicar_diferencas(connection, df_novos_dados,
+                                                      [registro["arquivo"] for registro in arquivos_para_processar])
+                        alteradas = (contagem["inseridas"] + contagem["atualizadas"] + contagem["apagadas"]
+                                     + contagem["renumeradas"])
+                        print(f"Linhas: {contagem['inseridas']} inserida(s), {contagem['atualizadas']} atualizada(s), "
+                              f"{contagem['apagadas']} apagada(s), {contagem['renumeradas']} com posição regravada "
+                              f"({alteradas} tocada(s)), {contagem['inalteradas']} sem alteração.")
+
+                    # Passo 4: Estado da ingestão, na mesma transação
+                    remover_estado(connection, plano["removidos"] + [nome for nome, _ in plano["renomeados"]])
+                    gravar_estado(connection, adotados + plano["tocados"] + arquivos_para_processar
+                                  + [registro for _, registro in plano["renomeados"]])
+
+                    # Avisa o app (tabela de versões) que os informativos mudaram, se mudaram
+                    if alteradas or plano["removidos"] or plano["renomeados"]:
+                        registrar_alteracao(connection, 'informativos')
                     
                     # Se tudo correu bem, o 'with' fará o commit da transação
                     # transaction.commit() é chamado automaticamente ao sair do bloco 'with' sem erros
-                    
-                    # Passo 4: Salvar o novo estado apenas se a transação for bem-sucedida
-                    salvar_estado(novo_estado)
-                    print(f"\nEstado de processamento atualizado em '{ARQUIVO_ESTADO}'.")
+                    print("\nEstado de processamento atualizado na tabela 'ingest_state'.")
 
                 except Exception as e:
                     print(f"\n!!!! OCORREU UM ERRO DURANTE A OPERAÇÃO COM O BANCO DE DADOS !!!!")
@@ -155,7 +232,5 @@ def main():
         print(f"\n!!!! OCORREU UM ERRO GERAL !!!!")
         print(f"Detalhes do erro: {e}")
 
-    print("\n--- PROCESSAMENTO FINALIZADO ---")
-
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,6 +2,10 @@ import os
 import pandas as pd
 import warnings
 from db_config import create_db_engine
+from leitura_em_massa import ler_sql
+from gravacao_em_massa import gravar_df
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_STF
+from repositorio import registrar_alteracao
 
 # Ignora avisos
 warnings.filterwarnings("ignore")
@@ -16,7 +20,7 @@ def reclassificar_tudo():
     # 1. Carregar o Banco de Dados Atual
     print("Lendo banco de dados...")
     try:
-        df_banco = pd.read_sql("SELECT * FROM temas_stf", engine)
+        df_banco = ler_sql(engine, "SELECT * FROM temas_stf")
         if df_banco.empty:
             print("O banco está vazio. Nada a reclassificar.")
             return
@@ -86,10 +90,14 @@ def reclassificar_tudo():
             return "Não Classificado"
 
     df_banco['Ramo do Direito'] = df_banco.apply(atualizar_ramo, axis=1)
+    # O ramo faz parte do texto de busca
+    df_banco['busca'] = montar_coluna_busca(df_banco, COLUNAS_BUSCA_STF)
 
     # 4. Salvar de volta no Banco
     print("Salvando atualizações no banco...")
-    df_banco.to_sql('temas_stf', engine, if_exists='replace', index=False)
+    with engine.begin() as conn:
+        gravar_df(conn, df_banco, 'temas_stf', substituir=True)
+        registrar_alteracao(conn, 'temas_stf')  # todos os ramos podem ter mudado
     print("✅ PROCESSO CONCLUÍDO! O filtro do site deve estar limpo agora.")
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+"""
+Pré-classificação por palavra-chave ("tiro certo"), comum a importar_stf e
+relatorio_alteracoes.
+
+As regras vêm de um só arquivo versionado (regras_tiro_certo.json), em ordem
+de prioridade. Todas as palavras viram um único padrão compilado; cada texto
+é varrido uma vez (em vez de um re.search por palavra) e, entre as palavras
+encontradas, vale a de maior prioridade, como no laço antigo.
+"""
+import json
+import os
+import re
+import pandas as pd
+from normalizacao import normalizar_serie, normalizar_texto_regex
+
+ARQUIVO_REGRAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "regras_tiro_certo.json")
+
+
+class RegrasTiroCerto:
+    def __init__(self, regras, versao=None):
+        """regras: [(palavra, ramo)] em ordem de prioridade (palavras já normalizadas)."""
+        self.versao = versao
+        self._ramos, self._prioridade = {}, {}
+        for palavra, ramo in regras:
+            if palavra not in self._prioridade:
+                self._prioridade[palavra] = len(self._prioridade)
+                self._ramos[palavra] = ramo
+        # Lookahead: testa cada início de palavra, mesmo dentro de uma palavra-chave já
+        # encontrada; na mesma posição a alternância tenta as palavras em ordem de prioridade
+        alternativas = "|".join(re.escape(palavra) for palavra in self._prioridade)
+        self._padrao = re.compile(rf"\b(?=({alternativas})\b)") if alternativas else None
+
+    def __len__(self):
+        return len(self._prioridade)
+
+    def classificar(self, textos):
+        """Ramo da palavra de maior prioridade em cada texto (None se nenhuma aparece)."""
+        textos = pd.Series(textos, dtype=object).reset_index(drop=True)
+        if self._padrao is None or textos.empty:
+            return [None] * len(textos)
+        achados = normalizar_serie(textos).str.findall(self._padrao).explode().dropna()
+        primeira = achados.map(self._prioridade).groupby(level=0).min()
+        palavras = list(self._prioridade)
+        ramos = [None] * len(textos)
+        for i, p in primeira.items():
+            ramos[i] = self._ramos[palavras[p]]
+        return ramos
+
+
+def carregar_regras(caminho=ARQUIVO_REGRAS):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    regras = [(normalizar_texto_regex(palavra).strip(), grupo["ramo"]) for grupo in dados["regras"] for palavra in grupo["palavras"]]
+    regras_tiro_certo = RegrasTiroCerto(regras, dados.get("versao"))
+    print(f"Regras de tiro certo v{regras_tiro_certo.versao}: {len(regras_tiro_certo)} palavra(s).")
+    return regras_tiro_certo
@@ -1,12 +1,13 @@
 import pandas as pd
 import os
 import warnings
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
 import torch
 import numpy as np
-import unicodedata
-import re
+from cache_embeddings import CacheEmbeddings
 from db_config import create_db_engine
+from leitura_em_massa import ler_sql
+from regras_tiro_certo import carregar_regras
 
 warnings.filterwarnings("ignore")
 
@@ -17,23 +18,8 @@ ARQUIVO_STJ = "relatorio.csv"
 ARQUIVO_STF = "RepercussaoGeral.xls"
 
 # --- 2. PRECISÃO (REGRAS E FUNÇÕES) ---
-# Copiamos as mesmas regras do importador para garantir que a comparação seja justa
-PALAVRAS_TIRO_CERTO = {
-    'pis': 'Direito Tributário', 'cofins': 'Direito Tributário', 'irpj': 'Direito Tributário',
-    'csll': 'Direito Tributário', 'lucro presumido': 'Direito Tributário', 'lucro real': 'Direito Tributário',
-    'tributo': 'Direito Tributário', 'tributaria': 'Direito Tributário', 'imposto': 'Direito Tributário',
-    'icms': 'Direito Tributário', 'ipi': 'Direito Tributário', 'iss': 'Direito Tributário',
-    'execucao fiscal': 'Direito Tributário', 'inss': 'Direito Previdenciário',
-    'previdencia': 'Direito Previdenciário', 'beneficio assistencial': 'Direito Previdenciário',
-    'servidor publico': 'Direito Administrativo', 'improbidade': 'Direito Administrativo',
-    'penal': 'Direito Penal', 'crime': 'Direito Penal', 'pena': 'Direito Penal'
-}
-
-def normalizar_texto_regex(texto):
-    if not isinstance(texto, str): return ""
-    nfkd = unicodedata.normalize('NFKD', texto)
-    texto = u"".join([c for c in nfkd if not unicodedata.combining(c)])
-    return texto.lower()
+# As mesmas regras do importador (regras_tiro_certo.json), para a comparação ser justa
+REGRAS_TIRO_CERTO = carregar_regras()
 
 def carregar_arquivo_universal(caminho):
     print(f"Lendo arquivo original: {caminho}...")
@@ -48,8 +34,8 @@ def carregar_arquivo_universal(caminho):
 def gerar_classificacao_padrao():
     print("--- Recalculando padrão da IA para comparação ---")
     
-    # Carrega Modelo
-    model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2', device='cpu')
+    # Carrega Modelo (pelo cache de embeddings: só é carregado se algum texto for novo)
+    cache = CacheEmbeddings()
     
     # Carrega STJ
     if not os.path.exists(ARQUIVO_STJ): return None
@@ -69,7 +55,7 @@ def gerar_classificacao_padrao():
         if len(textos_por_ramo[ramo]) < 50000: textos_por_ramo[ramo] += " " + conteudo
             
     nomes_ramos = list(textos_por_ramo.keys())
-    embeddings_ramos = model.encode(list(textos_por_ramo.values()), convert_to_tensor=True)
+    embeddings_ramos = cache.codificar(list(textos_por_ramo.values()))
     
     # Carrega STF Original
     df_stf = carregar_arquivo_universal(ARQUIVO_STF)
@@ -86,36 +72,22 @@ def gerar_classificacao_padrao():
     
     # Classifica
     print("Classificando original...")
-    ramos_ia = []
     cols_texto = ['Título', 'Descrição', 'Tese', 'Assuntos']
-    indices_ia = []
-    textos_ia = []
+    textos = [" ".join([str(row.get(c, '')) for c in cols_texto]) for _, row in df_stf.iterrows()]
     
-    for idx, row in df_stf.iterrows():
-        # Regra de Ouro
-        txt_completo = " ".join([str(row.get(c, '')) for c in cols_texto])
-        txt_limpo = normalizar_texto_regex(txt_completo)
-        
-        achou = None
-        for p, r in PALAVRAS_TIRO_CERTO.items():
-            if re.search(r"\b" + re.escape(p) + r"\b", txt_limpo):
-                achou = r
-                break
-        
-        if achou:
-            ramos_ia.append(achou)
-        else:
-            ramos_ia.append(None)
-            indices_ia.append(idx)
-            textos_ia.append(txt_completo)
+    # Regra de Ouro, de uma vez para todos os temas
+    ramos_ia = REGRAS_TIRO_CERTO.classificar(textos)
+    indices_ia = [i for i, ramo in enumerate(ramos_ia) if ramo is None]
+    textos_ia = [textos[i] for i in indices_ia]
             
     # Completa com IA
     if indices_ia:
-        emb_stf = model.encode(textos_ia, convert_to_tensor=True)
+        emb_stf = cache.codificar(textos_ia)
         res = util.cos_sim(emb_stf, embeddings_ramos)
         idxs = res.argmax(dim=1).cpu().detach().numpy().flatten()
         for i, real_idx in enumerate(indices_ia):
             ramos_ia[real_idx] = nomes_ramos[idxs[i]]
+    cache.resumo()
             
     df_stf['Ramo_Padrao_IA'] = ramos_ia
     
@@ -128,7 +100,7 @@ def gerar_classificacao_padrao():
 def gerar_relatorio():
     # 1. Pega o estado atual do Banco (Onde estão suas edições)
     print("Lendo Banco de Dados (Suas Edições)...")
-    df_banco = pd.read_sql("SELECT * FROM temas_stf", engine)
+    df_banco = ler_sql(engine, "SELECT * FROM temas_stf")
     df_banco['Tema'] = pd.to_numeric(df_banco['Tema'], errors='coerce').fillna(0).astype(int)
     df_banco = df_banco[['Tema', 'Ramo do Direito']].rename(columns={'Ramo do Direito': 'Ramo_Atual_Banco'})
     
@@ -0,0 +1,68 @@
+"""
+Montagem de uma página de resultados como um único bloco markdown.
+
+Antes cada linha virava de 3 a 6 elementos (st.markdown, st.expander,
+st.divider), cada um uma mensagem separada para o navegador. Aqui o texto da
+página inteira (ou de um grupo de disciplina) é montado de uma vez sobre a
+fatia da página, e os detalhes ficam num <details> HTML em vez de um expander.
+Como o bloco vai com unsafe_allow_html, todo texto vindo do banco passa por
+html.escape.
+"""
+import html
+import urllib.parse
+import pandas as pd
+
+SEPARADOR = "\n\n---\n\n"
+
+
+def _texto(df, coluna, padrao='-', escapar=True):
+    """Coluna como texto (escapada para HTML), com nulos (ou coluna ausente) trocados pelo padrão."""
+    if coluna not in df.columns:
+        return pd.Series(padrao, index=df.index, dtype=object)
+    serie = df[coluna].astype(object)
+    serie = serie.where(serie.notna(), padrao).astype(str)
+    return serie.map(html.escape) if escapar else serie
+
+
+def _detalhes(titulo, corpo):
+    """Bloco recolhível; as linhas em branco deixam o markdown do corpo ser interpretado."""
+    return f"<details><summary>{titulo}</summary>\n\n" + corpo + "\n\n</details>"
+
+
+def markdown_informativos(df):
+    """Itens de informativos (um grupo de disciplina) em um único markdown."""
+    arquivos = _texto(df, 'arquivo_fonte', 'N/A')
+    buscas = (_texto(df, 'arquivo_fonte', 'N/A', escapar=False).str.replace('.docx', '', regex=False)
+              + " dizer o direito").map(urllib.parse.quote_plus)
+    links = ('<a href="https://www.google.com/search?q=' + buscas + '" target="_blank">'
+             + arquivos.str.replace('.docx', '.pdf', regex=False) + '</a>')
+    itens = ("**ASSUNTO:** " + _texto(df, 'assunto', '', escapar=False).str.upper().map(html.escape)
+             + "\n\n**TESE:** " + _texto(df, 'tese', '') + " em " + links
+             + " **(" + _texto(df, 'orgao', 'N/A') + ")**")
+    return SEPARADOR.join(itens) + SEPARADOR
+
+
+def markdown_temas_stf(df, aviso_login=True):
+    """Página de temas do STF (sem o formulário de edição, que é só do admin)."""
+    detalhes = ("**Situação:** " + _texto(df, 'Situação do Tema')
+                + "\n\n**Leading Case:** " + _texto(df, 'Leading Case')
+                + "\n\n**Julgamento:** " + _texto(df, 'Data do Julgamento'))
+    if aviso_login:
+        detalhes = detalhes + "\n\n*🔒 Faça login como admin na barra lateral para editar.*"
+    itens = ("#### Tema " + _texto(df, 'Tema', 'N/A') + " :blue-background[" + _texto(df, 'Ramo do Direito', 'Não Classificado') + "]"
+             + "\n\n**Título:** " + _texto(df, 'Título', 'N/A')
+             + "\n\n**Tese:** " + _texto(df, 'Tese', 'Pendente')
+             + "\n\n" + detalhes.map(lambda corpo: _detalhes("Ver detalhes / Editar Classificação", corpo)))
+    return SEPARADOR.join(itens) + SEPARADOR
+
+
+def markdown_temas_stj(df):
+    """Página de temas do STJ."""
+    detalhes = ("**Processo:** " + _texto(df, 'Processo')
+                + "\n\n**Situação:** " + _texto(df, 'Situação do Tema')
+                + "\n\n**Trânsito em Julgado:** " + _texto(df, 'Trânsito em Julgado'))
+    itens = ("#### Tema " + _texto(df, 'Tema') + " :blue-background[" + _texto(df, 'Ramo do direito', 'N/A') + "]"
+             + "\n\n**Questão submetida a julgamento:** " + _texto(df, 'Questão submetida a julgamento')
+             + "\n\n**Tese Firmada:** " + _texto(df, 'Tese Firmada')
+             + "\n\n" + detalhes.map(lambda corpo: _detalhes("Ver Detalhes", corpo)))
+    return SEPARADOR.join(itens) + SEPARADOR
@@ -0,0 +1,327 @@
+"""
+Camada de acesso aos dados das três tabelas do app (informativos, temas_stf, temas_stj).
+
+Há duas implementações com a mesma interface:
+- RepositorioPostgres: o banco do Supabase; a busca por palavras vira LIKE na
+  coluna 'busca' (acelerado por índice de trigramas, ver criar_indices_busca).
+- RepositorioSQLite: arquivo local com uma tabela FTS5 (tokenizador trigram)
+  sobre a coluna 'busca', para rodar o app sem o Supabase.
+
+Use criar_repositorio(engine) para obter a implementação certa pelo dialeto.
+Toda gravação nessas tabelas deve chamar registrar_alteracao(conn, tabela, ...)
+na mesma transação, para o app saber qual base recarregar.
+"""
+import pandas as pd
+from sqlalchemy import text
+from normalizacao import normalizar_texto_regex, montar_coluna_busca, COLUNAS_BUSCA_STF
+from leitura_em_massa import ler_sql
+
+# Colunas lidas pelo app e filtros aceitos (nome do filtro -> coluna da tabela).
+# Nas tabelas de temas: "chave" é a coluna da paginação por chave (única, ordem
+# decrescente), "tese" é a coluna do filtro com_tese e "padroes" são os valores
+# que o app usa no lugar de nulos.
+TABELAS = {
+    "informativos": {
+        "colunas": ["arquivo_fonte", "disciplina", "assunto", "tese", "orgao", "busca"],
+        "filtros": {"orgao": "orgao", "disciplina": "disciplina", "assunto": "assunto", "arquivo_fonte": "arquivo_fonte"},
+        "ordem": '"disciplina", "assunto"',
+    },
+    "temas_stf": {
+        "colunas": ["Tema", "Título", "Tese", "Leading Case", "Situação do Tema", "Ramo do Direito", "Data do Julgamento", "busca"],
+        "filtros": {"ramo": "Ramo do Direito"},
+        "ordem": '"Tema" DESC',
+        "chave": "Tema",
+        "tese": "Tese",
+        "padroes": {"Ramo do Direito": "Não Classificado"},
+    },
+    "temas_stj": {
+        "colunas": ["Tema", "Tese Firmada", "Processo", "Ramo do direito", "Situação do Tema", "Questão submetida a julgamento", "Trânsito em Julgado", "busca"],
+        "filtros": {"ramo": "Ramo do direito"},
+        "ordem": '"Tema" DESC',
+        "chave": "Tema",
+        "tese": "Tese Firmada",
+    },
+}
+
+
+def _aspas(coluna):
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+def _escapar_like(trecho):
+    return trecho.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def termos_da_busca(termo_busca):
+    """
+    Separa a consulta como o filtrar_dados do app:
+    - Com aspas: um único termo (a frase exata).
+    - Sem aspas: uma lista de palavras (AND).
+    """
+    termo_busca = normalizar_texto_regex(termo_busca or '').strip()
+    if not termo_busca:
+        return []
+    if termo_busca.startswith('"') and termo_busca.endswith('"'):
+        return [termo_busca[1:-1]]
+    return termo_busca.split()
+
+
+# --- VERSÕES DAS TABELAS ---
+# versoes_dados: uma linha por tabela com a versão atual (incrementada a cada
+# gravação). alteracoes_dados: as chaves alteradas em cada versão; chave nula
+# indica que a tabela mudou inteira (o app recarrega tudo).
+SQL_TABELAS_VERSAO = [
+    "CREATE TABLE IF NOT EXISTS versoes_dados (tabela TEXT PRIMARY KEY, versao BIGINT NOT NULL, atualizado_em TIMESTAMP)",
+    "CREATE TABLE IF NOT EXISTS alteracoes_dados (tabela TEXT NOT NULL, versao BIGINT NOT NULL, chave BIGINT)",
+    "CREATE INDEX IF NOT EXISTS idx_alteracoes_dados_versao ON alteracoes_dados (tabela, versao)",
+]
+# Versões guardadas no histórico de alterações; um app mais atrasado que isso recarrega a tabela
+HISTORICO_VERSOES = 1000
+
+
+def registrar_alteracao(conn, tabela, chaves=None):
+    """
+    Incrementa a versão da tabela e registra as chaves alteradas (None = tabela
+    inteira). Deve rodar na mesma transação (conn) que gravou os dados.
+    """
+    for sql in SQL_TABELAS_VERSAO:
+        conn.execute(text(sql))
+    conn.execute(text("INSERT INTO versoes_dados (tabela, versao, atualizado_em) VALUES (:tabela, 1, CURRENT_TIMESTAMP) "
+                      "ON CONFLICT (tabela) DO UPDATE SET versao = versoes_dados.versao + 1, atualizado_em = CURRENT_TIMESTAMP"),
+                 {"tabela": tabela})
+    versao = conn.execute(text("SELECT versao FROM versoes_dados WHERE tabela = :tabela"), {"tabela": tabela}).scalar()
+    linhas = [{"tabela": tabela, "versao": versao, "chave": int(c)} for c in chaves] if chaves is not None else []
+    conn.execute(text("INSERT INTO alteracoes_dados (tabela, versao, chave) VALUES (:tabela, :versao, :chave)"),
+                 linhas or [{"tabela": tabela, "versao": versao, "chave": None}])
+    conn.execute(text("DELETE FROM alteracoes_dados WHERE tabela = :tabela AND versao <= :limite"),
+                 {"tabela": tabela, "limite": versao - HISTORICO_VERSOES})
+    return versao
+
+
+class RepositorioSQL:
+    """Consultas comuns aos dois bancos; a busca textual fica nas subclasses."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    # --- MONTAGEM DO WHERE ---
+    def _condicoes_texto(self, tabela, termos, params):
+        """Retorna (joins, condições) da busca por palavras na coluna 'busca'."""
+        condicoes = []
+        for i, termo in enumerate(termos):
+            params[f"termo{i}"] = f"%{_escapar_like(termo)}%"
+            condicoes.append(f"t.busca LIKE :termo{i} ESCAPE '\\'")
+        return "", condicoes
+
+    def _coluna(self, tabela, coluna):
+        """Coluna com o valor padrão do app no lugar de nulos (ex.: ramo 'Não Classificado')."""
+        padrao = TABELAS[tabela].get("padroes", {}).get(coluna)
+        if padrao is None:
+            return f"t.{_aspas(coluna)}"
+        return f"COALESCE(t.{_aspas(coluna)}, '{padrao}')"
+
+    def _montar_where(self, tabela, filtros=None, termo_busca=None, extras=None):
+        """
+        filtros: {nome: valor} dos filtros exatos da tabela, mais "com_tese"
+        (True: só com tese; False: só sem tese). extras: condições prontas.
+        """
+        config = TABELAS[tabela]
+        params, condicoes = {}, list(extras or [])
+        for nome, valor in (filtros or {}).items():
+            if nome == "com_tese":
+                operador = "<>" if valor else "="
+                condicoes.append(f"COALESCE(TRIM(t.{_aspas(config['tese'])}), '') {operador} ''")
+                continue
+            params[f"filtro_{nome}"] = valor
+            condicoes.append(f"{self._coluna(tabela, config['filtros'][nome])} = :filtro_{nome}")
+
+        joins, condicoes_texto = self._condicoes_texto(tabela, termos_da_busca(termo_busca), params)
+        condicoes += condicoes_texto
+        where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return joins + where, params
+
+    def _select(self, tabela, colunas=None):
+        colunas = colunas or TABELAS[tabela]["colunas"]
+        return f"SELECT {', '.join('t.' + _aspas(c) for c in colunas)} FROM {tabela} t"
+
+    # --- LEITURA ---
+    def carregar(self, tabela, colunas=None):
+        """Tabela inteira, só com as colunas usadas pelo app (COPY no Postgres)."""
+        return ler_sql(self.engine, self._select(tabela, colunas))
+
+    def filtrar(self, tabela, filtros, colunas=None):
+        """Linhas que batem com os filtros exatos (ex.: {"ramo": "Direito Penal"})."""
+        return self.buscar(tabela, None, filtros, colunas)
+
+    def buscar(self, tabela, termo_busca, filtros=None, colunas=None):
+        """Linhas que batem com os filtros e com a busca por palavras (ou frase entre aspas)."""
+        where, params = self._montar_where(tabela, filtros, termo_busca)
+        return pd.read_sql_query(text(self._select(tabela, colunas) + where), self.engine, params=params)
+
+    def paginar(self, tabela, pagina, por_pagina, filtros=None, termo_busca=None, colunas=None):
+        """Retorna (DataFrame da página, total de linhas) sem trazer a tabela inteira."""
+        where, params = self._montar_where(tabela, filtros, termo_busca)
+        with self.engine.connect() as conn:
+            total = conn.execute(text(f"SELECT COUNT(*) FROM {tabela} t" + where), params).scalar()
+            params_pagina = dict(params, limite=por_pagina, deslocamento=(max(pagina, 1) - 1) * por_pagina)
+            sql = self._select(tabela, colunas) + where + f" ORDER BY {TABELAS[tabela]['ordem']} LIMIT :limite OFFSET :deslocamento"
+            df = pd.read_sql_query(text(sql), conn, params=params_pagina)
+        return df, int(total or 0)
+
+    def valores_distintos(self, tabela, filtro):
+        """Valores distintos (ordenados) da coluna de um filtro, para os selectboxes."""
+        coluna = self._coluna(tabela, TABELAS[tabela]["filtros"][filtro])
+        with self.engine.connect() as conn:
+            valores = conn.execute(text(f"SELECT DISTINCT {coluna} FROM {tabela} t WHERE {coluna} IS NOT NULL")).scalars().all()
+        return sorted(str(v) for v in valores)
+
+    def carregar_por_chaves(self, tabela, chaves, colunas=None):
+        """Linhas das chaves informadas (tabelas de temas), para atualizar a base em memória."""
+        chaves = [int(c) for c in chaves]
+        if not chaves:
+            return pd.DataFrame(columns=colunas or TABELAS[tabela]["colunas"])
+        marcadores = ", ".join(f":chave{i}" for i in range(len(chaves)))
+        sql = self._select(tabela, colunas) + f" WHERE t.{_aspas(TABELAS[tabela]['chave'])} IN ({marcadores})"
+        return pd.read_sql_query(text(sql), self.engine, params={f"chave{i}": c for i, c in enumerate(chaves)})
+
+    # --- VERSÕES ---
+    def versoes(self):
+        """{tabela: versão} numa única consulta, ou None se o banco ainda não tem a tabela de versões."""
+        try:
+            with self.engine.connect() as conn:
+                return dict(conn.execute(text("SELECT tabela, versao FROM versoes_dados")).fetchall())
+        except Exception:
+            return None
+
+    def alteracoes_desde(self, tabela, versao_local, versao_atual):
+        """
+        Chaves alteradas entre as duas versões, ou None quando é preciso
+        recarregar a tabela inteira (gravação sem chaves ou histórico incompleto).
+        """
+        with self.engine.connect() as conn:
+            linhas = conn.execute(text("SELECT versao, chave FROM alteracoes_dados WHERE tabela = :tabela "
+                                       "AND versao > :de AND versao <= :ate"),
+                                  {"tabela": tabela, "de": versao_local, "ate": versao_atual}).fetchall()
+        if {v for v, _ in linhas} != set(range(versao_local + 1, versao_atual + 1)):
+            return None
+        if any(chave is None for _, chave in linhas):
+            return None
+        return sorted({int(chave) for _, chave in linhas})
+
+    # --- PAGINAÇÃO POR CHAVE (TEMAS) ---
+    def chaves_das_paginas(self, tabela, por_pagina, filtros=None, termo_busca=None):
+        """
+        Retorna (chaves, total): a chave da primeira linha de cada página, em
+        ordem decrescente, e o total de linhas. Só números trafegam; cada página
+        é lida depois com pagina_por_chave, sem OFFSET.
+        """
+        chave = f"t.{_aspas(TABELAS[tabela]['chave'])}"
+        where, params = self._montar_where(tabela, filtros, termo_busca)
+        sql = (f"SELECT chave, total FROM (SELECT {chave} AS chave, ROW_NUMBER() OVER (ORDER BY {chave} DESC) AS rn, "
+               f"COUNT(*) OVER () AS total FROM {tabela} t{where}) p WHERE (rn - 1) % :por_pagina = 0 ORDER BY rn")
+        with self.engine.connect() as conn:
+            linhas = conn.execute(text(sql), dict(params, por_pagina=por_pagina)).fetchall()
+        if not linhas:
+            return [], 0
+        return [linha[0] for linha in linhas], int(linhas[0][1])
+
+    def pagina_por_chave(self, tabela, chave_inicial, por_pagina, filtros=None, termo_busca=None, colunas=None):
+        """Linhas da página que começa em chave_inicial (ordem decrescente da chave)."""
+        chave = f"t.{_aspas(TABELAS[tabela]['chave'])}"
+        where, params = self._montar_where(tabela, filtros, termo_busca, extras=[f"{chave} <= :chave_inicial"])
+        sql = self._select(tabela, colunas) + where + f" ORDER BY {chave} DESC LIMIT :limite"
+        return pd.read_sql_query(text(sql), self.engine, params=dict(params, chave_inicial=chave_inicial, limite=por_pagina))
+
+    # --- ADMIN (TEMAS STF) ---
+    def atualizar_ramo_stf(self, tema_id, novo_ramo):
+        with self.engine.begin() as conn:
+            try:
+                with conn.begin_nested():
+                    stmt = text('UPDATE temas_stf SET "Ramo do Direito" = :ramo, "data_ultima_alteracao" = CURRENT_TIMESTAMP WHERE "Tema" = :tema')
+                    conn.execute(stmt, {"ramo": novo_ramo, "tema": tema_id})
+            except Exception:
+                # Tabela sem a coluna data_ultima_alteracao (ver criar_coluna_data.py)
+                stmt = text('UPDATE temas_stf SET "Ramo do Direito" = :ramo WHERE "Tema" = :tema')
+                conn.execute(stmt, {"ramo": novo_ramo, "tema": tema_id})
+
+            # O ramo faz parte do texto de busca: regrava a coluna 'busca' do tema
+            colunas_sql = ", ".join(_aspas(c) for c in COLUNAS_BUSCA_STF)
+            df_tema = pd.read_sql_query(text(f'SELECT {colunas_sql} FROM temas_stf WHERE "Tema" = :tema'), conn, params={"tema": tema_id})
+            if not df_tema.empty:
+                df_tema['Tema'] = pd.to_numeric(df_tema['Tema'], errors='coerce').fillna(0).astype(int)
+                conn.execute(text('UPDATE temas_stf SET busca = :busca WHERE "Tema" = :tema'),
+                             {"busca": montar_coluna_busca(df_tema, COLUNAS_BUSCA_STF).iloc[0], "tema": tema_id})
+
+            # Só este tema mudou: o app aplica a alteração sem recarregar a tabela
+            registrar_alteracao(conn, "temas_stf", [tema_id])
+
+    def criar_indice_ultima_alteracao(self):
+        """Índice parcial para a consulta de ultimo_tema_editado (só linhas já editadas)."""
+        with self.engine.begin() as conn:
+            conn.execute(text('CREATE INDEX IF NOT EXISTS idx_temas_stf_ultima_alteracao ON temas_stf '
+                              '("data_ultima_alteracao" DESC) WHERE "data_ultima_alteracao" IS NOT NULL'))
+
+    def ultimo_tema_editado(self):
+        with self.engine.connect() as conn:
+            stmt = text('SELECT "Tema" FROM temas_stf WHERE "data_ultima_alteracao" IS NOT NULL ORDER BY "data_ultima_alteracao" DESC LIMIT 1')
+            result = conn.execute(stmt).fetchone()
+            return result[0] if result else None
+
+
+class RepositorioPostgres(RepositorioSQL):
+    """Banco principal (Supabase)."""
+
+    def criar_indices_busca(self):
+        """Índices GIN de trigramas na coluna 'busca' (aceleram o LIKE '%...%')."""
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for tabela in TABELAS:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_busca_trgm ON {tabela} USING gin (busca gin_trgm_ops)"))
+
+
+class RepositorioSQLite(RepositorioSQL):
+    """
+    Banco local em arquivo. Cada tabela tem uma tabela FTS5 '<tabela>_fts'
+    (conteúdo externo, tokenizador trigram) mantida por gatilhos.
+    """
+
+    def _condicoes_texto(self, tabela, termos, params):
+        # O tokenizador trigram só indexa trechos com 3+ caracteres;
+        # os menores continuam no LIKE (a tabela é pequena depois do MATCH).
+        longos = [t for t in termos if len(t) >= 3]
+        curtos = [t for t in termos if len(t) < 3]
+        joins, condicoes = "", []
+        if longos:
+            params["consulta_fts"] = " AND ".join('"' + t.replace('"', '""') + '"' for t in longos)
+            joins = f" JOIN {tabela}_fts f ON f.rowid = t.rowid"
+            condicoes.append(f"{tabela}_fts MATCH :consulta_fts")
+        _, condicoes_like = super()._condicoes_texto(tabela, curtos, params)
+        return joins, condicoes + condicoes_like
+
+    def preparar_busca(self):
+        """Cria (se preciso) as tabelas FTS5 e os gatilhos, e reconstrói o índice."""
+        with self.engine.begin() as conn:
+            for tabela in TABELAS:
+                fts = f"{tabela}_fts"
+                conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(busca, content='{tabela}', content_rowid='rowid', tokenize='trigram')"))
+                conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {tabela}_ai AFTER INSERT ON {tabela} BEGIN "
+                                  f"INSERT INTO {fts}(rowid, busca) VALUES (new.rowid, new.busca); END"))
+                conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {tabela}_ad AFTER DELETE ON {tabela} BEGIN "
+                                  f"INSERT INTO {fts}({fts}, rowid, busca) VALUES ('delete', old.rowid, old.busca); END"))
+                conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {tabela}_au AFTER UPDATE ON {tabela} BEGIN "
+                                  f"INSERT INTO {fts}({fts}, rowid, busca) VALUES ('delete', old.rowid, old.busca); "
+                                  f"INSERT INTO {fts}(rowid, busca) VALUES (new.rowid, new.busca); END"))
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    def importar_tabela(self, tabela, df):
+        """Substitui a tabela local pelo DataFrame (a busca é refeita em preparar_busca)."""
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {tabela}_fts"))
+            df.to_sql(tabela, conn, if_exists='replace', index=False)
+
+
+def criar_repositorio(engine):
+    """Escolhe a implementação pelo dialeto do engine (postgresql ou sqlite)."""
+    if engine.dialect.name == "sqlite":
+        return RepositorioSQLite(engine)
+    return RepositorioPostgres(engine)
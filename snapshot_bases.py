@@ -0,0 +1,56 @@
+"""
+Snapshot em disco (Arrow IPC) das bases já preparadas pelo app.
+
+Depois de cada carga, a base pronta (categorias, int32) é
+gravada com a versão do banco em que foi lida. Um processo reiniciado abre o
+arquivo por memory-map, sem esperar o Postgres; a conferência da versão
+acontece em segundo plano (ver BasesEmMemoria).
+
+Mude FORMATO quando a preparação das bases no app mudar, para descartar os
+snapshots antigos.
+"""
+import os
+import time
+import pyarrow as pa
+from leitura_em_massa import TIPOS_PANDAS
+
+FORMATO = 2
+
+
+class SnapshotBases:
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+
+    def _caminho(self, tabela):
+        return os.path.join(self.diretorio, f"{tabela}.v{FORMATO}.arrow")
+
+    def salvar(self, tabela, df, versao):
+        """Grava o snapshot (arquivo temporário + rename, para nunca deixar um arquivo pela metade)."""
+        os.makedirs(self.diretorio, exist_ok=True)
+        tabela_arrow = pa.Table.from_pandas(df, preserve_index=False)
+        metadados = dict(tabela_arrow.schema.metadata or {})
+        metadados[b"versao_dados"] = b"" if versao is None else str(versao).encode()
+        metadados[b"salvo_em"] = str(time.time()).encode()
+        tabela_arrow = tabela_arrow.replace_schema_metadata(metadados)
+
+        caminho = self._caminho(tabela)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with pa.OSFile(temporario, "wb") as arquivo:
+            with pa.ipc.new_file(arquivo, tabela_arrow.schema) as escritor:
+                escritor.write_table(tabela_arrow)
+        os.replace(temporario, caminho)
+
+    def ler(self, tabela):
+        """(df, versão, idade em segundos) do snapshot, ou None se não houver."""
+        caminho = self._caminho(tabela)
+        if not os.path.exists(caminho):
+            return None
+        # Sem compressão: as colunas são lidas direto do arquivo mapeado em memória
+        tabela_arrow = pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+        metadados = tabela_arrow.schema.metadata or {}
+        versao = metadados.get(b"versao_dados", b"")
+        idade = time.time() - float(metadados.get(b"salvo_em", b"0"))
+        # Textos em colunas Arrow: o DataFrame aponta para as páginas mapeadas, sem
+        # copiar as teses (só os códigos das categorias e os números são copiados)
+        df = tabela_arrow.to_pandas(types_mapper=TIPOS_PANDAS.get, split_blocks=True)
+        return df, (int(versao) if versao else None), idade
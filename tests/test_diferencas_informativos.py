@@ -0,0 +1,73 @@
+import os
+import sys
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from diferencas_informativos import aplicar_diferencas  # noqa: E402
+
+COLUNAS = ["arquivo_fonte", "orgao", "disciplina", "assunto", "tese", "busca"]
+
+
+def _linhas(teses, arquivo="inf1.docx"):
+    return pd.DataFrame([{"arquivo_fonte": arquivo, "orgao": "STF", "disciplina": "D", "assunto": "A",
+                          "tese": tese, "busca": tese.lower()} for tese in teses], columns=COLUNAS)
+
+
+def _gravar(engine, teses):
+    with engine.begin() as conn:
+        return aplicar_diferencas(conn, _linhas(teses), ["inf1.docx"])
+
+
+def _no_banco(engine):
+    """[(chave_linha, tese)] em ordem de documento."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT chave_linha, tese FROM informativos ORDER BY posicao_linha")).all()
+
+
+def _engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE informativos (arquivo_fonte TEXT, orgao TEXT, disciplina TEXT, "
+                          "assunto TEXT, tese TEXT, busca TEXT)"))
+    return engine
+
+
+def test_insercao_no_meio_nao_mexe_nas_outras_linhas():
+    engine = _engine()
+    assert _gravar(engine, ["A", "B", "C"])["inseridas"] == 3
+
+    contagem = _gravar(engine, ["A", "X", "B", "C"])
+    assert (contagem["inseridas"], contagem["atualizadas"], contagem["apagadas"], contagem["renumeradas"]) == (1, 0, 0, 0)
+    assert _no_banco(engine) == [(1, "A"), (4, "X"), (2, "B"), (3, "C")]
+
+    contagem = _gravar(engine, ["A", "X", "B", "C'"])
+    assert (contagem["inseridas"], contagem["atualizadas"], contagem["apagadas"], contagem["renumeradas"]) == (0, 1, 0, 0)
+    assert _no_banco(engine) == [(1, "A"), (4, "X"), (2, "B"), (3, "C'")]
+
+
+def test_remocao_no_meio_mantem_chaves_e_ordem():
+    engine = _engine()
+    _gravar(engine, ["A", "B", "C", "D"])
+
+    contagem = _gravar(engine, ["A", "C", "D"])
+    assert (contagem["inseridas"], contagem["atualizadas"], contagem["apagadas"], contagem["renumeradas"]) == (0, 0, 1, 0)
+    assert _no_banco(engine) == [(1, "A"), (3, "C"), (4, "D")]
+
+    assert _gravar(engine, ["A", "C", "D"])["inalteradas"] == 3
+
+
+def test_sem_folga_renumera_so_as_posicoes():
+    engine = _engine()
+    _gravar(engine, ["A", "B"])
+    teses = ["A", "B"]
+    renumeradas = 0
+    # Cada inserção logo depois de "A" divide a folga ao meio, até ela acabar
+    for n in range(12):
+        teses.insert(1, f"N{n}")
+        contagem = _gravar(engine, teses)
+        assert (contagem["inseridas"], contagem["atualizadas"], contagem["apagadas"]) == (1, 0, 0)
+        renumeradas += contagem["renumeradas"]
+    assert renumeradas > 0
+    assert [tese for _, tese in _no_banco(engine)] == teses
+    assert [chave for chave, tese in _no_banco(engine) if tese in ("A", "B")] == [1, 2]
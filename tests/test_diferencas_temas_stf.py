@@ -0,0 +1,76 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from diferencas_temas_stf import comparar_temas, aplicar_alteracoes  # noqa: E402
+from normalizacao import montar_coluna_busca, COLUNAS_BUSCA_STF  # noqa: E402
+
+COLUNAS = ["Tema", "Título", "Tese", "Leading Case", "Situação do Tema", "Ramo do Direito",
+           "Data do Julgamento", "data_ultima_alteracao"]
+
+
+def _banco():
+    engine = create_engine("sqlite://")
+    df = pd.DataFrame([
+        [1, "Base do ICMS", "Tese um", "RE 1", "Julgado", "Direito Civil", "01/01/2020", "2024-05-01"],
+        [2, "Contribuição", "", "RE 2", "Pendente", "Direito Tributário", "", None],
+        [3, "Concurso", "Tese três", "RE 3", "Julgado", "Direito Administrativo", "02/02/2021", None],
+    ], columns=COLUNAS)
+    df["busca"] = montar_coluna_busca(df, COLUNAS_BUSCA_STF)
+    with engine.begin() as conn:
+        df.to_sql("temas_stf", conn, index=False)
+    return engine
+
+
+def _ler(engine):
+    with engine.connect() as conn:
+        return pd.read_sql(text('SELECT * FROM temas_stf ORDER BY "Tema"'), conn).set_index("Tema", drop=False)
+
+
+def test_atualiza_so_as_colunas_alteradas():
+    engine = _banco()
+    df_banco = _ler(engine).reset_index(drop=True)
+    planilha = pd.DataFrame({
+        "Tema": [1, 2, 3, 4],
+        "Título": ["Base do ICMS", "Contribuição", "Concurso  ", "Novo"],
+        "Tese": ["Tese um", np.nan, "Tese três revista", "Tese nova"],
+        "Leading Case": ["RE 1", "RE 2", "RE 3", "RE 4"],
+        "Situação do Tema": ["Trânsito em julgado", None, "Julgado", "Pendente"],
+        "Data do Julgamento": ["01/01/2020", "", "02/02/2021", ""],
+    })
+
+    plano = comparar_temas(planilha, df_banco)
+    # NaN/None contra '' e espaços nas pontas não contam como alteração
+    assert plano["alteracoes"] == {"Tese": {3: "Tese três revista"},
+                                   "Situação do Tema": {1: "Trânsito em julgado", 2: ""}}
+    assert plano["alterados"] == [1, 2, 3]
+    assert list(plano["novos"]["Tema"]) == [4]
+
+    with engine.begin() as conn:
+        assert aplicar_alteracoes(conn, plano, df_banco) == [1, 2, 3]
+
+    depois = _ler(engine)
+    antes = df_banco.set_index("Tema", drop=False)
+    assert depois.loc[3, "Tese"] == "Tese três revista"
+    assert depois.loc[1, "Situação do Tema"] == "Trânsito em julgado"
+    assert depois.loc[2, "Situação do Tema"] == ""
+    # Colunas que não mudaram ficam como estavam (inclusive o Título com espaços na planilha)
+    for coluna in ["Título", "Leading Case", "Data do Julgamento", "Ramo do Direito", "data_ultima_alteracao"]:
+        assert depois[coluna].tolist() == antes[coluna].tolist(), coluna
+    assert depois.loc[1, "Tese"] == "Tese um"
+
+    # 'busca' refeita com os valores novos e o Ramo do Direito do banco
+    assert depois["busca"].tolist() == montar_coluna_busca(depois.reset_index(drop=True), COLUNAS_BUSCA_STF).tolist()
+    assert "revista" in depois.loc[3, "busca"] and "administrativo" in depois.loc[3, "busca"]
+
+
+def test_planilha_igual_ao_banco_nao_gera_alteracoes():
+    engine = _banco()
+    df_banco = _ler(engine).reset_index(drop=True)
+    planilha = df_banco.drop(columns=["Ramo do Direito", "data_ultima_alteracao", "busca"]).replace("", np.nan)
+
+    plano = comparar_temas(planilha, df_banco)
+    assert (plano["alteracoes"], plano["alterados"], plano["inalterados"], len(plano["novos"])) == ({}, [], 3, 0)
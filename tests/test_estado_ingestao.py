@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from estado_ingestao import adotar_estado_json, carregar_estado, comparar, gravar_estado, remover_estado  # noqa: E402
+
+
+def _arquivo(pasta, orgao, nome, conteudo):
+    caminho = pasta / orgao / nome
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_bytes(conteudo)
+    return caminho
+
+
+def _locais(pasta):
+    return sorted(pasta.glob("*/*.docx"))
+
+
+def _processar(engine, pasta):
+    """Compara com o estado e grava o resultado, como o processar_informativos_inteligente."""
+    with engine.begin() as conn:
+        plano = comparar(_locais(pasta), carregar_estado(conn))
+        for registro in plano["novos"] + plano["modificados"]:
+            registro["linhas"] = 1
+        remover_estado(conn, plano["removidos"] + [nome for nome, _ in plano["renomeados"]])
+        gravar_estado(conn, plano["novos"] + plano["modificados"] + plano["tocados"]
+                      + [registro for _, registro in plano["renomeados"]])
+    return plano
+
+
+def _nomes(registros):
+    return sorted(registro["arquivo"] for registro in registros)
+
+
+def test_inalterado_tocado_renomeado_removido_e_modificado(tmp_path):
+    engine = create_engine("sqlite://")
+    a = _arquivo(tmp_path, "STF", "inf1.docx", b"conteudo 1")
+    b = _arquivo(tmp_path, "STF", "inf2.docx", b"conteudo 2")
+    c = _arquivo(tmp_path, "STJ", "inf3.docx", b"conteudo 3")
+
+    assert _nomes(_processar(engine, tmp_path)["novos"]) == ["inf1.docx", "inf2.docx", "inf3.docx"]
+
+    plano = _processar(engine, tmp_path)
+    assert (plano["inalterados"], plano["novos"], plano["modificados"], plano["tocados"]) == (3, [], [], [])
+
+    # Só o mtime muda (sincronização do Drive): não reprocessa, só guarda o mtime novo
+    os.utime(a, (a.stat().st_atime, a.stat().st_mtime + 60))
+    plano = _processar(engine, tmp_path)
+    assert (plano["inalterados"], plano["modificados"], _nomes(plano["tocados"])) == (3, [], ["inf1.docx"])
+    assert _processar(engine, tmp_path)["tocados"] == []
+
+    # Mesmo conteúdo e órgão com outro nome: renomeação; em outro órgão, arquivo novo
+    b.rename(tmp_path / "STF" / "inf2_corrigido.docx")
+    _arquivo(tmp_path, "STJ", "inf2_copia.docx", b"conteudo 2")
+    plano = _processar(engine, tmp_path)
+    assert [(antigo, registro["arquivo"]) for antigo, registro in plano["renomeados"]] == [("inf2.docx", "inf2_corrigido.docx")]
+    assert (_nomes(plano["novos"]), plano["removidos"]) == (["inf2_copia.docx"], [])
+
+    c.unlink()
+    a.write_bytes(b"conteudo 1 revisto")
+    plano = _processar(engine, tmp_path)
+    assert (plano["removidos"], _nomes(plano["modificados"])) == (["inf3.docx"], ["inf1.docx"])
+    with engine.connect() as conn:
+        assert sorted(carregar_estado(conn)) == ["inf1.docx", "inf2_copia.docx", "inf2_corrigido.docx"]
+
+
+def test_adota_o_estado_json_antigo_so_para_arquivos_inalterados_com_linhas(tmp_path):
+    engine = create_engine("sqlite://")
+    a = _arquivo(tmp_path, "STF", "inf1.docx", b"conteudo 1")
+    b = _arquivo(tmp_path, "STF", "inf2.docx", b"conteudo 2")
+    _arquivo(tmp_path, "STF", "inf3.docx", b"conteudo 3")
+    _arquivo(tmp_path, "STF", "inf4.docx", b"conteudo 4")
+    depois = (datetime.fromtimestamp(a.stat().st_mtime) + timedelta(minutes=1)).isoformat()
+    antes = (datetime.fromtimestamp(b.stat().st_mtime) - timedelta(minutes=1)).isoformat()
+    # inf2 mudou depois do processamento; inf3 não tem linhas no banco; inf4 não está no JSON
+    caminho_json = tmp_path / "processamento_estado.json"
+    caminho_json.write_text(json.dumps({"inf1.docx": depois, "inf2.docx": antes, "inf3.docx": depois}), encoding="utf-8")
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE informativos (arquivo_fonte TEXT)"))
+        conn.execute(text("INSERT INTO informativos VALUES ('inf1.docx'), ('inf1.docx'), ('inf2.docx'), ('inf4.docx')"))
+        adotados = adotar_estado_json(conn, str(caminho_json), _locais(tmp_path))
+        assert [(registro["arquivo"], registro["linhas"]) for registro in adotados] == [("inf1.docx", 2)]
+        gravar_estado(conn, adotados)
+
+    plano = _processar(engine, tmp_path)
+    assert (plano["inalterados"], _nomes(plano["novos"])) == (1, ["inf2.docx", "inf3.docx", "inf4.docx"])
+    assert adotar_estado_json(None, str(tmp_path / "nao_existe.json"), _locais(tmp_path)) == []
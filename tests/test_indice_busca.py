@@ -0,0 +1,55 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indice_busca import IndiceBusca, RankingBM25  # noqa: E402
+from normalizacao import normalizar_texto_regex, montar_coluna_busca, COLUNAS_BUSCA_INFORMATIVOS  # noqa: E402
+
+DF = pd.DataFrame({
+    "disciplina": ["DIREITO TRIBUTÁRIO", "Direito Tributário", "DIREITO CIVIL", "DIREITO PENAL", None],
+    "assunto": ["ICMS", "Base de cálculo do ICMS", "Dano moral", "Dosimetria", "Licitação"],
+    "tese": ["Não incide ICMS sobre o deslocamento.", "A base de cálculo inclui o frete.",
+             "Dano moral coletivo em ação civil pública.", "A pena-base considera os antecedentes.", ""],
+    "orgao": ["STF", "STJ", "STJ", "STF", "STF"],
+}, index=[10, 20, 30, 40, 50])
+
+TERMOS = ["icms", "ICMS base", "calculo", "cálculo", "Cálculo frete", "dano moral", "moral dano", "cms",
+          "pena-base", "pena base", "\"base de calculo\"", "\"calculo de base\"", "\"dano moral\"",
+          "\"ação civil\"", "stf icms", "licitacao", "inexistente", "icms inexistente"]
+
+
+def _filtro_antigo(busca, termo):
+    """O filtro com str.contains que o índice substituiu."""
+    if termo.startswith('"') and termo.endswith('"'):
+        return busca.index[busca.str.contains(termo[1:-1], regex=False, na=False)]
+    mascara = pd.Series(True, index=busca.index)
+    for palavra in termo.split():
+        mascara &= busca.str.contains(palavra, regex=False, na=False)
+    return busca.index[mascara]
+
+
+def test_posicoes_busca_igual_ao_str_contains():
+    busca = montar_coluna_busca(DF, COLUNAS_BUSCA_INFORMATIVOS)
+    indice = IndiceBusca(busca)
+    for termo in TERMOS:
+        normalizado = normalizar_texto_regex(termo).strip()
+        esperado = list(_filtro_antigo(busca, normalizado))
+        assert list(busca.index[indice.posicoes_busca(normalizado)]) == esperado, termo
+
+
+def test_busca_sem_acento_encontra_texto_acentuado():
+    indice = IndiceBusca(montar_coluna_busca(DF, COLUNAS_BUSCA_INFORMATIVOS))
+    assert list(indice.buscar_palavras([normalizar_texto_regex("Licitação")])) == [50]
+    assert list(indice.buscar_palavras(["licitacao"])) == [50]
+    assert list(indice.buscar_frase(normalizar_texto_regex("cálculo do icms"))) == [20]
+
+
+def test_bm25_ordena_pela_frequencia_e_pelo_peso_do_campo():
+    df = pd.DataFrame({"titulo": ["icms", "outro assunto", "icms icms icms", "nada"],
+                       "tese": ["texto", "icms em um texto longo sobre outro tributo qualquer", "texto", "icms"]})
+    ranking = RankingBM25(df, {"titulo": 3.0, "tese": 1.0})
+    pontos = ranking.pontuar(["icms"], df.index)
+    ordem = [int(i) for i in df.index[(-pontos).argsort(kind="stable")]]
+    assert ordem == [2, 0, 3, 1]
+    assert ranking.pontuar(["inexistente"], df.index).tolist() == [0.0] * 4
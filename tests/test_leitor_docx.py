@@ -0,0 +1,38 @@
+import os
+import sys
+import docx
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_BREAK
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from leitor_docx import paragrafos_docx  # noqa: E402
+
+
+def _documento(caminho):
+    documento = docx.Document()
+    documento.styles.add_style("Tese Destacada", WD_STYLE_TYPE.PARAGRAPH)
+    documento.add_heading("DIREITO TRIBUTÁRIO", level=1)
+    documento.add_heading("ICMS", level=2)
+    documento.add_paragraph("Não incide ICMS sobre o deslocamento de mercadorias.")
+    documento.add_paragraph("Tese em estilo próprio.", style="Tese Destacada")
+    documento.add_paragraph("Item de lista", style="List Bullet")
+    documento.add_paragraph("")
+    paragrafo = documento.add_paragraph("Primeira linha")
+    paragrafo.add_run().add_break()
+    paragrafo.add_run("segunda\tcom tab")
+    paragrafo.add_run().add_break(WD_BREAK.PAGE)
+    paragrafo.add_run(" e fim.")
+    tabela = documento.add_table(rows=1, cols=2)
+    tabela.cell(0, 0).text = "Texto dentro da tabela"
+    documento.add_paragraph("Depois da tabela", style="Heading 3")
+    documento.save(caminho)
+
+
+def test_mesmos_paragrafos_e_estilos_do_python_docx(tmp_path):
+    caminho = tmp_path / "informativo.docx"
+    _documento(caminho)
+
+    esperado = [(p.style.name, p.text) for p in docx.Document(caminho).paragraphs]
+    assert list(paragrafos_docx(caminho)) == esperado
+    assert ("Heading 1", "DIREITO TRIBUTÁRIO") in esperado
+    assert "Texto dentro da tabela" not in [texto for _, texto in esperado]
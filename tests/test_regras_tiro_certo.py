@@ -0,0 +1,56 @@
+import json
+import os
+import random
+import re
+import sys
+import unicodedata
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from regras_tiro_certo import ARQUIVO_REGRAS, RegrasTiroCerto, carregar_regras  # noqa: E402
+
+PALAVRAS_SOLTAS = ["icmsx", "xicms", "penalidade", "pena-base", "crime.", "(icms)", "Licitação", "EXECUÇÃO",
+                   "fiscal", "execução  fiscal", "meio", "ambiente", "Eleição,", "bancos", "banco", "PIS/COFINS",
+                   "tributário", "servidora", "habeas", "corpus", "çrime", "concurso-público", "ação", "direito"]
+
+
+def _normalizar_antigo(texto):
+    nfkd = unicodedata.normalize('NFKD', texto)
+    return "".join(c for c in nfkd if not unicodedata.combining(c)).lower()
+
+
+def _laco_antigo(regras, texto):
+    """O laço de importar_stf antes das regras compiladas: um re.search por palavra, em ordem."""
+    texto_limpo = _normalizar_antigo(texto)
+    for palavra, ramo in regras:
+        if re.search(r"\b" + re.escape(palavra) + r"\b", texto_limpo):
+            return ramo
+    return None
+
+
+def _regras_do_arquivo():
+    """As regras compiladas e a lista (palavra, ramo) do mesmo arquivo, em ordem de prioridade."""
+    with open(ARQUIVO_REGRAS, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    lista = [(_normalizar_antigo(palavra), grupo["ramo"]) for grupo in dados["regras"] for palavra in grupo["palavras"]]
+    return carregar_regras(), lista
+
+
+def test_fronteira_de_palavra_e_acentos():
+    regras, _ = _regras_do_arquivo()
+    assert regras.classificar(["cobrança de icmsx e xicms", "ICMS na importação", "Licitação dispensada",
+                               "penalidade administrativa", "pena-base", "EXECUÇÃO FISCAL"]) == [
+        None, "Direito Tributário", "Direito Administrativo", None, "Direito Penal", "Direito Tributário"]
+
+
+def test_vale_a_palavra_de_maior_prioridade():
+    regras = RegrasTiroCerto([("meio ambiente", "Ambiental"), ("ambiente", "Outro"), ("crime", "Penal")])
+    assert regras.classificar(["crime contra o meio ambiente", "ambiente de trabalho", "crime", "nada"]) == [
+        "Ambiental", "Outro", "Penal", None]
+
+
+def test_igual_ao_laco_antigo_em_textos_gerados():
+    regras, lista = _regras_do_arquivo()
+    vocabulario = PALAVRAS_SOLTAS + [palavra for palavra, _ in lista] + [palavra.upper() for palavra, _ in lista]
+    sorteio = random.Random(2024)
+    textos = [" ".join(sorteio.choice(vocabulario) for _ in range(sorteio.randint(0, 8))) for _ in range(3000)]
+    assert regras.classificar(textos) == [_laco_antigo(lista, texto) for texto in textos]
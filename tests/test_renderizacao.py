@@ -0,0 +1,40 @@
+import os
+import sys
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from renderizacao import markdown_informativos, markdown_temas_stf, markdown_temas_stj  # noqa: E402
+
+MALICIOSO = "<script>alert(1)</script> A & B"
+
+
+def _sem_html_do_banco(markdown):
+    assert "<script>" not in markdown
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; A &amp; B" in markdown
+
+
+def test_temas_stf_escapa_texto_do_banco():
+    df = pd.DataFrame({"Tema": [1], "Título": [MALICIOSO], "Tese": [MALICIOSO], "Ramo do Direito": [MALICIOSO],
+                       "Situação do Tema": [MALICIOSO], "Leading Case": ["RE 1"], "Data do Julgamento": [None]})
+    markdown = markdown_temas_stf(df)
+    _sem_html_do_banco(markdown)
+    assert markdown.count("&lt;script&gt;") == 4
+    assert "<details><summary>" in markdown
+
+
+def test_temas_stj_escapa_texto_do_banco():
+    df = pd.DataFrame({"Tema": [2], "Questão submetida a julgamento": [MALICIOSO], "Tese Firmada": [MALICIOSO],
+                       "Processo": [MALICIOSO], "Ramo do direito": ["Penal"]})
+    markdown = markdown_temas_stj(df)
+    _sem_html_do_banco(markdown)
+    assert markdown.count("&lt;script&gt;") == 3
+
+
+def test_informativos_escapa_texto_e_link():
+    df = pd.DataFrame({"arquivo_fonte": ["Info <1> & 2.docx"], "assunto": ["a & b"], "tese": [MALICIOSO],
+                       "orgao": ["STF"]})
+    markdown = markdown_informativos(df)
+    _sem_html_do_banco(markdown)
+    assert "A &amp; B" in markdown
+    assert "Info &lt;1&gt; &amp; 2.pdf</a>" in markdown
+    assert "q=Info+%3C1%3E+%26+2+dizer+o+direito" in markdown
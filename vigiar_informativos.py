@@ -0,0 +1,211 @@
+"""
+Modo vigia: mantém a pasta de informativos sincronizada com o banco.
+
+Fica rodando e, a cada arquivo .docx criado, alterado, renomeado ou apagado,
+passa só esses arquivos pelo mesmo caminho do processador (extração, diferença
+por linha, ingest_state). No Linux usa inotify, sem varrer a pasta; nos outros
+sistemas (ou se o inotify falhar) compara tamanho/mtime da pasta a cada
+INTERVALO_POLLING segundos.
+
+Eventos em rajada (o Word e o Drive gravam o mesmo arquivo várias vezes) são
+agrupados: o lote sai quando a pasta fica ESPERA_SILENCIO segundos sem
+eventos, ou no máximo ESPERA_MAXIMA segundos depois do primeiro.
+
+Uso: python vigiar_informativos.py [pasta]
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from db_config import create_db_engine
+from processar_informativos_inteligente import PASTA_PRINCIPAL_INFORMATIVOS, processar
+
+ESPERA_SILENCIO = 3.0
+ESPERA_MAXIMA = 30.0
+ARQUIVOS_POR_LOTE = 20
+INTERVALO_POLLING = 10.0
+
+# Máscaras do inotify (linux/inotify.h)
+IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x008, 0x040, 0x080
+IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF = 0x100, 0x200, 0x400, 0x800
+IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x4000, 0x8000, 0x40000000
+MASCARA = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENTO = struct.Struct("iIII")
+
+
+def eh_informativo(caminho):
+    """Arquivos .docx, sem os temporários do Word (~$...)."""
+    return caminho.suffix.lower() == ".docx" and not caminho.name.startswith("~$")
+
+
+def arquivos_da_pasta(pasta):
+    return [caminho for caminho in Path(pasta).rglob("*.docx") if eh_informativo(caminho)]
+
+
+class VigiaInotify:
+    """Observa a pasta (e subpastas) pelo inotify do Linux."""
+
+    def __init__(self, pasta):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._pastas = {}
+        self.pasta = Path(pasta)
+        # Eventos perdidos ou pasta movida para fora: o próximo lote confere a pasta inteira
+        self.varrer_tudo = False
+        self._vigiar_arvore(self.pasta)
+
+    def _vigiar(self, pasta):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(pasta), MASCARA)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou em '{pasta}'")
+        self._pastas[wd] = Path(pasta)
+
+    def _vigiar_arvore(self, raiz):
+        """Vigia a pasta e as subpastas; devolve os .docx que já estão nelas."""
+        encontrados = []
+        for pasta, _, nomes in os.walk(raiz):
+            self._vigiar(pasta)
+            encontrados.extend(Path(pasta) / nome for nome in nomes)
+        return [caminho for caminho in encontrados if eh_informativo(caminho)]
+
+    def eventos(self, tempo_maximo):
+        """Caminhos afetados nos eventos lidos em até tempo_maximo segundos ([] se nada aconteceu)."""
+        prontos, _, _ = select.select([self._fd], [], [], tempo_maximo)
+        if not prontos:
+            return []
+        dados = os.read(self._fd, 64 * 1024)
+        afetados, posicao = [], 0
+        while posicao < len(dados):
+            wd, mascara, _, tamanho = EVENTO.unpack_from(dados, posicao)
+            nome = dados[posicao + EVENTO.size:posicao + EVENTO.size + tamanho].rstrip(b"\0")
+            posicao += EVENTO.size + tamanho
+            if mascara & IN_Q_OVERFLOW:
+                self.varrer_tudo = True
+                continue
+            if mascara & IN_IGNORED:
+                self._pastas.pop(wd, None)
+                continue
+            pasta = self._pastas.get(wd)
+            if pasta is None or not nome:
+                continue
+            caminho = pasta / os.fsdecode(nome)
+            if mascara & IN_ISDIR:
+                if mascara & (IN_CREATE | IN_MOVED_TO) and caminho.is_dir():
+                    # Pasta nova (ou movida para dentro): passa a ser vigiada, com o que já tiver
+                    afetados.extend(self._vigiar_arvore(caminho))
+                elif mascara & IN_MOVED_FROM:
+                    # Pasta movida para fora: não há a lista dos arquivos que saíram com ela
+                    self.varrer_tudo = True
+            elif eh_informativo(caminho) and mascara & (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE):
+                afetados.append(caminho)
+        return afetados
+
+    def fechar(self):
+        os.close(self._fd)
+
+
+class VigiaPolling:
+    """Alternativa sem inotify: compara tamanho e mtime dos .docx a cada intervalo."""
+
+    varrer_tudo = False
+
+    def __init__(self, pasta, intervalo=INTERVALO_POLLING):
+        self.pasta = Path(pasta)
+        self.intervalo = intervalo
+        self._vistos = self._estado()
+        self._proxima = time.monotonic() + intervalo
+
+    def _estado(self):
+        vistos = {}
+        for caminho in arquivos_da_pasta(self.pasta):
+            try:
+                info = caminho.stat()
+            except OSError:
+                continue
+            vistos[caminho] = (info.st_size, info.st_mtime)
+        return vistos
+
+    def eventos(self, tempo_maximo):
+        espera = self._proxima - time.monotonic()
+        if espera > tempo_maximo:
+            time.sleep(tempo_maximo)
+            return []
+        time.sleep(max(espera, 0))
+        self._proxima = time.monotonic() + self.intervalo
+        atual = self._estado()
+        afetados = [c for c, info in atual.items() if self._vistos.get(c) != info]
+        afetados += [c for c in self._vistos if c not in atual]
+        self._vistos = atual
+        return afetados
+
+    def fechar(self):
+        pass
+
+
+def criar_vigia(pasta):
+    if sys.platform.startswith("linux"):
+        try:
+            return VigiaInotify(pasta)
+        except (OSError, AttributeError) as e:
+            print(f"inotify indisponível ({e}); usando polling a cada {INTERVALO_POLLING:.0f} s.")
+    return VigiaPolling(pasta)
+
+
+def processar_lote(engine, caminhos):
+    """Passa os arquivos afetados pelo processador, em lotes de ARQUIVOS_POR_LOTE."""
+    caminhos = sorted(set(caminhos))
+    for inicio in range(0, len(caminhos), ARQUIVOS_POR_LOTE):
+        lote = caminhos[inicio:inicio + ARQUIVOS_POR_LOTE]
+        print(f"\n=== {time.strftime('%H:%M:%S')} | {len(lote)} arquivo(s) alterado(s) ===")
+        existentes = [caminho for caminho in lote if caminho.is_file()]
+        processar(existentes, engine, nomes_afetados={caminho.name for caminho in lote})
+
+
+def vigiar(pasta=PASTA_PRINCIPAL_INFORMATIVOS):
+    if not Path(pasta).exists():
+        print(f"ERRO: A pasta de informativos não foi encontrada em '{pasta}'.")
+        return
+    engine = create_db_engine()
+
+    # Uma passada completa no início, para pegar o que mudou com o vigia parado
+    print("--- SINCRONIZAÇÃO INICIAL ---")
+    vigia = criar_vigia(pasta)
+    processar(arquivos_da_pasta(pasta), engine)
+    print(f"\n--- VIGIANDO '{pasta}' ({type(vigia).__name__}). Ctrl+C para sair. ---")
+
+    pendentes, primeiro_evento, ultimo_evento = set(), None, None
+    try:
+        while True:
+            afetados = vigia.eventos(ESPERA_SILENCIO if pendentes or vigia.varrer_tudo else 60.0)
+            agora = time.monotonic()
+            if vigia.varrer_tudo and not afetados:
+                vigia.varrer_tudo = False
+                pendentes, primeiro_evento = set(), None
+                print(f"\n=== {time.strftime('%H:%M:%S')} | conferindo a pasta inteira ===")
+                processar(arquivos_da_pasta(pasta), engine)
+                continue
+            if afetados:
+                pendentes.update(afetados)
+                primeiro_evento = primeiro_evento or agora
+                ultimo_evento = agora
+            if pendentes and (agora - ultimo_evento >= ESPERA_SILENCIO or agora - primeiro_evento >= ESPERA_MAXIMA):
+                lote, pendentes, primeiro_evento = pendentes, set(), None
+                try:
+                    processar_lote(engine, lote)
+                except Exception as e:
+                    # Um lote com erro não derruba o vigia; a próxima alteração tenta de novo
+                    print(f"\n!!!! ERRO AO PROCESSAR O LOTE: {e}")
+    except KeyboardInterrupt:
+        print("\n--- VIGIA ENCERRADO ---")
+    finally:
+        vigia.fechar()
+
+
+if __name__ == "__main__":
+    vigiar(sys.argv[1] if len(sys.argv) > 1 else PASTA_PRINCIPAL_INFORMATIVOS)